@@ -1,14 +1,77 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, Form
-from fastapi.responses import StreamingResponse, FileResponse
+from fastapi import FastAPI, UploadFile, File, HTTPException, Form, Response, Depends, Query, Header
+from fastapi.responses import StreamingResponse, FileResponse, PlainTextResponse
 from app.schemas import CVData
-from app.services.gemini_parser import parser_service
-from app.services.doc_generator import doc_generator
-from app.utils import extract_text_from_upload_file
-import uvicorn
+from app.services.gemini_parser import GeminiParser, get_parser_service
+from app.services.parse_cache import parse_cache
+from app.services.pre_extractor import parse_cv_local
+from app.services.text_compactor import compact_cv_text, compaction_headers
+from app.services.llm_client import llm_client, LLMUnavailableError
+from app.services import metrics
+from app.services.profiler import request_profiler, ProfilingMiddleware
+from app.services.uploads import UploadLimitMiddleware, UPLOAD_MAX_BYTES, read_upload, release_upload
+from app.services.output_cache import output_cache, make_output_key, etag_for, etag_matches
+from app.services.template_registry import template_registry, TemplateValidationError, TEMPLATE_UPLOAD_MAX_BYTES
+from app.services.job_queue import job_queue, JobQueueFull, JobQueueClosed, DONE, FAILED
+from app.services.doc_generator import DocGenerator, get_doc_generator
+from app.services.template_cache import CompiledTemplate
+from app.utils import extract_text_from_upload_file, extract_text_from_bytes, shutdown_extraction_pool, ZipChunkSink
+from contextlib import asynccontextmanager
+from pydantic import TypeAdapter, ValidationError
+from starlette.concurrency import run_in_threadpool
 import os
-from typing import Optional
+import re
+import json
+import asyncio
+import zipfile
+from typing import List, Optional
 
-app = FastAPI(title="CV Parsing & Generation API")
+PARSE_BATCH_MAX_FILES = int(os.getenv("PARSE_BATCH_MAX_FILES", "500"))
+GENERATE_BATCH_MAX_ITEMS = int(os.getenv("GENERATE_BATCH_MAX_ITEMS", "500"))
+
+CV_DATA_LIST_ADAPTER = TypeAdapter(List[CVData])
+
+def batch_entry_name(index: int, data: CVData) -> str:
+    safe_name = re.sub(r"[^A-Za-z0-9]+", "_", data.personal_details.name or "").strip("_") or "cv"
+    return f"{index:03d}_{safe_name}.docx"
+
+def mask_personal_details(data: CVData):
+    """Scrubs contact details in place (email, phone, address, links, DOB, gender)."""
+    data.personal_details.email = None
+    data.personal_details.phone = None
+    data.personal_details.address = None
+    data.personal_details.linkedin = None
+    data.personal_details.github = None
+    data.personal_details.portfolio = None
+    data.personal_details.date_of_birth = None
+    data.personal_details.gender = None
+
+def warm_services():
+    """Builds the services and parses the built-in templates so the first real request does not pay for it."""
+    get_doc_generator().warm_templates()
+    try:
+        get_parser_service()
+    except Exception as e:
+        # e.g. no GEMINI_API_KEY: the LLM endpoints report it, everything else keeps working
+        print(f"Warning: could not initialise the CV parser: {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up in the background: the worker starts answering (health checks, /) right away
+    # instead of waiting for the Gemini SDK import and template parsing.
+    warmup = asyncio.create_task(run_in_threadpool(warm_services))
+    await job_queue.start(run_job)
+    yield
+    warmup.cancel()
+    # Running jobs get a grace period; whatever is left is requeued for the next start
+    await job_queue.drain()
+    # Let in-flight extractions finish before the worker exits
+    shutdown_extraction_pool()
+
+app = FastAPI(title="CV Parsing & Generation API", lifespan=lifespan)
+# Opt-in per-request profiling (PROFILING_ENABLED=1, then send "X-Profile: 1" or "?profile=1")
+app.add_middleware(ProfilingMiddleware, profiler=request_profiler)
+# Oversized bodies are refused with 413 before (or while) they are read, not after
+app.add_middleware(UploadLimitMiddleware, max_bytes=UPLOAD_MAX_BYTES)
 
 @app.get("/")
 def read_root():
@@ -36,103 +99,411 @@ def download_template(style: str = "paragraph"):
         filename=f"sample_cv_{style}_template.docx"
     )
 
+@app.get("/template-cache/stats")
+def template_cache_stats(doc_generator: DocGenerator = Depends(get_doc_generator)):
+    """
+    Returns hit/miss counters and memory use of the compiled template cache.
+    """
+    return doc_generator.template_cache.stats()
+
+@app.get("/parse-cache/stats")
+def parse_cache_stats():
+    """
+    Returns hit/miss counters for the parse cache.
+    """
+    return parse_cache.stats()
+
+@app.get("/output-cache/stats")
+def output_cache_stats():
+    """
+    Returns hit/miss counters and memory use of the rendered-DOCX cache behind /generate.
+    """
+    return output_cache.stats()
+
+@app.get("/llm-client/stats")
+def llm_client_stats():
+    """
+    Returns call/retry counters and the circuit-breaker state of the LLM client.
+    """
+    return llm_client.stats()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint():
+    """
+    Per-stage latency histograms and counters in Prometheus text format.
+    """
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/profiles")
+def list_profiles():
+    """
+    Lists stored request profiles, newest first.
+    """
+    if not request_profiler.enabled:
+        raise HTTPException(status_code=404, detail="Profiling is disabled (set PROFILING_ENABLED=1).")
+    return request_profiler.list_profiles()
+
+@app.get("/profiles/{profile_id}")
+def download_profile(profile_id: str, format: str = "prof"):
+    """
+    Downloads the profile of one request, by the ID from its X-Profile-Id header.
+    format=prof returns the cProfile dump (open with pstats or snakeviz); format=text
+    returns the top functions by cumulative time.
+    """
+    if not request_profiler.enabled:
+        raise HTTPException(status_code=404, detail="Profiling is disabled (set PROFILING_ENABLED=1).")
+    if not request_profiler.exists(profile_id):
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found.")
+    if format == "text":
+        return PlainTextResponse(request_profiler.text_report(profile_id))
+    return FileResponse(request_profiler.path_for(profile_id), media_type="application/octet-stream", filename=f"{profile_id}.prof")
+
+@app.post("/templates", status_code=201)
+async def register_template(file: UploadFile = File(...), name: str = Form("")):
+    """
+    Registers a DOCX template once and returns its template_id for /generate, /process,
+    /generate-batch and /jobs. The template is validated and compiled on upload: tags
+    split across Word runs are merged, Jinja syntax is checked, and loop rows and
+    placeholders are indexed (both are listed in the response). Uploading the same file
+    again returns the same template_id.
+    """
+    content = await file.read(TEMPLATE_UPLOAD_MAX_BYTES + 1)
+    if len(content) > TEMPLATE_UPLOAD_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"Template larger than {TEMPLATE_UPLOAD_MAX_BYTES} bytes.")
+    try:
+        return await run_in_threadpool(template_registry.register, content, name or file.filename or "")
+    except TemplateValidationError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid template: {e}")
+
+@app.get("/templates")
+def list_templates():
+    """
+    Lists registered templates, newest first.
+    """
+    return template_registry.list()
+
+@app.get("/templates/{template_id}")
+def describe_template(template_id: str):
+    """
+    Returns what was indexed for a registered template.
+    """
+    info = template_registry.describe(template_id)
+    if info is None:
+        raise HTTPException(status_code=404, detail=f"Template {template_id} is not registered.")
+    return info
+
+@app.delete("/templates/{template_id}", status_code=204)
+def delete_template(template_id: str):
+    """
+    Removes a registered template.
+    """
+    if not template_registry.delete(template_id):
+        raise HTTPException(status_code=404, detail=f"Template {template_id} is not registered.")
+    return Response(status_code=204)
+
+def llm_unavailable(e: LLMUnavailableError) -> HTTPException:
+    # 503 + Retry-After tells well-behaved clients to back off instead of hammering us
+    return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(int(e.retry_after + 0.999))})
+
 @app.post("/parse", response_model=CVData)
-async def parse_cv(file: UploadFile = File(...)):
+@metrics.timed_endpoint("/parse")
+async def parse_cv(response: Response, file: UploadFile = File(...), local_only: bool = False, sectioned: Optional[bool] = None, parser_service: GeminiParser = Depends(get_parser_service)):
     """
     Parses an uploaded CV (PDF/DOCX) and returns structured JSON data.
+    If local_only=True, the LLM is skipped and only contact details found by
+    deterministic patterns (email, phone, LinkedIn/GitHub/portfolio) are returned.
+    sectioned=True parses each CV section (Experience, Education, ...) with its own
+    concurrent LLM call; by default this is used automatically for long CVs.
+    Text compaction savings are reported in the X-CV-Text-* response headers.
     """
     try:
         text = await extract_text_from_upload_file(file)
-        parsed_data = parser_service.parse_cv(text)
+        with metrics.stage("compact"):
+            compaction = compact_cv_text(text)
+        response.headers.update(compaction_headers(compaction))
+        if local_only:
+            return parse_cv_local(compaction.text)
+        parsed_data = await parser_service.parse_cv_async(compaction.text, sectioned=sectioned)
         return parsed_data
+    except LLMUnavailableError as e:
+        raise llm_unavailable(e)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal Server Error: {e}")
 
+def sse_event(event: str, payload) -> str:
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+@app.post("/parse-stream")
+async def parse_cv_stream(file: UploadFile = File(...), style: str = Form("paragraph"), parser_service: GeminiParser = Depends(get_parser_service)):
+    """
+    Same as /parse, but streams the result as server-sent events while the model writes it:
+    - event "section": {"field": "personal_details", "value": {...}} for each top-level field
+    - event "item": {"field": "experience", "index": 0, "value": {...}} for each list entry
+    - event "result": the validated CVData, or event "error": {"detail": "..."}
+    """
+    try:
+        text = await extract_text_from_upload_file(file)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        return StreamingResponse(iter([sse_event("error", {"detail": f"Text extraction failed: {e}"})]), media_type="text/event-stream")
+    compaction = compact_cv_text(text)
+
+    async def stream_events():
+        try:
+            async for event in parser_service.parse_cv_stream(compaction.text, tech6=(style == "tech6")):
+                if event[0] == "item":
+                    yield sse_event("item", {"field": event[1], "index": event[2], "value": event[3]})
+                elif event[0] == "section":
+                    yield sse_event("section", {"field": event[1], "value": event[2]})
+                else:
+                    yield sse_event("result", event[1].model_dump(mode="json"))
+        except Exception as e:
+            yield sse_event("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        stream_events(),
+        media_type="text/event-stream",
+        # Proxies must not buffer the stream, or the first events arrive with the last one
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", **compaction_headers(compaction)}
+    )
+
+@app.post("/parse-batch")
+async def parse_cv_batch(files: List[UploadFile] = File(...), style: str = Form("paragraph"), local_only: bool = Form(False), parser_service: GeminiParser = Depends(get_parser_service)):
+    """
+    Parses many CVs in one request. Extraction and LLM calls overlap across files, and
+    results stream back as NDJSON (one line per file) in completion order:
+    {"index": 0, "filename": "...", "data": {...}, "chars_saved": 120, "tokens_saved": 30}
+    or {"index": 0, "filename": "...", "error": "..."}
+    """
+    if len(files) > PARSE_BATCH_MAX_FILES:
+        raise HTTPException(status_code=400, detail=f"Too many files: {len(files)} (max {PARSE_BATCH_MAX_FILES}).")
+
+    # Take the uploads now; the request's temp files are closed once the streaming response starts.
+    # Large ones are spooled to files of our own and memory-mapped during extraction.
+    uploads = [(file.filename or "", await read_upload(file)) for file in files]
+    is_tech6 = (style == "tech6")
+
+    async def parse_one(index: int, filename: str, content: bytes) -> dict:
+        try:
+            text = await extract_text_from_bytes(filename, content)
+            with metrics.stage("compact"):
+                compaction = compact_cv_text(text)
+            if local_only:
+                parsed_data = parse_cv_local(compaction.text)
+            else:
+                parsed_data = await parser_service.parse_cv_async(compaction.text, tech6=is_tech6)
+            return {
+                "index": index,
+                "filename": filename,
+                "data": parsed_data.model_dump(mode="json"),
+                "chars_saved": compaction.saved_chars,
+                "tokens_saved": compaction.saved_tokens,
+                "chars_truncated": compaction.truncated_chars,
+            }
+        except Exception as e:
+            return {"index": index, "filename": filename, "error": str(e)}
+
+    async def stream_results():
+        tasks = [asyncio.create_task(parse_one(i, name, content)) for i, (name, content) in enumerate(uploads)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield json.dumps(await next_done) + "\n"
+        finally:
+            # Client went away or we are done: don't leave LLM calls running for nobody
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for _, content in uploads:
+                release_upload(content)
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
 @app.post("/generate")
-async def generate_cv(data: CVData, style: str = "paragraph", template_file: Optional[UploadFile] = None, masking: bool = False):
+@metrics.timed_endpoint("/generate")
+async def generate_cv(
+    data: str = Form(..., description="JSON of a CVData object"),
+    style: str = "paragraph",
+    template_file: Optional[UploadFile] = None,
+    template_id: Optional[str] = None,
+    masking: bool = False,
+    if_none_match: Optional[str] = Header(None),
+    doc_generator: DocGenerator = Depends(get_doc_generator)
+):
     """
     Generates a formatted DOCX CV based on the provided JSON data.
     Optionally accepts a customized DOCX template or a default style ('paragraph' or 'tabular').
+    A template registered with POST /templates is used by passing its template_id instead.
     If masking=True, contact details (email, phone, address, linkedin, etc.) will be hidden.
+    Renders are cached by content: the response carries an ETag, and a request that sends
+    it back in If-None-Match gets a 304 without anything being rendered.
     """
+    try:
+        cv = CVData.model_validate_json(data)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+    registered = registered_template(template_id)
     try:
         # Scrub data if masking is enabled
         if masking:
-            data.personal_details.email = None
-            data.personal_details.phone = None
-            data.personal_details.address = None
-            data.personal_details.linkedin = None
-            data.personal_details.github = None
-            data.personal_details.portfolio = None
-            data.personal_details.date_of_birth = None
-            data.personal_details.gender = None
+            mask_personal_details(cv)
         
         template_bytes = None
         if template_file and template_file.filename:
             template_bytes = await template_file.read()
-            
-        file_stream = doc_generator.generate_docx(data, template_bytes=template_bytes, template_style=style)
-        return StreamingResponse(
-            file_stream, 
+
+        # Compiling an uploaded template and rendering are CPU-bound; keep them off the event loop
+        template = registered or await run_in_threadpool(doc_generator.get_compiled_template, template_bytes, style)
+        key = make_output_key(cv, template.key, style, masking)
+        headers = {
+            "ETag": etag_for(key),
+            "Cache-Control": "private, no-cache",
+            "Content-Disposition": "attachment; filename=parsed_cv.docx",
+        }
+        if etag_matches(if_none_match, headers["ETag"]):
+            return Response(status_code=304, headers={"ETag": headers["ETag"], "Cache-Control": headers["Cache-Control"]})
+
+        content = output_cache.get(key)
+        headers["X-Output-Cache"] = "hit" if content is not None else "miss"
+        if content is None:
+            file_stream = await run_in_threadpool(doc_generator.generate_docx, cv, template_style=style, template=template)
+            content = file_stream.getvalue()
+            output_cache.set(key, content)
+        return Response(
+            content,
             media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            headers={"Content-Disposition": "attachment; filename=parsed_cv.docx"}
+            headers=headers
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/generate-batch")
+async def generate_cv_batch(
+    cvs: str = Form(..., description="JSON array of CVData objects"),
+    style: str = Form("paragraph"),
+    template_file: Optional[UploadFile] = None,
+    template_id: Optional[str] = Form(None),
+    masking: bool = Form(False),
+    doc_generator: DocGenerator = Depends(get_doc_generator)
+):
+    """
+    Renders many CVs with one style or template and streams them back as a ZIP archive.
+    The template is compiled once for the whole batch, and each DOCX is flushed to the
+    client as soon as it is rendered, so the archive is never held in memory as a whole.
+    CVs that fail to render are listed in errors.txt at the end of the archive.
+    """
+    try:
+        items = CV_DATA_LIST_ADAPTER.validate_json(cvs)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+    if len(items) > GENERATE_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Too many CVs: {len(items)} (max {GENERATE_BATCH_MAX_ITEMS}).")
+
+    template = registered_template(template_id)
+    upload_bytes = None
+    if template_file and template_file.filename:
+        upload_bytes = await template_file.read()
+    try:
+        if template is None:
+            template = await run_in_threadpool(doc_generator.get_compiled_template, upload_bytes, style)
+    except OSError as e:
+        raise HTTPException(status_code=404, detail=f"Template {style} not found: {e}")
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid template: {e}")
+
+    async def stream_archive():
+        sink = ZipChunkSink()
+        errors = []
+        # DOCX files are already deflated; storing them avoids burning CPU on a second compression
+        with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED) as archive:
+            for index, data in enumerate(items, start=1):
+                if masking:
+                    mask_personal_details(data)
+                try:
+                    file_stream = await run_in_threadpool(doc_generator.generate_docx, data, None, style, template)
+                except Exception as e:
+                    errors.append(f"{index}: {data.personal_details.name}: {e}")
+                    continue
+                archive.writestr(batch_entry_name(index, data), file_stream.getvalue())
+                yield sink.drain()
+            if errors:
+                archive.writestr("errors.txt", "\n".join(errors) + "\n")
+        yield sink.drain()
+
+    return StreamingResponse(
+        stream_archive(),
+        media_type="application/zip",
+        headers={"Content-Disposition": "attachment; filename=generated_cvs.zip"}
+    )
+
+def registered_template(template_id: Optional[str]) -> Optional[CompiledTemplate]:
+    """Looks up a template registered with POST /templates; None when no ID is given."""
+    if not template_id:
+        return None
+    try:
+        return template_registry.get(template_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Template {template_id} is not registered.")
+
+async def read_template_upload(template_file: Optional[UploadFile]) -> Optional[bytes]:
+    if template_file and template_file.filename and not template_file.filename.strip() == "":
+        content = await template_file.read()
+        if len(content) > 0:
+            print(f"Received custom template: {template_file.filename} ({len(content)} bytes)")
+            return content
+    return None
+
+async def parse_and_render(text: str, style: str, template_bytes: Optional[bytes], masking: bool, parser_service: GeminiParser, doc_generator: DocGenerator, template: Optional[CompiledTemplate] = None):
+    """The parse -> mask -> render part of /process, shared with background jobs."""
+    is_tech6 = (style == "tech6")
+    parsed_data = await parser_service.parse_cv_async(text, tech6=is_tech6)
+    if masking:
+        mask_personal_details(parsed_data)
+        # job_title is usually not masked as it's professional info, but can add if requested. User asked for "personal data"
+    return await run_in_threadpool(doc_generator.generate_docx, parsed_data, template_bytes, style, template)
+
 @app.post("/process")
+@metrics.timed_endpoint("/process")
 async def process_full_flow(
     file: UploadFile = File(...), 
     style: str = Form("paragraph"), 
     template_file: Optional[UploadFile] = None,
-    masking: bool = Form(False)
+    template_id: Optional[str] = Form(None),
+    masking: bool = Form(False),
+    parser_service: GeminiParser = Depends(get_parser_service),
+    doc_generator: DocGenerator = Depends(get_doc_generator)
 ):
     """
     End-to-end flow: Upload raw CV + Optional Template -> Parse -> Generate DOCX.
+    Instead of uploading the template every time, register it once with POST /templates
+    and pass its template_id.
     If masking=True, contact details will be removed from the final DOCX.
     """
+    template = registered_template(template_id)
     try:
         # 1. Extract Text from CV
         text = await extract_text_from_upload_file(file)
+        with metrics.stage("compact"):
+            compaction = compact_cv_text(text)
         
-        # 2. Parse with Gemini
-        is_tech6 = (style == "tech6")
-        parsed_data = parser_service.parse_cv(text, tech6=is_tech6)
-        
-        # 2.5 Masking
-        if masking:
-            parsed_data.personal_details.email = None
-            parsed_data.personal_details.phone = None
-            parsed_data.personal_details.address = None
-            parsed_data.personal_details.linkedin = None
-            parsed_data.personal_details.github = None
-            parsed_data.personal_details.portfolio = None
-            parsed_data.personal_details.date_of_birth = None
-            parsed_data.personal_details.gender = None
-            # job_title is usually not masked as it's professional info, but can add if requested. User asked for "personal data"
-        
-        # 3. Read Template if provided correctly
-        template_bytes = None
-        if template_file and template_file.filename and not template_file.filename.strip() == "":
-            content = await template_file.read()
-            if len(content) > 0:
-                print(f"Received custom template: {template_file.filename} ({len(content)} bytes)")
-                template_bytes = content
-        
-        if not template_bytes:
+        # 2. Read Template if provided correctly
+        template_bytes = await read_template_upload(template_file)
+        if not template_bytes and template is None:
             print(f"No custom template detected. Using system default style: {style}.")
         
-        # 4. Generate DOCX
-        file_stream = doc_generator.generate_docx(parsed_data, template_bytes=template_bytes, template_style=style)
+        # 3. Parse with Gemini, mask, generate DOCX
+        file_stream = await parse_and_render(compaction.text, style, template_bytes, masking, parser_service, doc_generator, template)
         
         return StreamingResponse(
             file_stream, 
             media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            headers={"Content-Disposition": f"attachment; filename=generated_cv.docx"}
+            headers={"Content-Disposition": f"attachment; filename=generated_cv.docx", **compaction_headers(compaction)}
         )
         
+    except LLMUnavailableError as e:
+        raise llm_unavailable(e)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -151,6 +522,103 @@ async def process_full_flow(
             
         raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
 
+def resolve(provider):
+    """Calls a dependency provider outside a request, honouring app.dependency_overrides."""
+    return app.dependency_overrides.get(provider, provider)()
+
+async def run_job(job) -> tuple:
+    """Runs one queued /jobs submission: the /process pipeline without a client waiting on it."""
+    with metrics.track_request("/jobs"):
+        text = await extract_text_from_bytes(job["filename"], job["content"])
+        with metrics.stage("compact"):
+            compaction = compact_cv_text(text)
+        template = None
+        if job["template_id"]:
+            try:
+                template = template_registry.get(job["template_id"])
+            except KeyError:
+                raise ValueError(f"Template {job['template_id']} was deleted before the job ran.")
+        file_stream = await parse_and_render(compaction.text, job["style"], job["template"], bool(job["masking"]), resolve(get_parser_service), resolve(get_doc_generator), template)
+    return file_stream.getvalue(), compaction_headers(compaction)
+
+def job_links(job_id: str) -> dict:
+    return {"status_url": f"/jobs/{job_id}", "result_url": f"/jobs/{job_id}/result"}
+
+@app.post("/jobs", status_code=202)
+async def submit_job(
+    response: Response,
+    file: UploadFile = File(...),
+    style: str = Form("paragraph"),
+    template_file: Optional[UploadFile] = None,
+    template_id: Optional[str] = Form(None),
+    masking: bool = Form(False)
+):
+    """
+    Queues the /process pipeline for an uploaded CV and returns at once with a job ID.
+    Poll GET /jobs/{job_id} (add ?wait=30 to long-poll) and download the DOCX from
+    GET /jobs/{job_id}/result once the status is "done". Jobs are stored on disk, so
+    queued ones survive a restart.
+    """
+    filename = file.filename or ""
+    if not filename.lower().endswith((".pdf", ".docx")):
+        raise HTTPException(status_code=400, detail="Unsupported file format. Please upload PDF or DOCX.")
+    registered_template(template_id)
+    template_bytes = await read_template_upload(template_file)
+    content = await read_upload(file)
+    try:
+        job_id = await job_queue.submit(filename, content, style, template_bytes, masking, template_id)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "30"})
+    except JobQueueClosed as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    finally:
+        release_upload(content)
+    response.headers["Location"] = f"/jobs/{job_id}"
+    return {"job_id": job_id, "status": "queued", **job_links(job_id)}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str, wait: float = Query(0, ge=0, le=60)):
+    """
+    Returns the status of a job: queued, running, done or failed (with an error).
+    wait=N holds the request for up to N seconds until the job finishes.
+    """
+    if job_queue.store is None:
+        raise HTTPException(status_code=503, detail="Job queue is not running.")
+    job = await job_queue.wait(job_id, wait) if wait else await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found.")
+    return {**job, **job_links(job_id)}
+
+@app.get("/jobs/{job_id}/result")
+async def download_job_result(job_id: str):
+    """
+    Downloads the DOCX of a finished job. Returns 409 while the job is still queued or
+    running, or if it failed.
+    """
+    if job_queue.store is None:
+        raise HTTPException(status_code=503, detail="Job queue is not running.")
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found.")
+    if job["status"] == FAILED:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} failed: {job['error']}")
+    result = await job_queue.result(job_id) if job["status"] == DONE else None
+    if result is None:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is {job['status']}.")
+    content, headers = result
+    return Response(
+        content,
+        media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        headers={"Content-Disposition": "attachment; filename=generated_cv.docx", **headers}
+    )
+
+@app.get("/job-queue/stats")
+def job_queue_stats():
+    """
+    Returns job counts by status and the worker pool settings.
+    """
+    return job_queue.stats()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
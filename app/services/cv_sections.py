@@ -0,0 +1,62 @@
+import re
+from typing import NamedTuple
+
+# Heading aliases per CVData field group, mirroring the ones listed in the parsing prompt.
+# "personal" covers the untitled preamble (name, contact lines) and summary-style sections;
+# "custom" collects everything that ends up in custom_sections.
+SECTION_ALIASES = {
+    "personal": ("summary", "professional summary", "objective", "career objective", "profile", "professional profile", "about me", "personal details", "personal information", "contact", "contact details"),
+    "education": ("education", "academic background", "academic qualifications", "qualifications", "educational qualifications", "scholastic achievements"),
+    "experience": ("experience", "work experience", "professional experience", "employment history", "employment record", "professional background", "career path", "work history", "internships"),
+    "projects": ("projects", "key projects", "academic projects", "personal projects", "project experience"),
+    "skills": ("skills", "technical skills", "competencies", "core competencies", "technologies", "core skills", "key skills"),
+    "languages": ("languages", "languages known", "language proficiency"),
+    "custom": ("certifications", "certificates", "credentials", "licensure", "awards", "honors", "honours", "achievements", "volunteering", "volunteer experience", "interests", "hobbies", "publications", "references", "courses", "trainings", "training"),
+}
+
+HEADING_TO_SECTION = {alias: key for key, aliases in SECTION_ALIASES.items() for alias in aliases}
+HEADING_CLEANUP_RE = re.compile(r'^[\s#*\-•|]+|[\s:|*\-•]+$')
+HEADING_MAX_CHARS = 40
+
+
+class CVSection(NamedTuple):
+    key: str
+    titles: tuple
+    text: str
+
+
+def section_key_for_heading(line: str):
+    """Returns the section key if the line is a bare heading such as 'WORK EXPERIENCE:'."""
+    if len(line) > HEADING_MAX_CHARS:
+        return None
+    normalized = " ".join(HEADING_CLEANUP_RE.sub('', line).lower().replace('&', 'and').split())
+    return HEADING_TO_SECTION.get(normalized)
+
+
+def split_cv_sections(cv_text: str) -> list:
+    """
+    Splits CV text at recognised headings and groups the pieces by section key, in order of
+    first appearance. Text before the first heading belongs to "personal". Custom sections
+    keep their heading lines so the model can title them.
+    """
+    grouped = {}
+    titles = {}
+    key, lines = "personal", []
+
+    def flush():
+        text = "\n".join(lines).strip()
+        if text:
+            grouped.setdefault(key, []).append(text)
+
+    for line in cv_text.splitlines():
+        heading_key = section_key_for_heading(line.strip()) if line.strip() else None
+        if heading_key is None:
+            lines.append(line)
+            continue
+        flush()
+        key = heading_key
+        titles.setdefault(key, []).append(line.strip())
+        lines = [line.strip()] if key == "custom" else []
+    flush()
+
+    return [CVSection(k, tuple(titles.get(k, ())), "\n\n".join(parts)) for k, parts in grouped.items()]
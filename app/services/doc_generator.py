@@ -1,58 +1,91 @@
 from docxtpl import DocxTemplate, RichText
 from app.schemas import CVData
+from app.services.template_cache import template_cache, build_expansion_plan, stamp_row, CompiledTemplate
+from app.services import metrics
 import io
 import os
-from copy import deepcopy
+import threading
 import re
 
+# Render expansion + Jinja on one in-memory tree. Set to 0 to fall back to the save/reload path.
+DOCX_SINGLE_PASS_RENDER = os.getenv("DOCX_SINGLE_PASS_RENDER", "1") not in ("0", "false", "False")
+
 class DocGenerator:
-    def __init__(self):
+    def __init__(self, cache=template_cache, single_pass: bool = DOCX_SINGLE_PASS_RENDER):
         self.template_path = "templates/cv_template.docx"
+        self.template_cache = cache
+        self.single_pass = single_pass
 
-    def generate_docx(self, data: CVData, template_bytes: bytes = None, template_style: str = "paragraph") -> io.BytesIO:
+    def generate_docx(self, data: CVData, template_bytes: bytes = None, template_style: str = "paragraph", template: CompiledTemplate = None) -> io.BytesIO:
         try:
-            from docx import Document
-            
-            # Load the template as a python-docx Document first
-            if template_bytes and len(template_bytes) > 0:
-                template_io = io.BytesIO(template_bytes)
-                docx = Document(template_io)
-            else:
-                actual_path = self.template_path
-                if template_style == "tabular":
-                    actual_path = "templates/tabular_template.docx"
-                elif template_style == "tech6":
-                    actual_path = "templates/tech6_template.docx"
-                elif template_style == "paragraph":
-                    actual_path = "templates/paragraph_template.docx"
-                
-                if not os.path.exists(actual_path):
-                    actual_path = "templates/cv_template.docx"
-                docx = Document(actual_path)
+            # Take a private copy of the cached, pre-scanned template
+            with metrics.stage("template"):
+                if template is None:
+                    template = self.get_compiled_template(template_bytes, template_style)
+                docx = template.clone()
             
             # Convert to dictionary and PROCESS LINKS
-            context = data.model_dump()
-            self._process_links(context, docx) # Pass docx if needed for relationship hacking, but RichText handles basic ones
+            with metrics.stage("process_links"):
+                context = data.model_dump()
+                self._process_links(context, docx) # Pass docx if needed for relationship hacking, but RichText handles basic ones
             
             # STAGE 1: MANUAL EXPANSION on the python-docx Document
-            self._manually_expand_tables(docx, context)
-            
-            # STAGE 2: SAVE and LOAD into DocxTemplate for Jinja rendering
-            temp_io = io.BytesIO()
-            docx.save(temp_io)
-            temp_io.seek(0)
+            with metrics.stage("expand_rows"):
+                rows = self._manually_expand_tables(docx, context, plan=template.expansion_plan)
+            metrics.count(metrics.ROWS_EXPANDED, rows)
             
-            doc = DocxTemplate(temp_io)
-            doc.render(context)
+            # STAGE 2: Jinja rendering with DocxTemplate
+            with metrics.stage("render"):
+                if self.single_pass:
+                    # Hand the expanded Document straight to docxtpl: same XML tree, no zip round trip
+                    doc = DocxTemplate(None)
+                    doc.docx = docx
+                else:
+                    # Legacy path: serialize the expanded Document and re-parse it
+                    temp_io = io.BytesIO()
+                    docx.save(temp_io)
+                    temp_io.seek(0)
+                    doc = DocxTemplate(temp_io)
+                doc.render(context)
             
-            file_stream = io.BytesIO()
-            doc.save(file_stream)
+            with metrics.stage("save"):
+                file_stream = io.BytesIO()
+                doc.save(file_stream)
+            metrics.observe(metrics.PAYLOAD_BYTES, file_stream.tell(), direction="out")
             file_stream.seek(0)
             return file_stream
         except Exception as e:
             print(f"Template Error Details: {e}")
             raise RuntimeError(f"Error generating DOCX: {e}")
 
+    def resolve_template_path(self, template_style: str = "paragraph") -> str:
+        """Maps a built-in style name to its template file, falling back to cv_template.docx."""
+        actual_path = self.template_path
+        if template_style == "tabular":
+            actual_path = "templates/tabular_template.docx"
+        elif template_style == "tech6":
+            actual_path = "templates/tech6_template.docx"
+        elif template_style == "paragraph":
+            actual_path = "templates/paragraph_template.docx"
+
+        if not os.path.exists(actual_path):
+            actual_path = "templates/cv_template.docx"
+        return actual_path
+
+    def get_compiled_template(self, template_bytes: bytes = None, template_style: str = "paragraph") -> CompiledTemplate:
+        """Returns the parsed, pre-scanned template from the cache, compiling it on first use."""
+        if template_bytes and len(template_bytes) > 0:
+            return self.template_cache.get_for_bytes(template_bytes)
+        return self.template_cache.get_for_path(self.resolve_template_path(template_style))
+
+    def warm_templates(self, styles=("paragraph", "tabular", "tech6")):
+        """Compiles the built-in templates ahead of the first request."""
+        for style in styles:
+            try:
+                self.get_compiled_template(template_style=style)
+            except Exception as e:
+                print(f"Warning: Could not pre-warm '{style}' template: {e}")
+
     def _process_links(self, context, docx):
         """
         Recursively scans the context dictionary for URL strings and converts them
@@ -143,96 +176,65 @@ class DocGenerator:
             else:
                 proj['technologies_str'] = str(tech) if tech else ""
 
-    def _manually_expand_tables(self, docx, context):
+    def _manually_expand_tables(self, docx, context, plan=None):
         """
         Manually expands table rows based on context data using direct DOM manipulation.
         This avoids regex on XML strings and provides stable rendering.
+        The expansion plan (see template_cache.build_expansion_plan) is normally compiled
+        once per template, so stamping a row is just a clone plus slot assignment.
+        Returns the number of rows stamped.
         """
-        import re
-        from copy import deepcopy
-        
         # Pre-process data for simple string replacement
         self._preprocess_context(context)
         
-        LOOP_MARKER_RE = re.compile(r'\[tr\s+for\s+(?P<item>\w+)\s+in\s+(?P<list>\w+)\]', re.IGNORECASE)
+        if plan is None:
+            plan = build_expansion_plan(docx)
         
-        # Iterate over all tables
-        for table in docx.tables:
-            rows_to_process = []
+        tables = docx.tables
+        rows_expanded = 0
+        # Process loop rows bottom-up so earlier row indices stay valid
+        for row_plan in reversed(plan):
+            table = tables[row_plan.table_index]
+            template_tr = table.rows[row_plan.row_index]._tr
+            data_list = context.get(row_plan.list_name, [])
             
-            # limit scan to avoid errors? no, scan all rows.
-            for i, row in enumerate(table.rows):
-                # Robust text extraction
-                try:
-                    row_text = "".join(cell.text for cell in row.cells)
-                except Exception:
-                    continue
-                
-                if "[tr" in row_text.lower():
-                    match = LOOP_MARKER_RE.search(row_text)
-                    if match:
-                        rows_to_process.append((i, match.group('item'), match.group('list')))
+            w_tbl = table._tbl
             
-            # Process found loop rows in reverse order
-            for i, item_name, list_name in reversed(rows_to_process):
-                template_row = table.rows[i]
-                data_list = context.get(list_name, [])
-                
-                w_tbl = table._tbl
-                template_tr = template_row._tr
-                
-                # If no data, remove the template row and continue
-                if not data_list:
-                    w_tbl.remove(template_tr)
-                    continue
-                
-                # Insert index base - crucial fix for row ordering
-                # We need the actual XML index, not the logical row index
-                insert_idx = template_tr.getparent().index(template_tr)
-                
-                for idx, data_item in enumerate(data_list):
-                    # Clone the row element
-                    new_tr = deepcopy(template_tr)
-                    
-                    # Iterate through all text nodes in the cloned row
-                    for node in new_tr.iter():
-                        # looking for w:t tag (text)
-                        if node.tag.endswith('}t') and node.text:
-                            text = node.text
-                            
-                            # 1. Clean Loop Markers
-                            # Simple string replacement is safer than regex on potentially split text 
-                            # if we assume the marker is somewhat intact.
-                            # For robustness, we use a liberal regex just for cleanup
-                            text = re.sub(r'\[tr\s+for.*?\]', '', text, flags=re.IGNORECASE)
-                            text = text.replace('[/tr]', '')
-                            
-                            # 2. Replace S.No
-                            text = text.replace('[[SNO]]', str(idx + 1))
-                            text = text.replace('[[ SNO ]]', str(idx + 1))
-                            
-                            # 3. Replace Variable: {{ item.prop }}
-                            # We look for the pattern {{ item_name . prop }}
-                            prop_pattern = r'\{\{\s*' + re.escape(item_name) + r'\.(\w+)\s*\}\}'
-                            matches = list(re.finditer(prop_pattern, text))
-                            
-                            # Replace in reverse to avoid index issues
-                            for m in reversed(matches):
-                                prop_name = m.group(1)
-                                replacement_val = str(data_item.get(prop_name, ''))
-                                # Replace the specific match span
-                                start, end = m.span()
-                                text = text[:start] + replacement_val + text[end:]
-                            
-                            node.text = text
-                            
-                    # Append the populated row to the table
-                    # We use insert on the custom XML element wrapper
-                    w_tbl.insert(insert_idx + idx, new_tr)
-                
-                # Finally, remove the original template row
+            # If no data, remove the template row and continue
+            if not data_list:
                 w_tbl.remove(template_tr)
+                continue
+            
+            # Insert index base - crucial fix for row ordering
+            # We need the actual XML index, not the logical row index
+            insert_idx = template_tr.getparent().index(template_tr)
+            
+            for idx, data_item in enumerate(data_list):
+                new_tr = stamp_row(template_tr, row_plan.slots, idx + 1, data_item)
+                # Append the populated row to the table
+                # We use insert on the custom XML element wrapper
+                w_tbl.insert(insert_idx + idx, new_tr)
+            rows_expanded += len(data_list)
+            
+            # Finally, remove the original template row
+            w_tbl.remove(template_tr)
+        return rows_expanded
+
+_doc_generator = None
+_doc_generator_lock = threading.Lock()
+
+
+def get_doc_generator() -> DocGenerator:
+    """The process-wide generator, built on first use (also the FastAPI dependency for it)."""
+    global _doc_generator
+    if _doc_generator is None:
+        with _doc_generator_lock:
+            if _doc_generator is None:
+                _doc_generator = DocGenerator()
+    return _doc_generator
 
-doc_generator = DocGenerator()
 
-doc_generator = DocGenerator()
+def __getattr__(name):
+    if name == "doc_generator":
+        return get_doc_generator()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
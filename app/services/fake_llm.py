@@ -0,0 +1,77 @@
+import time
+import random
+import asyncio
+
+DEFAULT_FAKE_REPLY = '{"personal_details": {"name": "Fake Candidate"}}'
+
+
+def _service_unavailable():
+    from google.api_core import exceptions as api_exceptions
+    return api_exceptions.ServiceUnavailable("fake backend overloaded")
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeStream:
+    """Async iterator of FakeResponse chunks, like a streamed generate_content_async reply."""
+
+    def __init__(self, text: str, chunk_chars: int, chunk_latency: float):
+        self.text = text
+        self.chunk_chars = max(1, chunk_chars)
+        self.chunk_latency = chunk_latency
+
+    async def __aiter__(self):
+        for i in range(0, len(self.text), self.chunk_chars):
+            if self.chunk_latency:
+                await asyncio.sleep(self.chunk_latency)
+            yield FakeResponse(self.text[i:i + self.chunk_chars])
+
+
+class FakeGenerativeModel:
+    """
+    Local stand-in for genai.GenerativeModel for tests and load experiments.
+    Injects latency and transient errors: the first fail_first calls fail, then each call
+    fails with probability error_rate. reply may be a string or a function of the prompt.
+    """
+
+    def __init__(self, reply=DEFAULT_FAKE_REPLY, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 fail_first: int = 0, error_factory=None, chunk_chars: int = 64, chunk_latency: float = 0.0, seed: int = None):
+        self.reply = reply
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.fail_first = fail_first
+        self.error_factory = error_factory or _service_unavailable
+        self.chunk_chars = chunk_chars
+        self.chunk_latency = chunk_latency
+        self.calls = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+
+    def _next_outcome(self, prompt):
+        self.calls += 1
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if self.calls <= self.fail_first or self._random.random() < self.error_rate:
+            self.errors += 1
+            return delay, self.error_factory(), None
+        text = self.reply(prompt) if callable(self.reply) else self.reply
+        return delay, None, text
+
+    async def generate_content_async(self, prompt, stream: bool = False, **kwargs):
+        delay, error, text = self._next_outcome(prompt)
+        if delay:
+            await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return FakeStream(text, self.chunk_chars, self.chunk_latency) if stream else FakeResponse(text)
+
+    def generate_content(self, prompt, **kwargs):
+        delay, error, text = self._next_outcome(prompt)
+        if delay:
+            time.sleep(delay)
+        if error is not None:
+            raise error
+        return FakeResponse(text)
@@ -1,27 +1,337 @@
 import os
 import json
-import google.generativeai as genai
+import asyncio
+import threading
 from dotenv import load_dotenv
+from pydantic import ValidationError
 from app.schemas import CVData
+from app.services.response_schema import CV_DATA_ADAPTER, TECH6_FIELDS, cv_response_schema
+from app.services.parse_cache import parse_cache, make_cache_key
+from app.services.pre_extractor import pre_extract_contact_details, known_facts_prompt, merge_known_details, merge_known_fields, guess_name
+from app.services.cv_sections import split_cv_sections
+from app.services.json_stream import JSONSectionDecoder
+from app.services.llm_client import llm_client
+from app.services import metrics
+from app.services.llm_backends import LLMBackend, FakeBackend, RecordReplayBackend, LLM_RECORDINGS_DIR
 
 load_dotenv()
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
+# google.generativeai takes about half a second to import; it is loaded by _load_genai()
+# the first time a Gemini model is built, so importing this module stays cheap.
+genai = None
 
-class GeminiParser:
-    def __init__(self):
+# Which backend answers prompts: gemini, fake (offline), or record / replay / auto (see llm_backends)
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")
+
+# Max in-flight Gemini calls per worker process
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "16"))
+
+# Pull email/phone/profile URLs out locally and tell the model it can skip them
+PRE_EXTRACT_CONTACTS = os.getenv("PRE_EXTRACT_CONTACTS", "1") not in ("0", "false", "False")
+
+# Ask Gemini for JSON constrained by a schema derived from CVData instead of describing it in prose
+GEMINI_JSON_MODE = os.getenv("GEMINI_JSON_MODE", "1") not in ("0", "false", "False")
+
+# Standard-mode CVs at least this long are parsed section by section with concurrent calls.
+# 0 disables the automatic switch; callers can still ask for it explicitly.
+SECTIONED_PARSE_MIN_CHARS = int(os.getenv("SECTIONED_PARSE_MIN_CHARS", "12000"))
+
+# What each section-level call is asked to return (see cv_sections.SECTION_ALIASES)
+SECTION_SCHEMAS = {
+    "personal": ("Contact info, social links, Job Title, DOB, Gender, Address and the professional summary.", '''{
+            "personal_details": {
+                "name": "string", "job_title": "string", "date_of_birth": "string", "gender": "string",
+                "email": "string", "phone": "string", "address": "string", "linkedin": "string",
+                "github": "string", "portfolio": "string", "summary": "string"
+            }
+        }'''),
+    "education": ("Every degree or qualification.", '''{
+            "education": [ { "degree": "string", "institution": "string", "year": "string", "grade": "string" } ]
+        }'''),
+    "experience": ("Every job, with all bullet points and descriptions kept in full.", '''{
+            "experience": [ { "role": "string", "company": "string", "duration": "string", "description": ["string"] } ]
+        }'''),
+    "projects": ("Every project, with its description, technologies and URL when present.", '''{
+            "projects": [ { "name": "string", "description": "string", "technologies": ["string"], "url": "string" } ]
+        }'''),
+    "skills": ("Every skill, tool and technology listed.", '''{
+            "skills": ["string"]
+        }'''),
+    "languages": ("Spoken languages (e.g. English, Spanish) and proficiency.", '''{
+            "languages": [ { "language": "string", "proficiency": "string" } ]
+        }'''),
+    "custom": ("Each heading is its own section (e.g. Certifications, Awards, Interests). Keep URLs.", '''{
+            "custom_sections": [ { "title": "string", "content": ["string"] } ]
+        }'''),
+}
+
+# CVData field each section-level call fills in
+SECTION_FIELDS = {
+    "personal": "personal_details",
+    "education": "education",
+    "experience": "experience",
+    "projects": "projects",
+    "skills": "skills",
+    "languages": "languages",
+    "custom": "custom_sections",
+}
+
+# Bump whenever a prompt or the expected schema changes, so cached parses are not reused.
+PROMPT_VERSION = "2"
+
+def _load_genai():
+    """Imports and configures the Gemini SDK on first use."""
+    global genai
+    if genai is None:
+        import google.generativeai as sdk
+        if GEMINI_API_KEY:
+            sdk.configure(api_key=GEMINI_API_KEY)
+        genai = sdk
+    return genai
+
+
+class GeminiBackend(LLMBackend):
+    """The real thing: google-generativeai models."""
+
+    name = "gemini"
+
+    def __init__(self, model_name: str = 'gemini-2.5-flash'):
         if not GEMINI_API_KEY:
             raise ValueError("GEMINI_API_KEY not found in environment variables")
-        self.model = genai.GenerativeModel('gemini-2.5-flash')
+        self.model_name = model_name
+
+    def create_model(self, generation_config: dict = None):
+        sdk = _load_genai()
+        if generation_config is None:
+            return sdk.GenerativeModel(self.model_name)
+        return sdk.GenerativeModel(self.model_name, generation_config=generation_config)
+
+
+def make_backend(name: str = None) -> LLMBackend:
+    """Builds the backend named by LLM_BACKEND (or name)."""
+    name = name or LLM_BACKEND
+    if name == "fake":
+        return FakeBackend.from_env()
+    if name == "replay":
+        return RecordReplayBackend(None, LLM_RECORDINGS_DIR, mode="replay")
+    if name in ("record", "auto"):
+        return RecordReplayBackend(GeminiBackend(), LLM_RECORDINGS_DIR, mode=name)
+    if name != "gemini":
+        raise ValueError(f"Unknown LLM_BACKEND: {name}")
+    return GeminiBackend()
+
+
+class GeminiParser:
+    def __init__(self, cache=parse_cache, max_concurrency: int = GEMINI_MAX_CONCURRENCY, client=llm_client, backend: LLMBackend = None):
+        self.backend = backend if backend is not None else make_backend()
+        # Retries, rate limiting and circuit breaking for every model call; None calls the SDK directly
+        self.client = client
+        self.model = self._make_model()
+        self.tech6_model = self._make_model(TECH6_FIELDS)
+        self.section_models = {key: self._make_model((field,)) for key, field in SECTION_FIELDS.items()}
+        self.cache = cache
+        self.max_concurrency = max(1, max_concurrency)
+        self._semaphore = None
+        self._semaphore_loop = None
+
+    def _make_model(self, fields=None):
+        generation_config = None
+        if GEMINI_JSON_MODE:
+            generation_config = {
+                "response_mime_type": "application/json",
+                "response_schema": cv_response_schema(fields),
+            }
+        model = self.backend.create_model(generation_config)
+        return self.client.wrap(model) if self.client is not None else model
 
     def parse_cv(self, cv_text: str, tech6: bool = False) -> CVData:
+        """Blocking parse. Prefer parse_cv_async from inside the event loop."""
+        cache_key, cached = self._cache_lookup(cv_text, tech6)
+        if cached is not None:
+            return cached
+
+        known = pre_extract_contact_details(cv_text) if PRE_EXTRACT_CONTACTS else {}
         if tech6:
-            return self._parse_tech6(cv_text)
+            parsed = self._parse_tech6(cv_text, known)
+        else:
+            parsed = self._parse_standard(cv_text, known)
+        merge_known_details(parsed, known)
+
+        self._cache_store(cache_key, parsed)
+        return parsed
+
+    async def parse_cv_async(self, cv_text: str, tech6: bool = False, sectioned: bool = None) -> CVData:
+        """
+        Non-blocking parse for the FastAPI endpoints. Uses the SDK's async generation
+        and never holds more than GEMINI_MAX_CONCURRENCY calls in flight per worker.
+        sectioned=None picks the section-chunked mode for long standard CVs automatically.
+        """
+        sections = self._sections_for(cv_text, tech6, sectioned)
+        if sections:
+            return await self._parse_sectioned_async(cv_text, sections)
+
+        cache_key, cached = self._cache_lookup(cv_text, tech6)
+        if cached is not None:
+            return cached
+
+        known = pre_extract_contact_details(cv_text) if PRE_EXTRACT_CONTACTS else {}
+        prompt = self._tech6_prompt(cv_text, known) if tech6 else self._standard_prompt(cv_text, known)
+        model = self.tech6_model if tech6 else self.model
+        with metrics.stage("llm"):
+            async with self._get_semaphore():
+                response = await model.generate_content_async(prompt)
+        self._record_sizes("tech6" if tech6 else "standard", prompt, response.text)
+        parsed = merge_known_details(self._response_to_cv(response.text, tech6), known)
 
-        prompt = f"""
+        self._cache_store(cache_key, parsed)
+        return parsed
+
+    async def parse_cv_stream(self, cv_text: str, tech6: bool = False):
+        """
+        Streams one parse as it is generated. Yields ("item", field, index, value) and
+        ("section", field, value) events as soon as each top-level value closes in the
+        model's output, then ("result", CVData) once the whole reply has been validated.
+        A cache hit replays the cached CVData as the same sequence of events.
+        """
+        cache_key, cached = self._cache_lookup(cv_text, tech6)
+        if cached is not None:
+            decoder = JSONSectionDecoder()
+            for event in decoder.feed(cached.model_dump_json()):
+                yield event
+            yield ("result", cached)
+            return
+
+        known = pre_extract_contact_details(cv_text) if PRE_EXTRACT_CONTACTS else {}
+        prompt = self._tech6_prompt(cv_text, known) if tech6 else self._standard_prompt(cv_text, known)
+        model = self.tech6_model if tech6 else self.model
+        decoder = JSONSectionDecoder()
+        semaphore = self._get_semaphore()
+        # Unbounded: a reply is one CV's JSON, and the model stream must never wait on the client
+        chunks = asyncio.Queue()
+
+        async def pump():
+            """Owns one concurrency slot for the whole model stream, apart from the client."""
+            try:
+                async with semaphore:
+                    response = await model.generate_content_async(prompt, stream=True)
+                    async for chunk in response:
+                        chunks.put_nowait(chunk.text)
+            except Exception as e:
+                chunks.put_nowait(e)
+            else:
+                chunks.put_nowait(None)
+
+        pump_task = asyncio.create_task(pump())
+        try:
+            # Includes the time the client takes to read each event
+            with metrics.stage("llm_stream"):
+                while (text := await chunks.get()) is not None:
+                    if isinstance(text, Exception):
+                        raise text
+                    for event in decoder.feed(text):
+                        if event[:2] == ("section", "personal_details") and isinstance(event[2], dict):
+                            # Fill in the verified contact fields the model was told to skip, and any it left empty
+                            event = ("section", "personal_details", merge_known_fields(event[2], known))
+                        yield event
+        finally:
+            # A client that disconnects mid-stream closes this generator; stop the model stream too
+            pump_task.cancel()
+        self._record_sizes("stream", prompt, decoder.text)
+
+        parsed = merge_known_details(self._response_to_cv(decoder.text, tech6), known)
+        self._cache_store(cache_key, parsed)
+        yield ("result", parsed)
+
+    def _sections_for(self, cv_text: str, tech6: bool, sectioned: bool):
+        """Sections to parse separately, or None for a single call."""
+        # TECH-6 picks one representative project across the whole CV, so it needs the full text
+        if tech6 or sectioned is False:
+            return None
+        if sectioned is None and (SECTIONED_PARSE_MIN_CHARS <= 0 or len(cv_text) < SECTIONED_PARSE_MIN_CHARS):
+            return None
+        sections = split_cv_sections(cv_text)
+        return sections if len(sections) > 1 else None
+
+    async def _parse_sectioned_async(self, cv_text: str, sections: list) -> CVData:
+        """
+        One smaller call per section, all in flight together, so latency follows the
+        largest section rather than the whole CV. Results are merged into one CVData.
+        """
+        cache_key = make_cache_key(cv_text, "sectioned", PROMPT_VERSION) if self.cache is not None else None
+        cached = self.cache.get(cache_key) if cache_key else None
+        if cached is not None:
+            return cached
+
+        known = pre_extract_contact_details(cv_text) if PRE_EXTRACT_CONTACTS else {}
+
+        async def parse_section(section):
+            prompt = self._section_prompt(section, known if section.key == "personal" else None)
+            async with self._get_semaphore():
+                response = await self.section_models[section.key].generate_content_async(prompt)
+            self._record_sizes("section", prompt, response.text)
+            return self._response_to_dict(response.text)
+
+        with metrics.stage("llm"):
+            results = await asyncio.gather(*(parse_section(section) for section in sections))
+
+        merged = {"personal_details": {}}
+        for result in results:
+            for field, value in result.items():
+                if field == "personal_details" and isinstance(value, dict):
+                    merged["personal_details"].update({k: v for k, v in value.items() if v})
+                elif isinstance(value, list):
+                    merged.setdefault(field, []).extend(value)
+        if not merged["personal_details"].get("name"):
+            merged["personal_details"]["name"] = guess_name(cv_text)
+        try:
+            parsed = merge_known_details(CVData(**merged), known)
+        except Exception as e:
+            print(f"Error merging sectioned Gemini responses: {e}")
+            raise ValueError("Failed to parse CV data from Gemini response")
+
+        self._cache_store(cache_key, parsed)
+        return parsed
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Semaphores are bound to the loop they are first used on; rebuild if the loop changes (e.g. tests)
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    def _cache_lookup(self, cv_text: str, tech6: bool):
+        if self.cache is None:
+            return None, None
+        cache_key = make_cache_key(cv_text, "tech6" if tech6 else "standard", PROMPT_VERSION)
+        return cache_key, self.cache.get(cache_key)
+
+    def _cache_store(self, cache_key, parsed: CVData):
+        if self.cache is not None:
+            self.cache.set(cache_key, parsed)
+
+    def _record_sizes(self, mode: str, prompt: str, response_text: str):
+        metrics.observe(metrics.LLM_PROMPT_CHARS, len(prompt), mode=mode)
+        metrics.observe(metrics.LLM_RESPONSE_CHARS, len(response_text), mode=mode)
+
+    def _parse_standard(self, cv_text: str, known: dict = None) -> CVData:
+        prompt = self._standard_prompt(cv_text, known)
+        with metrics.stage("llm"):
+            response = self.model.generate_content(prompt)
+        self._record_sizes("standard", prompt, response.text)
+        return self._response_to_cv(response.text, tech6=False)
+
+    def _parse_tech6(self, cv_text: str, known: dict = None) -> CVData:
+        prompt = self._tech6_prompt(cv_text, known)
+        with metrics.stage("llm"):
+            response = self.tech6_model.generate_content(prompt)
+        self._record_sizes("tech6", prompt, response.text)
+        return self._response_to_cv(response.text, tech6=True)
+
+    def _standard_prompt(self, cv_text: str, known: dict = None) -> str:
+        return f"""
         You are a highly advanced CV parsing AI. Your goal is to extract EVERY piece of information from the provided CV text without skipping a single detail.
         
         CRITICAL INSTRUCTIONS:
@@ -39,7 +349,7 @@ class GeminiParser:
         
         CV Text:
         {cv_text}
-        
+        {known_facts_prompt(known)}
         Output valid JSON strictly. No markdown formatting.
         Schema:
         {{
@@ -96,19 +406,9 @@ class GeminiParser:
         }}
         """
         
-        response = self.model.generate_content(prompt)
-        try:
-            # Clean up potential markdown code blocks
-            cleaned_response = response.text.replace("```json", "").replace("```", "").strip()
-            data_dict = json.loads(cleaned_response)
-            return CVData(**data_dict)
-        except (json.JSONDecodeError, Exception) as e:
-            print(f"Error parsing Gemini response: {e}")
-            print(f"Raw response: {response.text}")
-            raise ValueError("Failed to parse CV data from Gemini response")
 
-    def _parse_tech6(self, cv_text: str) -> CVData:
-        prompt = f"""
+    def _tech6_prompt(self, cv_text: str, known: dict = None) -> str:
+        return f"""
         You are a Proposal Specialist converting a raw CV into the "FORM TECH-6" format.
 
         **Input CV:**
@@ -135,6 +435,7 @@ class GeminiParser:
            - **Activities**: List specific technical tasks performed.
            - **Location**: Infer city/country.
 
+        {known_facts_prompt(known)}
         **Output JSON Schema:**
         {{
             "personal_details": {{ "name": "...", "date_of_birth": "...", "job_title": "...", "email": "...", "phone": "...", "address": "...", "linkedin": "...", "github": "...", "portfolio": "...", "summary": "..." }},
@@ -160,13 +461,71 @@ class GeminiParser:
             }}
         }}
         """
-        response = self.model.generate_content(prompt)
+
+    def _section_prompt(self, section, known: dict = None) -> str:
+        instructions, schema = SECTION_SCHEMAS[section.key]
+        headings = ", ".join(section.titles) or "header / contact details"
+        return f"""
+        You are a highly advanced CV parsing AI. Below is ONE section of a longer CV ({headings}).
+        Extract EVERY piece of information in it without skipping a single detail. Do not summarize.
+        Focus: {instructions}
+
+        CV Section Text:
+        {section.text}
+        {known_facts_prompt(known)}
+        Output valid JSON strictly. No markdown formatting.
+        Schema:
+        {schema}
+        """
+
+    def _response_to_dict(self, response_text: str) -> dict:
         try:
-            cleaned_response = response.text.replace("```json", "").replace("```", "").strip()
+            cleaned_response = response_text.replace("```json", "").replace("```", "").strip()
             data_dict = json.loads(cleaned_response)
-            return CVData(**data_dict)
-        except Exception as e:
-            print(f"Error parsing Gemini TECH-6 response: {e}")
-            raise ValueError(f"Failed to parse TECH-6 data: {e}")
+        except json.JSONDecodeError as e:
+            print(f"Error parsing Gemini section response: {e}")
+            print(f"Raw response: {response_text}")
+            raise ValueError("Failed to parse CV data from Gemini response")
+        if not isinstance(data_dict, dict):
+            raise ValueError("Failed to parse CV data from Gemini response")
+        return data_dict
+
+    def _response_to_cv(self, response_text: str, tech6: bool) -> CVData:
+        """Validates the reply straight from JSON; fences are only stripped if that fails (plain-text mode)."""
+        try:
+            return CV_DATA_ADAPTER.validate_json(response_text)
+        except ValidationError as e:
+            error = e
+        cleaned_response = response_text.replace("```json", "").replace("```", "").strip()
+        if cleaned_response != response_text:
+            try:
+                return CV_DATA_ADAPTER.validate_json(cleaned_response)
+            except ValidationError as e:
+                error = e
+
+        if tech6:
+            print(f"Error parsing Gemini TECH-6 response: {error}")
+            raise ValueError(f"Failed to parse TECH-6 data: {error}")
+        print(f"Error parsing Gemini response: {error}")
+        print(f"Raw response: {response_text}")
+        raise ValueError("Failed to parse CV data from Gemini response")
+
+_parser_service = None
+_parser_service_lock = threading.Lock()
+
+
+def get_parser_service() -> GeminiParser:
+    """The process-wide parser, built on first use (also the FastAPI dependency for it)."""
+    global _parser_service
+    if _parser_service is None:
+        with _parser_service_lock:
+            if _parser_service is None:
+                _parser_service = GeminiParser()
+    return _parser_service
+
 
-parser_service = GeminiParser()
+def __getattr__(name):
+    # `from app.services.gemini_parser import parser_service` still works, it just builds the parser then
+    if name == "parser_service":
+        return get_parser_service()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,308 @@
+import os
+import json
+import time
+import uuid
+import asyncio
+import sqlite3
+import threading
+from typing import Optional
+from dotenv import load_dotenv
+from app.services.uploads import UploadContent, SpooledUpload, COPY_CHUNK_BYTES
+
+load_dotenv()
+
+# SQLite file holding queued jobs and finished DOCX results; survives restarts
+JOB_STORE_DB = os.getenv("JOB_STORE_DB", "data/jobs.sqlite3")
+# Jobs run concurrently per worker process
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+# Submissions are refused (429) while this many jobs are waiting
+JOB_QUEUE_MAX = int(os.getenv("JOB_QUEUE_MAX", "1000"))
+# Finished jobs and their DOCX are deleted after this long; workers look for them this often
+JOB_RESULT_TTL_SECONDS = float(os.getenv("JOB_RESULT_TTL_SECONDS", "86400"))
+JOB_PURGE_INTERVAL_SECONDS = float(os.getenv("JOB_PURGE_INTERVAL_SECONDS", "300"))
+# A job still "running" after this long was orphaned by a crashed worker and is picked up again
+JOB_STALE_SECONDS = float(os.getenv("JOB_STALE_SECONDS", "900"))
+# A job that keeps getting orphaned (e.g. it crashes the worker) is failed after this many attempts
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+# How often idle workers look for jobs submitted by other processes sharing the store
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "1.0"))
+# On shutdown, running jobs get this long to finish before they are put back in the queue
+JOB_DRAIN_TIMEOUT_SECONDS = float(os.getenv("JOB_DRAIN_TIMEOUT_SECONDS", "30"))
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+FINISHED = (DONE, FAILED)
+
+STATUS_COLUMNS = "id, status, style, template_id, masking, filename, attempts, error, created_at, started_at, finished_at"
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+class JobQueueClosed(Exception):
+    pass
+
+
+class JobStore:
+    """
+    SQLite table of jobs: their inputs until they run, their DOCX once done.
+    WAL mode lets several uvicorn workers on the same host share one store; a job is
+    claimed with a single UPDATE, so only one of them runs it.
+    Calls are blocking; JobQueue runs them in worker threads.
+    """
+
+    def __init__(self, db_path: str = JOB_STORE_DB):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(db_path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY,"
+            " status TEXT NOT NULL,"
+            " style TEXT NOT NULL,"
+            " masking INTEGER NOT NULL,"
+            " filename TEXT NOT NULL,"
+            " content BLOB,"
+            " template BLOB,"
+            " result BLOB,"
+            " headers TEXT,"
+            " error TEXT,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " created_at REAL NOT NULL,"
+            " started_at REAL,"
+            " finished_at REAL,"
+            " template_id TEXT)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at)")
+        columns = {row["name"] for row in self._db.execute("PRAGMA table_info(jobs)")}
+        if "template_id" not in columns:
+            # Stores created before the template registry existed
+            self._db.execute("ALTER TABLE jobs ADD COLUMN template_id TEXT")
+
+    def add(self, filename: str, content: UploadContent, style: str, template: Optional[bytes], masking: bool, template_id: Optional[str] = None) -> str:
+        """Stores a job. Spooled uploads are copied into the BLOB in chunks rather than read into memory."""
+        job_id = uuid.uuid4().hex
+        spooled = isinstance(content, SpooledUpload)
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = self._db.execute(
+                    "INSERT INTO jobs (id, status, style, masking, filename, content, template, template_id, created_at) VALUES (?, ?, ?, ?, ?, zeroblob(?), ?, ?, ?)" if spooled else
+                    "INSERT INTO jobs (id, status, style, masking, filename, content, template, template_id, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (job_id, QUEUED, style, int(masking), filename, content.size if spooled else content, template, template_id, time.time()),
+                )
+                if spooled:
+                    with open(content.path, "rb") as source, self._db.blobopen("jobs", "content", cursor.lastrowid) as blob:
+                        while chunk := source.read(COPY_CHUNK_BYTES):
+                            blob.write(chunk)
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return job_id
+
+    def claim(self) -> Optional[sqlite3.Row]:
+        """Marks the oldest runnable job as running and returns it with its inputs, or None."""
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute(
+                    "SELECT * FROM jobs WHERE status = ? OR (status = ? AND started_at < ?) ORDER BY created_at LIMIT 1",
+                    (QUEUED, RUNNING, now - JOB_STALE_SECONDS),
+                ).fetchone()
+                if row is not None:
+                    self._db.execute("UPDATE jobs SET status = ?, started_at = ?, attempts = attempts + 1 WHERE id = ?", (RUNNING, now, row["id"]))
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        if row is not None and row["attempts"] >= JOB_MAX_ATTEMPTS:
+            self.fail(row["id"], f"Gave up after {row['attempts']} interrupted attempts")
+            return self.claim()
+        return row
+
+    def complete(self, job_id: str, result: bytes, headers: dict):
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, result = ?, headers = ?, content = NULL, template = NULL, finished_at = ? WHERE id = ?",
+                (DONE, result, json.dumps(headers), time.time(), job_id),
+            )
+
+    def fail(self, job_id: str, error: str):
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, error = ?, content = NULL, template = NULL, finished_at = ? WHERE id = ?",
+                (FAILED, error, time.time(), job_id),
+            )
+
+    def requeue(self, job_id: str):
+        """Puts an interrupted job back in the queue; the interrupted attempt does not count."""
+        with self._lock:
+            self._db.execute("UPDATE jobs SET status = ?, started_at = NULL, attempts = attempts - 1 WHERE id = ? AND status = ?", (QUEUED, job_id, RUNNING))
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._db.execute(f"SELECT {STATUS_COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["masking"] = bool(job["masking"])
+        return job
+
+    def result(self, job_id: str) -> Optional[tuple]:
+        """(docx_bytes, headers) of a finished job, or None."""
+        with self._lock:
+            row = self._db.execute("SELECT result, headers FROM jobs WHERE id = ? AND status = ?", (job_id, DONE)).fetchone()
+        return (row["result"], json.loads(row["headers"] or "{}")) if row is not None else None
+
+    def counts(self) -> dict:
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0, **{status: count for status, count in rows}}
+
+    def purge_finished(self, ttl_seconds: float = JOB_RESULT_TTL_SECONDS) -> int:
+        with self._lock:
+            cursor = self._db.execute("DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?", (*FINISHED, time.time() - ttl_seconds))
+        return cursor.rowcount
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class JobQueue:
+    """
+    Runs submitted /process jobs on a fixed number of asyncio workers. Jobs live in a
+    JobStore, so queued jobs survive a restart, and on shutdown drain() lets running jobs
+    finish (or puts them back in the queue) instead of dropping them.
+
+    runner(job_row) -> (docx_bytes, headers) does the actual work; it is set by start().
+    Store calls run in worker threads so SQLite never blocks the event loop. Workers also
+    purge expired jobs every JOB_PURGE_INTERVAL_SECONDS.
+    """
+
+    def __init__(self, db_path: str = JOB_STORE_DB, workers: int = JOB_WORKERS, max_queued: int = JOB_QUEUE_MAX, result_ttl: float = JOB_RESULT_TTL_SECONDS):
+        self.db_path = db_path
+        self.workers = max(1, workers)
+        self.max_queued = max_queued
+        self.result_ttl = result_ttl
+        self.store = None
+        self.runner = None
+        self.accepting = False
+        self.completed = 0
+        self.failed = 0
+        self._tasks = []
+        self._wakeup = None
+        self._finished_events = {}
+        self._next_purge = 0.0
+
+    async def start(self, runner):
+        if self.store is None:
+            # Opened here rather than at import so importing the app stays cheap
+            self.store = await asyncio.to_thread(JobStore, self.db_path)
+        self.runner = runner
+        await self._purge()
+        self._wakeup = asyncio.Event()
+        self.accepting = True
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def submit(self, filename: str, content: UploadContent, style: str = "paragraph", template: Optional[bytes] = None, masking: bool = False, template_id: Optional[str] = None) -> str:
+        if not self.accepting:
+            raise JobQueueClosed("Job queue is not accepting jobs (starting up or shutting down).")
+        if self.max_queued > 0 and (await asyncio.to_thread(self.store.counts))[QUEUED] >= self.max_queued:
+            raise JobQueueFull(f"Too many queued jobs (max {self.max_queued}).")
+        job_id = await asyncio.to_thread(self.store.add, filename, content, style, template, masking, template_id)
+        self._wakeup.set()
+        return job_id
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        return await asyncio.to_thread(self.store.get, job_id)
+
+    async def result(self, job_id: str) -> Optional[tuple]:
+        return await asyncio.to_thread(self.store.result, job_id)
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[dict]:
+        """Long-poll: returns the job once it has finished, or as it is when timeout runs out."""
+        deadline = time.monotonic() + timeout
+        while True:
+            job = await self.get(job_id)
+            remaining = deadline - time.monotonic()
+            if job is None or job["status"] in FINISHED or remaining <= 0:
+                self._finished_events.pop(job_id, None)
+                return job
+            event = self._finished_events.setdefault(job_id, asyncio.Event())
+            # Jobs run by another process sharing the store don't set our event; re-check the store
+            try:
+                await asyncio.wait_for(event.wait(), min(remaining, JOB_POLL_SECONDS))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _purge(self):
+        self._next_purge = time.monotonic() + JOB_PURGE_INTERVAL_SECONDS
+        removed = await asyncio.to_thread(self.store.purge_finished, self.result_ttl)
+        if removed:
+            print(f"Purged {removed} expired jobs")
+
+    async def _work(self):
+        while self.accepting:
+            if time.monotonic() >= self._next_purge:
+                await self._purge()
+            job = await asyncio.to_thread(self.store.claim)
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), JOB_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(job)
+
+    async def _run(self, job):
+        try:
+            result, headers = await self.runner(job)
+        except asyncio.CancelledError:
+            # Shut down mid-job: the next start picks it up again. One quick UPDATE, run
+            # inline so it cannot be cancelled in turn.
+            self.store.requeue(job["id"])
+            raise
+        except Exception as e:
+            await asyncio.to_thread(self.store.fail, job["id"], str(e) or type(e).__name__)
+            self.failed += 1
+        else:
+            await asyncio.to_thread(self.store.complete, job["id"], result, headers)
+            self.completed += 1
+        event = self._finished_events.pop(job["id"], None)
+        if event is not None:
+            event.set()
+
+    async def drain(self, timeout: float = JOB_DRAIN_TIMEOUT_SECONDS):
+        """Stops taking jobs, gives running ones `timeout` seconds, and requeues the rest."""
+        self.accepting = False
+        if self._wakeup is not None:
+            self._wakeup.set()
+        if self._tasks:
+            done, pending = await asyncio.wait(self._tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            self._tasks = []
+
+    def stats(self) -> dict:
+        counts = self.store.counts() if self.store is not None else {}
+        return {
+            "accepting": self.accepting,
+            "workers": self.workers,
+            "max_queued": self.max_queued,
+            "completed": self.completed,
+            "failed": self.failed,
+            **counts,
+        }
+
+
+job_queue = JobQueue()
@@ -0,0 +1,88 @@
+import json
+
+WHITESPACE = " \t\r\n"
+SCALAR_END = ",}]" + WHITESPACE
+
+
+class JSONSectionDecoder:
+    """
+    Incremental decoder for a streamed top-level JSON object such as a CVData reply.
+    Feed it text chunks as they arrive; it returns events as soon as values close:
+    - ("item", field, index, value) for each object inside a top-level array (e.g. one experience entry)
+    - ("section", field, value) for every other top-level value (personal_details, skills, ...)
+    Anything before the opening brace or after the closing one (e.g. markdown fences) is ignored.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.done = False
+        self._pos = 0
+        self._stack = []  # open containers: {"open", "start", "key", "count", "items_emitted"}
+        self._expect_key = False
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._scalar_start = None
+
+    def feed(self, chunk: str) -> list:
+        self.text += chunk
+        events = []
+        text = self.text
+        while self._pos < len(text) and not self.done:
+            i = self._pos
+            c = text[i]
+            self._pos += 1
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._expect_key:
+                        self._stack[-1]["key"] = json.loads(text[self._string_start:i + 1])
+                        self._expect_key = False
+                    else:
+                        self._complete(self._string_start, i + 1, events)
+                continue
+
+            if self._scalar_start is not None:
+                if c not in SCALAR_END:
+                    continue
+                self._complete(self._scalar_start, i, events)
+                self._scalar_start = None
+
+            if not self._stack and c != "{":
+                continue  # preamble before the object
+            if c == '"':
+                self._in_string = True
+                self._string_start = i
+            elif c in "{[":
+                parent_key = self._stack[0]["key"] if self._stack else None
+                self._stack.append({"open": c, "start": i, "key": parent_key, "count": 0, "items_emitted": False})
+                self._expect_key = c == "{"
+            elif c in "}]":
+                container = self._stack.pop()
+                self._expect_key = False
+                self._complete(container["start"], i + 1, events, container)
+            elif c == ",":
+                self._expect_key = self._stack[-1]["open"] == "{"
+            elif c not in WHITESPACE and c != ":":
+                self._scalar_start = i
+        return events
+
+    def _complete(self, start: int, end: int, events: list, container: dict = None):
+        depth = len(self._stack)
+        if depth == 0:
+            self.done = True
+        elif depth == 1:
+            # Arrays whose objects were already streamed one by one are not repeated as a whole
+            if container is None or not container["items_emitted"]:
+                events.append(("section", self._stack[0]["key"], json.loads(self.text[start:end])))
+        elif depth == 2 and self._stack[1]["open"] == "[":
+            array = self._stack[1]
+            if container is not None and container["open"] == "{":
+                events.append(("item", array["key"], array["count"], json.loads(self.text[start:end])))
+                array["items_emitted"] = True
+            array["count"] += 1
@@ -0,0 +1,151 @@
+import os
+import json
+import hashlib
+import threading
+from abc import ABC, abstractmethod
+from dotenv import load_dotenv
+from app.services.fake_llm import FakeGenerativeModel, FakeResponse, FakeStream, DEFAULT_FAKE_REPLY
+
+load_dotenv()
+
+# Where RecordReplayBackend keeps its recordings
+LLM_RECORDINGS_DIR = os.getenv("LLM_RECORDINGS_DIR", "recordings")
+# Fake backend knobs, for offline benchmarks and load tests
+LLM_FAKE_LATENCY_MS = float(os.getenv("LLM_FAKE_LATENCY_MS", "0"))
+LLM_FAKE_JITTER_MS = float(os.getenv("LLM_FAKE_JITTER_MS", "0"))
+LLM_FAKE_ERROR_RATE = float(os.getenv("LLM_FAKE_ERROR_RATE", "0"))
+LLM_FAKE_REPLY_FILE = os.getenv("LLM_FAKE_REPLY_FILE")
+
+
+class LLMBackend(ABC):
+    """
+    Source of model objects for GeminiParser. A model exposes the genai.GenerativeModel
+    surface the parser uses: generate_content(prompt) and
+    generate_content_async(prompt, stream=False), returning replies with a .text attribute
+    (or, when streaming, an async iterator of them).
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def create_model(self, generation_config: dict = None):
+        ...
+
+
+class FakeBackend(LLMBackend):
+    """Offline backend; every model it creates answers with the same reply after an injected delay."""
+
+    name = "fake"
+
+    def __init__(self, **fake_options):
+        self.fake_options = fake_options
+        self.models = []
+
+    @classmethod
+    def from_env(cls):
+        reply = DEFAULT_FAKE_REPLY
+        if LLM_FAKE_REPLY_FILE:
+            with open(LLM_FAKE_REPLY_FILE, encoding="utf-8") as f:
+                reply = f.read()
+        return cls(reply=reply, latency=LLM_FAKE_LATENCY_MS / 1000, jitter=LLM_FAKE_JITTER_MS / 1000, error_rate=LLM_FAKE_ERROR_RATE)
+
+    def create_model(self, generation_config: dict = None):
+        model = FakeGenerativeModel(**self.fake_options)
+        self.models.append(model)
+        return model
+
+
+class RecordingStore:
+    """One JSON file per reply, named by the SHA-256 of the model config and prompt."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def load(self, key: str):
+        try:
+            with open(self.path_for(key), encoding="utf-8") as f:
+                return json.load(f)["text"]
+        except FileNotFoundError:
+            return None
+
+    def save(self, key: str, prompt: str, text: str):
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = self.path_for(key) + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                # The prompt itself holds the CV; only its size is kept for debugging
+                json.dump({"key": key, "prompt_chars": len(prompt), "text": text}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path_for(key))
+
+
+class RecordReplayModel:
+    def __init__(self, inner, store: RecordingStore, mode: str, config_fingerprint: str):
+        self.inner = inner
+        self.store = store
+        self.mode = mode
+        self.config_fingerprint = config_fingerprint
+
+    def recording_key(self, prompt: str) -> str:
+        digest = hashlib.sha256()
+        digest.update(self.config_fingerprint.encode("utf-8"))
+        digest.update(b"\x00")
+        digest.update(prompt.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _replay(self, key: str):
+        if self.mode == "record":
+            return None
+        text = self.store.load(key)
+        if text is None and (self.mode == "replay" or self.inner is None):
+            raise LookupError(f"No recorded LLM reply for prompt {key[:12]} in {self.store.directory}")
+        return text
+
+    def generate_content(self, prompt, **kwargs):
+        key = self.recording_key(prompt)
+        text = self._replay(key)
+        if text is None:
+            text = self.inner.generate_content(prompt, **kwargs).text
+            self.store.save(key, prompt, text)
+        return FakeResponse(text)
+
+    async def generate_content_async(self, prompt, stream: bool = False, **kwargs):
+        key = self.recording_key(prompt)
+        text = self._replay(key)
+        if text is None:
+            if stream:
+                # Record the whole stream, then hand it back in chunks like a replay
+                response = await self.inner.generate_content_async(prompt, stream=True, **kwargs)
+                text = "".join([chunk.text async for chunk in response])
+            else:
+                text = (await self.inner.generate_content_async(prompt, **kwargs)).text
+            self.store.save(key, prompt, text)
+        return FakeStream(text, chunk_chars=64, chunk_latency=0.0) if stream else FakeResponse(text)
+
+
+class RecordReplayBackend(LLMBackend):
+    """
+    Wraps another backend and stores its replies on disk keyed by prompt hash.
+    - "record": always call the inner backend and (over)write the recording
+    - "replay": only serve recordings; a missing one is an error (no inner backend needed)
+    - "auto":   serve recordings, record the ones that are missing
+    """
+
+    name = "record_replay"
+
+    def __init__(self, inner: LLMBackend = None, directory: str = LLM_RECORDINGS_DIR, mode: str = "auto"):
+        if mode not in ("record", "replay", "auto"):
+            raise ValueError(f"Unknown record/replay mode: {mode}")
+        if inner is None and mode != "replay":
+            raise ValueError(f"Record/replay mode '{mode}' needs an inner backend")
+        self.inner = inner
+        self.mode = mode
+        self.store = RecordingStore(directory)
+
+    def create_model(self, generation_config: dict = None):
+        inner_model = self.inner.create_model(generation_config) if self.inner is not None else None
+        fingerprint = json.dumps(generation_config or {}, sort_keys=True, default=str)
+        return RecordReplayModel(inner_model, self.store, self.mode, fingerprint)
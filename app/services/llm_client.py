@@ -0,0 +1,206 @@
+import os
+import time
+import random
+import asyncio
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_BACKOFF_BASE_SECONDS = float(os.getenv("LLM_BACKOFF_BASE_SECONDS", "0.5"))
+LLM_BACKOFF_MAX_SECONDS = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", "8"))
+# Requests per minute this worker may send; set to quota / number of workers. 0 disables the limiter.
+LLM_RATE_LIMIT_RPM = float(os.getenv("LLM_RATE_LIMIT_RPM", "600"))
+LLM_RATE_LIMIT_BURST = int(os.getenv("LLM_RATE_LIMIT_BURST", "20"))
+# Consecutive transient failures that open the circuit, and how long it stays open
+LLM_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("LLM_CIRCUIT_FAILURE_THRESHOLD", "5"))
+LLM_CIRCUIT_RESET_SECONDS = float(os.getenv("LLM_CIRCUIT_RESET_SECONDS", "30"))
+
+# Rate limited, overloaded or timed out: worth another try. Anything else (e.g. 400) is our fault.
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class LLMUnavailableError(Exception):
+    """The model backend is unhealthy (circuit open or retries exhausted). Maps to HTTP 503."""
+
+    def __init__(self, message: str, retry_after: float = LLM_CIRCUIT_RESET_SECONDS):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    return getattr(error, "code", None) in RETRYABLE_STATUS_CODES
+
+
+class TokenBucket:
+    """
+    Token bucket shared by every call in the process. Each call reserves a token up front;
+    when the bucket is empty the reservation goes negative and the caller sleeps off its share,
+    so waiters are served roughly in arrival order instead of racing each other.
+    """
+
+    def __init__(self, rate_per_minute: float = LLM_RATE_LIMIT_RPM, burst: int = LLM_RATE_LIMIT_BURST):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Takes one token and returns how long the caller must wait before using it."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    async def acquire(self):
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def acquire_sync(self):
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+
+class CircuitBreaker:
+    """
+    closed -> open after N consecutive transient failures; open calls fail fast.
+    After reset_seconds one probe call is let through (half-open): success closes
+    the circuit, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = LLM_CIRCUIT_FAILURE_THRESHOLD, reset_seconds: float = LLM_CIRCUIT_RESET_SECONDS):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def before_call(self):
+        with self._lock:
+            if self.state == "closed":
+                return
+            remaining = self._opened_at + self.reset_seconds - time.monotonic()
+            if self.state == "open" and remaining <= 0:
+                self.state = "half_open"
+            if self.state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+            self.rejected += 1
+            raise LLMUnavailableError("LLM backend is unavailable (circuit open); try again later", retry_after=max(1.0, remaining))
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self.state == "half_open" or self._failures >= self.failure_threshold:
+                self.state = "open"
+                self._opened_at = time.monotonic()
+
+
+class LLMClient:
+    """Retry, rate-limit and circuit-breaker policy shared by all model calls in the process."""
+
+    def __init__(self, rate_limiter: TokenBucket = None, breaker: CircuitBreaker = None, max_retries: int = LLM_MAX_RETRIES,
+                 backoff_base: float = LLM_BACKOFF_BASE_SECONDS, backoff_max: float = LLM_BACKOFF_MAX_SECONDS):
+        self.rate_limiter = rate_limiter or TokenBucket()
+        self.breaker = breaker or CircuitBreaker()
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+
+    def wrap(self, model):
+        return ResilientModel(model, self)
+
+    def backoff_delay(self, attempt: int) -> float:
+        # "Full jitter": spreads retries from a burst of failed calls over the whole window
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _on_error(self, error: Exception, attempt: int):
+        """Records a failed attempt; raises if it should not be retried."""
+        if not is_retryable(error):
+            # The backend answered, it just rejected this request
+            self.breaker.record_success()
+            raise error
+        self.failures += 1
+        self.breaker.record_failure()
+        if attempt >= self.max_retries:
+            raise LLMUnavailableError(f"LLM backend failed after {attempt + 1} attempts: {error}") from error
+        self.retries += 1
+
+    async def call_async(self, func, *args, **kwargs):
+        for attempt in range(self.max_retries + 1):
+            self.breaker.before_call()
+            await self.rate_limiter.acquire()
+            self.calls += 1
+            try:
+                result = await func(*args, **kwargs)
+            except Exception as e:
+                self._on_error(e, attempt)
+                await asyncio.sleep(self.backoff_delay(attempt))
+                continue
+            self.breaker.record_success()
+            return result
+
+    def call(self, func, *args, **kwargs):
+        for attempt in range(self.max_retries + 1):
+            self.breaker.before_call()
+            self.rate_limiter.acquire_sync()
+            self.calls += 1
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                self._on_error(e, attempt)
+                time.sleep(self.backoff_delay(attempt))
+                continue
+            self.breaker.record_success()
+            return result
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "failures": self.failures,
+            "circuit_state": self.breaker.state,
+            "circuit_rejected": self.breaker.rejected,
+            "rate_limit_rpm": self.rate_limiter.rate * 60,
+        }
+
+
+class ResilientModel:
+    """Drop-in wrapper for a GenerativeModel whose generate calls go through an LLMClient."""
+
+    def __init__(self, model, client: LLMClient):
+        self.model = model
+        self.client = client
+
+    def generate_content(self, *args, **kwargs):
+        return self.client.call(self.model.generate_content, *args, **kwargs)
+
+    async def generate_content_async(self, *args, **kwargs):
+        # For stream=True only opening the stream is retried; errors mid-stream reach the caller
+        return await self.client.call_async(self.model.generate_content_async, *args, **kwargs)
+
+
+llm_client = LLMClient()
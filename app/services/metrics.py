@@ -0,0 +1,239 @@
+import os
+import time
+import bisect
+import functools
+import threading
+import contextvars
+from contextlib import contextmanager
+
+# Endpoint the current request is serving; stage metrics recorded deeper down are labelled with it.
+# Context variables follow the request into run_in_threadpool, so threaded stages are attributed too.
+current_endpoint = contextvars.ContextVar("current_endpoint", default="other")
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 40.0)
+BYTES_BUCKETS = (1_000, 10_000, 50_000, 100_000, 500_000, 1_000_000, 5_000_000, 20_000_000)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+CHARS_BUCKETS = (500, 2_000, 5_000, 10_000, 25_000, 50_000, 100_000, 200_000)
+MEMORY_BUCKETS = (1 << 20, 4 << 20, 16 << 20, 32 << 20, 64 << 20, 128 << 20, 256 << 20, 512 << 20, 1 << 30)
+
+# How often process RSS is sampled while requests are in flight; 0 samples only at start and end
+MEMORY_SAMPLE_INTERVAL_SECONDS = float(os.getenv("MEMORY_SAMPLE_INTERVAL_SECONDS", "0.05"))
+
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names, values, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(labels.get(name, "") for name in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(labels.get(name, "") for name in self.label_names), 0)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_label_text(self.label_names, key)} {value}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram; observe() is a bisect plus three additions under a lock."""
+
+    def __init__(self, name: str, documentation: str, labels=(), buckets=DURATION_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # label values -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels.get(name, "") for name in self.label_names)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def count(self, **labels) -> int:
+        series = self._series.get(tuple(labels.get(name, "") for name in self.label_names))
+        return sum(series[:-1]) if series else 0
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + ("+Inf",), series[:-1]):
+                    cumulative += count
+                    le = 'le="%s"' % bound
+                    lines.append(f"{self.name}_bucket{_label_text(self.label_names, key, le)} {cumulative}")
+                lines.append(f"{self.name}_sum{_label_text(self.label_names, key)} {series[-1]}")
+                lines.append(f"{self.name}_count{_label_text(self.label_names, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name: str, documentation: str, labels=()) -> Counter:
+        metric = Counter(name, documentation, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, labels=(), buckets=DURATION_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, labels, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+REQUESTS = registry.counter("cv_requests_total", "Requests handled, by endpoint and outcome.", ("endpoint", "outcome"))
+REQUEST_SECONDS = registry.histogram("cv_request_duration_seconds", "End-to-end request duration.", ("endpoint",))
+STAGE_SECONDS = registry.histogram("cv_stage_duration_seconds", "Duration of each pipeline stage.", ("endpoint", "stage"))
+PAYLOAD_BYTES = registry.histogram("cv_payload_bytes", "Bytes read from uploads (in) and returned as documents (out).", ("endpoint", "direction"), BYTES_BUCKETS)
+DOCUMENT_PAGES = registry.histogram("cv_document_pages", "Pages per uploaded PDF.", ("endpoint",), COUNT_BUCKETS)
+ROWS_EXPANDED = registry.counter("cv_rows_expanded_total", "Table rows stamped out by manual loop expansion.", ("endpoint",))
+LLM_PROMPT_CHARS = registry.histogram("cv_llm_prompt_chars", "Characters per LLM prompt.", ("endpoint", "mode"), CHARS_BUCKETS)
+LLM_RESPONSE_CHARS = registry.histogram("cv_llm_response_chars", "Characters per LLM reply.", ("endpoint", "mode"), CHARS_BUCKETS)
+REQUEST_PEAK_MEMORY = registry.histogram(
+    "cv_request_peak_memory_bytes",
+    "Peak process RSS during a request minus RSS at its start. Concurrent requests share the process, so each sees the others' growth too.",
+    ("endpoint",), MEMORY_BUCKETS)
+UPLOADS_SPOOLED = registry.counter("cv_uploads_spooled_total", "Uploads spooled to disk and memory-mapped instead of read into memory.", ("endpoint",))
+UPLOADS_REJECTED = registry.counter("cv_uploads_rejected_total", "Requests refused for a body over UPLOAD_MAX_BYTES.", ("endpoint",))
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss() -> int:
+    """Resident set size of this process in bytes, or 0 where /proc is not available."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+class MemorySampler:
+    """
+    Tracks the RSS high-water mark of every in-flight request. One daemon thread samples
+    RSS every `interval` seconds, and only while at least one request is being tracked.
+    """
+
+    def __init__(self, interval: float = MEMORY_SAMPLE_INTERVAL_SECONDS):
+        self.interval = interval
+        self._windows = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def begin(self) -> list:
+        rss = current_rss()
+        window = [rss, rss]  # [rss at start, peak rss]
+        with self._lock:
+            self._windows[id(window)] = window
+            if self.interval > 0 and self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="memory-sampler", daemon=True)
+                self._thread.start()
+        self._wake.set()
+        return window
+
+    def end(self, window: list) -> int:
+        """Bytes the process grew by, at its peak, while the window was open."""
+        window[1] = max(window[1], current_rss())
+        with self._lock:
+            self._windows.pop(id(window), None)
+        return max(0, window[1] - window[0]) if window[0] else 0
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            rss = current_rss()
+            with self._lock:
+                if not self._windows:
+                    self._wake.clear()
+                    continue
+                for window in self._windows.values():
+                    if rss > window[1]:
+                        window[1] = rss
+            time.sleep(self.interval)
+
+
+memory_sampler = MemorySampler()
+
+
+@contextmanager
+def stage(name: str):
+    """Times one pipeline stage under the current endpoint."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, endpoint=current_endpoint.get(), stage=name)
+
+
+@contextmanager
+def track_request(endpoint: str):
+    """Labels everything recorded inside with `endpoint` and records the request's duration and outcome."""
+    token = current_endpoint.set(endpoint)
+    start = time.perf_counter()
+    memory_window = memory_sampler.begin()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint=endpoint)
+        REQUEST_PEAK_MEMORY.observe(memory_sampler.end(memory_window), endpoint=endpoint)
+        REQUESTS.inc(endpoint=endpoint, outcome=outcome)
+        current_endpoint.reset(token)
+
+
+def timed_endpoint(endpoint: str):
+    """Decorator form of track_request for async FastAPI handlers."""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with track_request(endpoint):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def observe(histogram: Histogram, value: float, **labels):
+    histogram.observe(value, endpoint=current_endpoint.get(), **labels)
+
+
+def count(counter: Counter, amount: float = 1, **labels):
+    counter.inc(amount, endpoint=current_endpoint.get(), **labels)
@@ -0,0 +1,107 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+from dotenv import load_dotenv
+from app.schemas import CVData
+
+load_dotenv()
+
+OUTPUT_CACHE_MAX_ENTRIES = int(os.getenv("OUTPUT_CACHE_MAX_ENTRIES", "512"))
+# Rendered DOCX files are 20-200 KB each
+OUTPUT_CACHE_MAX_BYTES = int(os.getenv("OUTPUT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Bump whenever rendering changes the output for the same inputs, so stale ETags stop matching.
+RENDER_VERSION = "1"
+
+
+def make_output_key(data: CVData, template_key: tuple, style: str, masking: bool) -> str:
+    """
+    Content address for a rendered DOCX: canonical CVData JSON (sorted keys, no whitespace),
+    the compiled template's identity (path + mtime + size, or upload SHA-256), style and
+    masking profile.
+    """
+    digest = hashlib.sha256()
+    for part in (RENDER_VERSION, json.dumps(template_key), style, "contact-details" if masking else "none"):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    canonical = json.dumps(data.model_dump(mode="json"), sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    digest.update(canonical.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def etag_for(key: str) -> str:
+    # Weak: the same inputs give an equivalent document, not necessarily identical bytes
+    return f'W/"{key}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check with weak comparison (RFC 9110, section 13.1.2)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+class OutputCache:
+    """LRU of rendered DOCX bytes bounded by entry count and total size."""
+
+    def __init__(self, max_entries: int = OUTPUT_CACHE_MAX_ENTRIES, max_bytes: int = OUTPUT_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            content = self._entries.get(key)
+            if content is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return content
+
+    def set(self, key: str, content: bytes):
+        with self._lock:
+            if self.max_entries <= 0 or len(content) > self.max_bytes:
+                return
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= len(previous)
+            self._entries[key] = content
+            self._total_bytes += len(content)
+            while len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._total_bytes -= len(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+                "total_bytes": self._total_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+            }
+
+
+output_cache = OutputCache()
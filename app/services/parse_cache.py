@@ -0,0 +1,196 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+from dotenv import load_dotenv
+from app.schemas import CVData
+
+load_dotenv()
+
+PARSE_CACHE_MAX_ENTRIES = int(os.getenv("PARSE_CACHE_MAX_ENTRIES", "256"))
+PARSE_CACHE_TTL_SECONDS = float(os.getenv("PARSE_CACHE_TTL_SECONDS", "86400"))
+# Optional on-disk tier. Leave unset to keep the cache purely in memory.
+PARSE_CACHE_DB = os.getenv("PARSE_CACHE_DB")
+# Disk tier row cap (oldest rows go first; 0 = unbounded) and how many writes pass between purges
+PARSE_CACHE_DB_MAX_ROWS = int(os.getenv("PARSE_CACHE_DB_MAX_ROWS", "10000"))
+PARSE_CACHE_PURGE_EVERY = int(os.getenv("PARSE_CACHE_PURGE_EVERY", "100"))
+
+
+def normalize_cv_text(cv_text: str) -> str:
+    """Collapses whitespace so trivially different extractions share a cache key."""
+    return " ".join(cv_text.split())
+
+
+def make_cache_key(cv_text: str, mode: str, prompt_version: str) -> str:
+    """Content address for a parse: normalized text + parse mode + prompt version."""
+    digest = hashlib.sha256()
+    digest.update(prompt_version.encode("utf-8"))
+    digest.update(b"\x00")
+    digest.update(mode.encode("utf-8"))
+    digest.update(b"\x00")
+    digest.update(normalize_cv_text(cv_text).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """
+    Two-tier cache of parsed CVs.
+    - Memory tier: LRU bounded by entry count, with TTL expiry.
+    - Disk tier (optional): SQLite file that survives restarts and can be
+      shared by several uvicorn workers on the same host. Bounded by row count;
+      expired and excess rows are purged on startup and every purge_every writes.
+    SQLite calls hold their own lock, never the memory tier's.
+    """
+
+    def __init__(self, max_entries: int = PARSE_CACHE_MAX_ENTRIES, ttl_seconds: float = PARSE_CACHE_TTL_SECONDS, db_path: Optional[str] = PARSE_CACHE_DB,
+                 max_rows: int = PARSE_CACHE_DB_MAX_ROWS, purge_every: int = PARSE_CACHE_PURGE_EVERY):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self.max_rows = max_rows
+        self.purge_every = purge_every
+        self._memory = OrderedDict()  # key -> (stored_at, CVData)
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._db = None
+        self._writes = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if db_path:
+            self._init_db()
+
+    def _init_db(self):
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(self.db_path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        # WAL lets several worker processes read while one writes
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS parse_cache ("
+            " key TEXT PRIMARY KEY,"
+            " stored_at REAL NOT NULL,"
+            " data TEXT NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS parse_cache_stored_at ON parse_cache (stored_at)")
+        self._purge_disk()
+
+    def _expired(self, stored_at: float, now: float) -> bool:
+        return self.ttl_seconds > 0 and now - stored_at > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[CVData]:
+        """Returns a private copy of the cached CVData, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                stored_at, data = entry
+                if not self._expired(stored_at, now):
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    # Callers mutate the result (e.g. masking), so never hand out the cached instance
+                    return data.model_copy(deep=True)
+                del self._memory[key]
+
+        row = None
+        if self._db is not None:
+            try:
+                with self._db_lock:
+                    row = self._db.execute("SELECT stored_at, data FROM parse_cache WHERE key = ?", (key,)).fetchone()
+            except sqlite3.Error as e:
+                print(f"Warning: Parse cache disk lookup failed: {e}")
+        if row is not None and not self._expired(row[0], now):
+            data = CVData.model_validate_json(row[1])
+            with self._lock:
+                self._remember(key, row[0], data)
+                self.disk_hits += 1
+            return data.model_copy(deep=True)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, data: CVData):
+        now = time.time()
+        stored = data.model_copy(deep=True)
+        with self._lock:
+            self._remember(key, now, stored)
+            self._writes += 1
+            purge_due = self.purge_every > 0 and self._writes % self.purge_every == 0
+        if self._db is None:
+            return
+        try:
+            with self._db_lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO parse_cache (key, stored_at, data) VALUES (?, ?, ?)",
+                    (key, now, stored.model_dump_json()),
+                )
+        except sqlite3.Error as e:
+            print(f"Warning: Parse cache disk write failed: {e}")
+        if purge_due:
+            self._purge_disk()
+
+    def _remember(self, key: str, stored_at: float, data: CVData):
+        if self.max_entries <= 0:
+            return
+        self._memory[key] = (stored_at, data)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def _purge_disk(self) -> int:
+        """Deletes expired rows, then the oldest rows beyond max_rows. Returns the number removed."""
+        removed = 0
+        try:
+            with self._db_lock:
+                if self.ttl_seconds > 0:
+                    removed += self._db.execute("DELETE FROM parse_cache WHERE stored_at < ?", (time.time() - self.ttl_seconds,)).rowcount
+                if self.max_rows > 0:
+                    removed += self._db.execute(
+                        "DELETE FROM parse_cache WHERE key IN (SELECT key FROM parse_cache ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                        (self.max_rows,),
+                    ).rowcount
+        except sqlite3.Error as e:
+            print(f"Warning: Parse cache disk purge failed: {e}")
+        return removed
+
+    def purge_expired(self) -> int:
+        """Drops expired entries from both tiers and trims the disk tier. Returns the number of disk rows removed."""
+        now = time.time()
+        with self._lock:
+            for key in [k for k, (stored_at, _) in self._memory.items() if self._expired(stored_at, now)]:
+                del self._memory[key]
+        return self._purge_disk() if self._db is not None else 0
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM parse_cache")
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "hits": hits,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "disk_enabled": self._db is not None,
+            }
+
+
+parse_cache = ParseCache()
@@ -0,0 +1,161 @@
+import re
+from app.schemas import CVData, PersonalDetails
+
+EMAIL_RE = re.compile(r'(?<![\w.+-])[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
+PHONE_NUMBER = r'(\+?\(?\d[\d\s().-]{6,}\d)(?![\w])'
+PHONE_RE = re.compile(r'(?<![\w+])' + PHONE_NUMBER)
+# A label counts only when the number follows it directly ("Phone: ...", "Mob. ..."), not "Tel Aviv 2012 - 2016"
+PHONE_LABELLED_RE = re.compile(r'\b(?:phone|mobile|mob|tel|telephone|cell|contact)(?:\s*(?:no|number))?\s*[:.\-]?\s*' + PHONE_NUMBER, re.IGNORECASE)
+YEAR_RANGE_RE = re.compile(r'^\(?\s*(?:19|20)\d{2}\s*[-–.]\s*(?:(?:19|20)\d{2}|\d{2})\s*\)?$')
+# Years or month.year dates on both sides of a separator: "2014 - 2016", "01.2015 - 08.2019"
+DATE_RANGE_RE = re.compile(r'(?<!\d)(?:\d{1,2}[./])?(?:19|20)\d{2}\s*[-–.\s]\s*(?:\d{1,2}[./])?(?:19|20)\d{2}(?!\d)')
+LINK_ANNOTATION_RE = re.compile(r'\[Link:\s*([^\]\s]+)\s*\]')
+URL_RE = re.compile(r'(?:https?://|www\.)[^\s\]\[<>"\')]+|\b(?:[a-z0-9-]+\.)*(?:linkedin\.com|github\.com)/[^\s\]\[<>"\')]+', re.IGNORECASE)
+LINKEDIN_RE = re.compile(r'linkedin\.com/(?:in|pub)/[^\s/?#]+', re.IGNORECASE)
+GITHUB_RE = re.compile(r'github\.com/[A-Za-z0-9-]+/?$', re.IGNORECASE)
+PORTFOLIO_LABEL_RE = re.compile(r'\b(?:portfolio|website|web site|blog|personal site|homepage)\b', re.IGNORECASE)
+PORTFOLIO_HOST_RE = re.compile(r'(?:\.github\.io|behance\.net|dribbble\.com|about\.me|\.vercel\.app|\.netlify\.app)', re.IGNORECASE)
+NAME_LINE_RE = re.compile(r"^[A-Za-z][A-Za-z .'-]{1,60}$")
+
+# Exact matches the model is told to skip and that always win. Other fields (phone, portfolio)
+# are heuristic: the model is asked to confirm them and they only fill fields it left empty.
+VERIFIED_FIELDS = ("email", "linkedin", "github")
+
+
+def _clean_url(url: str) -> str:
+    return url.rstrip('.,;:')
+
+
+def _phone_candidate(match):
+    """The matched number, or None when it is really a date range or has the wrong digit count."""
+    candidate = match.group(1).strip()
+    digits = sum(ch.isdigit() for ch in candidate)
+    if YEAR_RANGE_RE.match(candidate) or DATE_RANGE_RE.search(candidate) or not 8 <= digits <= 15:
+        return None
+    return candidate
+
+
+def _find_phone(cv_text: str):
+    unlabelled = None
+    for line in cv_text.splitlines():
+        for m in PHONE_LABELLED_RE.finditer(line):
+            candidate = _phone_candidate(m)
+            if candidate:
+                return candidate
+        if unlabelled is None:
+            for m in PHONE_RE.finditer(line):
+                candidate = _phone_candidate(m)
+                # Without a label, only accept numbers that look like full international/national numbers
+                if candidate and (candidate.startswith('+') or sum(ch.isdigit() for ch in candidate) >= 10):
+                    unlabelled = candidate
+                    break
+    return unlabelled
+
+
+def _find_urls(cv_text: str):
+    """URLs from [Link: ...] annotations first (they are exact), then from the body text."""
+    urls = [_clean_url(u) for u in LINK_ANNOTATION_RE.findall(cv_text)]
+    stripped = LINK_ANNOTATION_RE.sub(' ', cv_text)
+    urls.extend(_clean_url(m.group(0)) for m in URL_RE.finditer(stripped))
+    unique = []
+    seen = set()
+    for url in urls:
+        if url.lower() not in seen:
+            seen.add(url.lower())
+            unique.append(url)
+    return unique
+
+
+def pre_extract_contact_details(cv_text: str) -> dict:
+    """
+    Deterministically pulls email, phone and LinkedIn/GitHub/portfolio URLs out of the CV text.
+    Returns only the fields that were found, e.g. {"email": "...", "linkedin": "..."}.
+    """
+    found = {}
+
+    urls = _find_urls(cv_text)
+    mailto = next((u[len("mailto:"):] for u in urls if u.lower().startswith("mailto:")), None)
+    email = mailto or next((m.group(0) for m in EMAIL_RE.finditer(cv_text)), None)
+    if email:
+        found["email"] = email
+
+    phone = _find_phone(LINK_ANNOTATION_RE.sub(' ', cv_text))
+    if phone:
+        found["phone"] = phone
+
+    for url in urls:
+        lower = url.lower()
+        if lower.startswith(("mailto:", "tel:")):
+            continue
+        if "linkedin" not in found and LINKEDIN_RE.search(url):
+            found["linkedin"] = url
+        elif "github" not in found and GITHUB_RE.search(url):
+            found["github"] = url
+        elif "portfolio" not in found and PORTFOLIO_HOST_RE.search(url):
+            found["portfolio"] = url
+
+    if "portfolio" not in found:
+        for line in cv_text.splitlines():
+            if PORTFOLIO_LABEL_RE.search(line):
+                m = URL_RE.search(line)
+                if m and "linkedin.com" not in m.group(0).lower() and "github.com" not in m.group(0).lower():
+                    found["portfolio"] = _clean_url(m.group(0))
+                    break
+    return found
+
+
+def guess_name(cv_text: str) -> str:
+    """Best-effort candidate name: the first short line that is only letters and spaces."""
+    for line in cv_text.splitlines()[:10]:
+        line = line.strip()
+        if NAME_LINE_RE.match(line) and 2 <= len(line.split()) <= 5:
+            return line
+    return ""
+
+
+def _facts(known: dict, verified: bool) -> str:
+    return "\n".join(f"        - {field}: {value}" for field, value in known.items() if (field in VERIFIED_FIELDS) == verified)
+
+
+def known_facts_prompt(known: dict) -> str:
+    """
+    Prompt block listing the locally extracted fields: verified ones the model can skip,
+    guesses it should check against the CV.
+    """
+    if not known:
+        return ""
+    prompt = ""
+    verified, guessed = _facts(known, True), _facts(known, False)
+    if verified:
+        prompt += f"""
+        ALREADY EXTRACTED (verified, do not repeat): return null for these personal_details fields; they are merged in afterwards.
+{verified}
+        """
+    if guessed:
+        prompt += f"""
+        DETECTED LOCALLY (unverified): check these personal_details fields against the CV and return the correct value, or null if the CV has none.
+{guessed}
+        """
+    return prompt
+
+
+def merge_known_fields(details: dict, known: dict) -> dict:
+    """personal_details as a dict with verified values written over it and guesses filling empty fields."""
+    merged = dict(details)
+    for field, value in known.items():
+        if field in VERIFIED_FIELDS or not merged.get(field):
+            merged[field] = value
+    return merged
+
+
+def merge_known_details(data: CVData, known: dict) -> CVData:
+    """Merges the locally extracted values into the model's output (see merge_known_fields)."""
+    current = {field: getattr(data.personal_details, field) for field in known}
+    for field, value in merge_known_fields(current, known).items():
+        setattr(data.personal_details, field, value)
+    return data
+
+
+def parse_cv_local(cv_text: str) -> CVData:
+    """Offline parse: only the deterministic contact fields plus a best-effort name."""
+    return CVData(personal_details=PersonalDetails(name=guess_name(cv_text), **pre_extract_contact_details(cv_text)))
@@ -0,0 +1,137 @@
+import io
+import os
+import re
+import uuid
+import pstats
+import cProfile
+import tempfile
+import threading
+from typing import Optional
+from urllib.parse import parse_qs
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Off by default: profiling can only be requested when the server opts in
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "0") not in ("0", "false", "False")
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "cv_profiles"))
+# Oldest artifacts are deleted beyond this many
+PROFILE_MAX_ARTIFACTS = int(os.getenv("PROFILE_MAX_ARTIFACTS", "50"))
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_RE = re.compile(r'^[0-9a-f]{32}$')
+
+
+class RequestProfiler:
+    """
+    Runs opted-in requests under cProfile and keeps each profile as a .prof artifact.
+    On Python 3.12+ cProfile is built on sys.monitoring, which is process-wide: thread-pool
+    work (e.g. rendering via run_in_threadpool) is in the profile, but so is every other
+    request the process handles meanwhile. Profile under low concurrency for a clean
+    picture. Process-pool work (extraction) is not captured. Only one request is profiled
+    at a time.
+    """
+
+    def __init__(self, enabled: bool = PROFILING_ENABLED, directory: str = PROFILE_DIR, max_artifacts: int = PROFILE_MAX_ARTIFACTS):
+        self.enabled = enabled
+        self.directory = directory
+        self.max_artifacts = max_artifacts
+        self._busy = threading.Lock()
+
+    def wants_profile(self, scope) -> bool:
+        """True for requests sent with an "X-Profile: 1" header or a "?profile=1" query flag."""
+        flag = next((value.decode("latin-1") for name, value in scope["headers"] if name == PROFILE_HEADER), None)
+        if flag is None and b"profile" in scope.get("query_string", b""):
+            flag = parse_qs(scope["query_string"].decode("latin-1")).get("profile", [None])[-1]
+        return flag is not None and flag not in ("0", "false", "False", "")
+
+    def start(self) -> Optional[cProfile.Profile]:
+        """Starts a profiler, or returns None if another request is being profiled."""
+        if not self._busy.acquire(blocking=False):
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiling tool (e.g. a debugger or coverage) already owns the hook
+            self._busy.release()
+            return None
+        return profile
+
+    def finish(self, profile: cProfile.Profile, profile_id: str):
+        """Stops the profiler and stores the artifact under profile_id."""
+        try:
+            profile.disable()
+        finally:
+            self._busy.release()
+        os.makedirs(self.directory, exist_ok=True)
+        profile.dump_stats(self.path_for(profile_id))
+        self._prune()
+
+    def path_for(self, profile_id: str) -> str:
+        if not PROFILE_ID_RE.match(profile_id):
+            raise ValueError(f"Invalid profile ID: {profile_id}")
+        return os.path.join(self.directory, f"{profile_id}.prof")
+
+    def exists(self, profile_id: str) -> bool:
+        try:
+            return os.path.exists(self.path_for(profile_id))
+        except ValueError:
+            return False
+
+    def text_report(self, profile_id: str, limit: int = 50, sort: str = "cumulative") -> str:
+        out = io.StringIO()
+        stats = pstats.Stats(self.path_for(profile_id), stream=out)
+        stats.strip_dirs().sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def list_profiles(self) -> list:
+        if not os.path.isdir(self.directory):
+            return []
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".prof") and PROFILE_ID_RE.match(name[:-5]):
+                path = os.path.join(self.directory, name)
+                entries.append({"id": name[:-5], "created": os.path.getmtime(path), "bytes": os.path.getsize(path)})
+        return sorted(entries, key=lambda entry: entry["created"], reverse=True)
+
+    def _prune(self):
+        for entry in self.list_profiles()[self.max_artifacts:]:
+            try:
+                os.remove(self.path_for(entry["id"]))
+            except OSError:
+                pass
+
+
+request_profiler = RequestProfiler()
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that profiles opted-in requests from the first byte received to the last
+    byte sent, and returns the artifact ID in an X-Profile-Id header. When profiling is
+    disabled, or a request does not ask for it, the only cost is one attribute check.
+    """
+
+    def __init__(self, app, profiler: RequestProfiler = None):
+        self.app = app
+        self.profiler = profiler or request_profiler
+
+    async def __call__(self, scope, receive, send):
+        if not self.profiler.enabled or scope["type"] != "http" or not self.profiler.wants_profile(scope):
+            return await self.app(scope, receive, send)
+
+        profile = self.profiler.start()
+        profile_id = uuid.uuid4().hex
+        extra_header = (b"x-profile-id", profile_id.encode()) if profile is not None else (b"x-profile-skipped", b"busy")
+
+        async def send_with_header(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": list(message.get("headers", [])) + [extra_header]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_header)
+        finally:
+            if profile is not None:
+                self.profiler.finish(profile, profile_id)
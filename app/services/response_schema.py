@@ -0,0 +1,47 @@
+from pydantic import TypeAdapter
+from app.schemas import CVData
+
+# Fields the TECH-6 prompt asks for; the rest of CVData stays at its defaults
+TECH6_FIELDS = (
+    "personal_details", "firm_name", "proposed_position", "nationality", "memberships",
+    "education", "training", "countries_of_work", "languages", "experience", "representative_project",
+)
+
+# Keys of the OpenAPI subset that Gemini's response_schema accepts
+SCHEMA_KEYS = ("type", "format", "description", "nullable", "enum", "items", "properties", "required")
+
+CV_DATA_ADAPTER = TypeAdapter(CVData)
+
+
+def _to_gemini_schema(node: dict, defs: dict) -> dict:
+    """Inlines $refs, turns Optional[X] (anyOf X/null) into nullable X and drops unsupported keys."""
+    if "$ref" in node:
+        return _to_gemini_schema(defs[node["$ref"].rsplit("/", 1)[-1]], defs)
+    if "anyOf" in node:
+        variants = [v for v in node["anyOf"] if v.get("type") != "null"]
+        converted = _to_gemini_schema(variants[0], defs)
+        if len(variants) < len(node["anyOf"]):
+            converted["nullable"] = True
+        if "description" in node:
+            converted.setdefault("description", node["description"])
+        return converted
+
+    schema = {key: node[key] for key in SCHEMA_KEYS if key in node}
+    if "items" in schema:
+        schema["items"] = _to_gemini_schema(schema["items"], defs)
+    if "properties" in schema:
+        schema["properties"] = {name: _to_gemini_schema(prop, defs) for name, prop in schema["properties"].items()}
+    return schema
+
+
+def cv_response_schema(fields=None) -> dict:
+    """
+    Gemini response_schema derived from CVData, optionally limited to some top-level fields
+    (e.g. TECH6_FIELDS, or one section's field for section-chunked parsing).
+    """
+    json_schema = CVData.model_json_schema()
+    schema = _to_gemini_schema(json_schema, json_schema.get("$defs", {}))
+    if fields is not None:
+        schema["properties"] = {name: prop for name, prop in schema["properties"].items() if name in fields}
+        schema["required"] = [name for name in schema.get("required", []) if name in fields]
+    return schema
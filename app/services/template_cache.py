@@ -0,0 +1,349 @@
+import io
+import os
+import re
+import copy
+import hashlib
+import zipfile
+import threading
+from collections import OrderedDict, namedtuple
+from docx import Document
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.opc.rel import Relationships
+from docx.oxml.ns import qn
+from dotenv import load_dotenv
+
+load_dotenv()
+
+TEMPLATE_CACHE_MAX_ENTRIES = int(os.getenv("TEMPLATE_CACHE_MAX_ENTRIES", "32"))
+# Cap on the summed uncompressed size of cached templates
+TEMPLATE_CACHE_MAX_BYTES = int(os.getenv("TEMPLATE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+LOOP_MARKER_RE = re.compile(r'\[tr\s+for\s+(?P<item>\w+)\s+in\s+(?P<list>\w+)\]', re.IGNORECASE)
+PLACEHOLDER_RE = re.compile(r'\{\{\s*(.*?)\s*\}\}')
+
+LOOP_MARKER_CLEANUP_RE = re.compile(r'\[tr\s+for.*?\]', re.IGNORECASE)
+
+# Everything that must sit inside a single w:t to be seen by the scanners and by docxtpl
+TEMPLATE_TAG_RE = re.compile(r'\{\{.*?\}\}|\{%.*?%\}|\{#.*?#\}|\[tr\s+for.*?\]|\[/tr\]|\[\[ ?SNO ?\]\]', re.IGNORECASE)
+
+# A table row holding a "[tr for item in list]" marker: docx.tables[table_index].rows[row_index]
+LoopRow = namedtuple("LoopRow", ["table_index", "row_index", "item_name", "list_name"])
+# A loop row plus the text slots to fill in each stamped copy of it
+LoopRowPlan = namedtuple("LoopRowPlan", ["table_index", "row_index", "item_name", "list_name", "slots"])
+# A text node inside the row, addressed by child indices from the <w:tr>, and its text program.
+# Segments are literal strings, SNO_SLOT, or ("prop", name) for {{ item.name }}.
+RowSlot = namedtuple("RowSlot", ["path", "segments"])
+SNO_SLOT = ("sno",)
+
+
+def find_loop_rows(docx) -> list:
+    """Locates every manual loop row in the body tables of a python-docx Document."""
+    loop_rows = []
+    for table_index, table in enumerate(docx.tables):
+        for row_index, row in enumerate(table.rows):
+            # Robust text extraction
+            try:
+                row_text = "".join(cell.text for cell in row.cells)
+            except Exception:
+                continue
+
+            if "[tr" in row_text.lower():
+                match = LOOP_MARKER_RE.search(row_text)
+                if match:
+                    loop_rows.append(LoopRow(table_index, row_index, match.group('item'), match.group('list')))
+    return loop_rows
+
+
+def _compile_text_program(text: str, slot_re) -> tuple:
+    """Splits one w:t text into literal / serial-number / item-property segments."""
+    # Loop markers are static, so they are stripped once here rather than per stamped row
+    text = LOOP_MARKER_CLEANUP_RE.sub('', text).replace('[/tr]', '')
+    segments = []
+    last = 0
+    for m in slot_re.finditer(text):
+        if m.start() > last:
+            segments.append(text[last:m.start()])
+        segments.append(SNO_SLOT if m.group('prop') is None else ("prop", m.group('prop')))
+        last = m.end()
+    if last < len(text):
+        segments.append(text[last:])
+    return tuple(segments)
+
+
+def build_expansion_plan(docx, loop_rows=None) -> list:
+    """
+    Compiles the row-expansion plan: for every loop row, which text nodes change and how.
+    Stamping a row then needs no regex work, only a clone plus direct slot assignment.
+    """
+    if loop_rows is None:
+        loop_rows = find_loop_rows(docx)
+    tables = docx.tables
+    plan = []
+    for loop_row in loop_rows:
+        tr = tables[loop_row.table_index].rows[loop_row.row_index]._tr
+        slot_re = re.compile(
+            r'(?:\[\[SNO\]\]|\[\[ SNO \]\])|\{\{\s*' + re.escape(loop_row.item_name) + r'\.(?P<prop>\w+)\s*\}\}'
+        )
+        slots = []
+        for node in tr.iter():
+            # looking for w:t tag (text)
+            if not isinstance(node.tag, str) or not node.tag.endswith('}t') or not node.text:
+                continue
+            segments = _compile_text_program(node.text, slot_re)
+            if segments == (node.text,):
+                continue  # static text, the clone already carries it
+            path = []
+            child = node
+            while child is not tr:
+                parent = child.getparent()
+                path.append(parent.index(child))
+                child = parent
+            slots.append(RowSlot(tuple(reversed(path)), segments))
+        plan.append(LoopRowPlan(*loop_row, tuple(slots)))
+    return plan
+
+
+def stamp_row(template_tr, slots, sno: int, data_item):
+    """Clones a loop row and fills its slots for one list item."""
+    new_tr = copy.deepcopy(template_tr)
+    sno_text = str(sno)
+    for slot in slots:
+        node = new_tr
+        for index in slot.path:
+            node = node[index]
+        parts = []
+        for segment in slot.segments:
+            if segment.__class__ is str:
+                parts.append(segment)
+            elif segment is SNO_SLOT:
+                parts.append(sno_text)
+            else:
+                parts.append(str(data_item.get(segment[1], '')))
+        node.text = "".join(parts)
+    return new_tr
+
+
+def index_placeholders(docx) -> dict:
+    """Counts the {{ ... }} expressions used in the body, e.g. {'personal_details.name': 1}."""
+    placeholders = {}
+    for node in docx.element.body.iter():
+        if isinstance(node.tag, str) and node.tag.endswith('}t') and node.text and "{{" in node.text:
+            for expression in PLACEHOLDER_RE.findall(node.text):
+                placeholders[expression] = placeholders.get(expression, 0) + 1
+    return placeholders
+
+
+def normalize_split_placeholders(docx) -> int:
+    """
+    Word often splits "{{ item.name }}" over several runs (spell-check, edits, formatting).
+    Moves every tag that spans runs of one paragraph into its first run, so each tag is one
+    w:t and the row planner and placeholder index see it. Returns the number of tags moved.
+    """
+    moved = 0
+    for paragraph in docx.element.body.iter(qn("w:p")):
+        nodes = paragraph.xpath("./w:r/w:t | ./w:hyperlink/w:r/w:t")
+        if len(nodes) < 2:
+            continue
+        texts = [node.text or "" for node in nodes]
+        joined = "".join(texts)
+        if "{" not in joined and "[" not in joined:
+            continue
+        # Last tag first, so the offsets of the earlier ones stay valid
+        for match in reversed(list(TEMPLATE_TAG_RE.finditer(joined))):
+            start, end = match.span()
+            offset, first, last = 0, None, None
+            for index, text in enumerate(texts):
+                if first is None and start < offset + len(text):
+                    first = index
+                if end <= offset + len(text):
+                    last = index
+                    break
+                offset += len(text)
+            if first is None or last is None or first == last:
+                continue
+            offset = sum(len(text) for text in texts[:first])
+            for index in range(first, last + 1):
+                text = texts[index]
+                local_start = max(0, start - offset)
+                local_end = min(len(text), end - offset)
+                offset += len(text)
+                if index == first:
+                    texts[index] = text[:local_start] + match.group(0)
+                elif index == last:
+                    texts[index] = text[local_end:]
+                else:
+                    texts[index] = ""
+            moved += 1
+        for node, text in zip(nodes, texts):
+            if node.text != text:
+                node.text = text
+                node.set(qn("xml:space"), "preserve")
+    return moved
+
+
+def clone_document(docx):
+    """
+    Returns an independent copy of a loaded Document without re-reading the zip.
+    Only the main document body and core properties are deep-copied, because those are
+    the only element trees rendering mutates. Styles, theme, numbering and media are
+    shared read-only with the pristine template. Part and relationship objects are all
+    re-created, so docxtpl can swap header/footer parts or footnote blobs on the copy
+    without touching the original.
+    """
+    source_pkg = docx.part.package
+    new_pkg = copy.copy(source_pkg)
+    new_pkg.__dict__ = {}
+
+    mutable_parts = {docx.part}
+    for rel in source_pkg.rels.values():
+        if rel.reltype == RT.CORE_PROPERTIES and not rel.is_external:
+            mutable_parts.add(rel.target_part)
+
+    parts = list(source_pkg.iter_parts())
+    part_map = {}
+    for part in parts:
+        new_part = copy.copy(part)
+        # Drop lazily cached attributes (rels, settings wrappers, ...) from the shallow copy
+        new_part.__dict__ = {
+            k: v for k, v in part.__dict__.items()
+            if k in ("_partname", "_content_type", "_blob", "_element")
+        }
+        new_part._package = new_pkg
+        if part in mutable_parts:
+            new_part._element = copy.deepcopy(part._element)
+        part_map[part] = new_part
+
+    def clone_rels(rels):
+        new_rels = Relationships(rels._baseURI)
+        for rId, rel in rels.items():
+            target = rel._target if rel.is_external else part_map[rel._target]
+            new_rels.add_relationship(rel.reltype, target, rId, rel.is_external)
+        return new_rels
+
+    new_pkg.__dict__["rels"] = clone_rels(source_pkg.rels)
+    for part, new_part in part_map.items():
+        new_part.__dict__["rels"] = new_part._rels = clone_rels(part.rels)
+
+    if hasattr(new_pkg, "_gather_image_parts"):
+        new_pkg._gather_image_parts()
+    return part_map[docx.part].document
+
+
+class CompiledTemplate:
+    """A parsed and pre-scanned template, cloned cheaply for each render."""
+
+    def __init__(self, key, source_bytes: bytes, label: str = "upload"):
+        self.key = key
+        self.label = label
+        self.source_bytes = source_bytes
+        self.document = Document(io.BytesIO(source_bytes))
+        self.loop_rows = find_loop_rows(self.document)
+        self.expansion_plan = build_expansion_plan(self.document, self.loop_rows)
+        self.placeholders = index_placeholders(self.document)
+        with zipfile.ZipFile(io.BytesIO(source_bytes)) as archive:
+            # Parsed trees are larger than this, but it scales with them and is cheap to get
+            self.size_bytes = len(source_bytes) + sum(info.file_size for info in archive.infolist())
+
+    def clone(self):
+        try:
+            return clone_document(self.document)
+        except Exception as e:
+            print(f"Warning: Template clone failed ({e}), re-reading {self.label}")
+            return Document(io.BytesIO(self.source_bytes))
+
+
+class TemplateCache:
+    """
+    LRU of CompiledTemplate objects bounded by entry count and approximate size.
+    File templates are keyed by path + mtime + size, uploads by SHA-256 of the bytes.
+    """
+
+    def __init__(self, max_entries: int = TEMPLATE_CACHE_MAX_ENTRIES, max_bytes: int = TEMPLATE_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_for_path(self, path: str, compiled: CompiledTemplate = None) -> CompiledTemplate:
+        """compiled, if given, is the file's current content already compiled; it is cached instead of re-reading the file."""
+        stat = os.stat(path)
+        key = ("path", os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+        if compiled is None:
+            with open(path, "rb") as f:
+                compiled = CompiledTemplate(key, f.read(), label=path)
+        else:
+            compiled.key = key
+        return self._store(compiled)
+
+    def get_for_bytes(self, template_bytes: bytes) -> CompiledTemplate:
+        key = ("sha256", hashlib.sha256(template_bytes).hexdigest())
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+        return self._store(CompiledTemplate(key, template_bytes))
+
+    def _lookup(self, key):
+        with self._lock:
+            compiled = self._entries.get(key)
+            if compiled is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return compiled
+
+    def _store(self, compiled: CompiledTemplate) -> CompiledTemplate:
+        with self._lock:
+            if compiled.key in self._entries:
+                return self._entries[compiled.key]
+            # Never cache a single template bigger than the whole budget
+            if self.max_entries <= 0 or compiled.size_bytes > self.max_bytes:
+                return compiled
+            # A file edited in place gets a new key; drop its stale versions right away
+            if compiled.key[0] == "path":
+                for stale in [k for k in self._entries if k[0] == "path" and k[1] == compiled.key[1]]:
+                    self._evict(stale)
+            self._entries[compiled.key] = compiled
+            self._total_bytes += compiled.size_bytes
+            while len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes:
+                self._evict(next(iter(self._entries)))
+                self.evictions += 1
+            return compiled
+
+    def _evict(self, key):
+        compiled = self._entries.pop(key)
+        self._total_bytes -= compiled.size_bytes
+
+    def discard_path(self, path: str):
+        """Drops every cached version of a file template, e.g. once the file is deleted."""
+        path = os.path.abspath(path)
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == "path" and k[1] == path]:
+                self._evict(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "total_bytes": self._total_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+            }
+
+
+template_cache = TemplateCache()
@@ -0,0 +1,154 @@
+import io
+import os
+import re
+import json
+import time
+import hashlib
+import zipfile
+import threading
+from typing import Optional
+import jinja2
+from docx import Document
+from docxtpl import DocxTemplate
+from dotenv import load_dotenv
+from app.services.template_cache import CompiledTemplate, TemplateCache, normalize_split_placeholders, template_cache
+
+load_dotenv()
+
+# Registered templates (normalized DOCX + metadata JSON) live here and survive restarts
+TEMPLATE_REGISTRY_DIR = os.getenv("TEMPLATE_REGISTRY_DIR", "data/templates")
+TEMPLATE_REGISTRY_MAX_TEMPLATES = int(os.getenv("TEMPLATE_REGISTRY_MAX_TEMPLATES", "200"))
+TEMPLATE_UPLOAD_MAX_BYTES = int(os.getenv("TEMPLATE_UPLOAD_MAX_BYTES", str(10 * 1024 * 1024)))
+
+TEMPLATE_ID_RE = re.compile(r'^[0-9a-f]{32}$')
+
+
+class TemplateValidationError(ValueError):
+    pass
+
+
+def check_jinja_syntax(document):
+    """Parses the body as docxtpl would render it, without rendering; raises on a syntax error."""
+    template = DocxTemplate(None)
+    template.docx = document
+    try:
+        jinja2.Environment().parse(template.patch_xml(template.get_xml()))
+    except jinja2.TemplateSyntaxError as e:
+        raise TemplateValidationError(f"Jinja syntax error: {e.message}")
+
+
+def compile_template(template_id: str, content: bytes, label: str) -> tuple:
+    """
+    Validates an uploaded template and compiles it once: split-run tags merged, Jinja syntax
+    checked, loop rows and placeholders indexed. Returns (CompiledTemplate, normalized bytes).
+    """
+    if not zipfile.is_zipfile(io.BytesIO(content)):
+        raise TemplateValidationError("Not a DOCX file.")
+    try:
+        document = Document(io.BytesIO(content))
+    except Exception as e:
+        raise TemplateValidationError(f"Could not open DOCX: {e}")
+    if normalize_split_placeholders(document):
+        # Keep the normalized version, so restarts load it as is
+        buffer = io.BytesIO()
+        document.save(buffer)
+        content = buffer.getvalue()
+    check_jinja_syntax(document)
+    return CompiledTemplate(("registry", template_id), content, label=label), content
+
+
+class TemplateRegistry:
+    """
+    Templates uploaded once and rendered by ID. IDs are content hashes, so registering the
+    same file again returns the existing ID. The files are the source of truth: compiled
+    templates live in the size-bounded TemplateCache and are only served while the files
+    exist, so a delete handled by another worker takes effect here too.
+    """
+
+    def __init__(self, directory: str = TEMPLATE_REGISTRY_DIR, max_templates: int = TEMPLATE_REGISTRY_MAX_TEMPLATES, cache: TemplateCache = template_cache):
+        self.directory = directory
+        self.max_templates = max_templates
+        self.cache = cache
+        self._lock = threading.Lock()
+
+    def _path(self, template_id: str, extension: str) -> str:
+        if not TEMPLATE_ID_RE.match(template_id):
+            raise KeyError(template_id)
+        return os.path.join(self.directory, f"{template_id}.{extension}")
+
+    def register(self, content: bytes, name: str = "") -> dict:
+        template_id = hashlib.sha256(content).hexdigest()[:32]
+        existing = self.describe(template_id)
+        if existing is not None:
+            return existing
+        self._check_capacity()
+
+        compiled, normalized = compile_template(template_id, content, label=name or template_id)
+        info = {
+            "template_id": template_id,
+            "name": name,
+            "created": time.time(),
+            "bytes": len(content),
+            "loop_rows": [{"list": row.list_name, "item": row.item_name} for row in compiled.loop_rows],
+            "placeholders": sorted(compiled.placeholders),
+        }
+        with self._lock:
+            # Checked again under the lock: concurrent uploads must not pass the cap together
+            existing = self.describe(template_id)
+            if existing is not None:
+                return existing
+            self._check_capacity()
+            os.makedirs(self.directory, exist_ok=True)
+            docx_path = self._path(template_id, "docx")
+            with open(docx_path, "wb") as f:
+                f.write(normalized)
+            # Metadata last: its presence marks a complete registration
+            with open(self._path(template_id, "json"), "w", encoding="utf-8") as f:
+                json.dump(info, f)
+            # Compiled once, here; get() serves this object until the file changes or is evicted
+            self.cache.get_for_path(docx_path, compiled)
+        return info
+
+    def _check_capacity(self):
+        if len(self.list()) >= self.max_templates:
+            raise TemplateValidationError(f"Too many registered templates (max {self.max_templates}); delete some first.")
+
+    def get(self, template_id: str) -> CompiledTemplate:
+        """The compiled template; raises KeyError for an unknown or deleted ID."""
+        docx_path = self._path(template_id, "docx")
+        try:
+            if not os.path.exists(self._path(template_id, "json")):
+                raise FileNotFoundError(docx_path)
+            return self.cache.get_for_path(docx_path)
+        except FileNotFoundError:
+            self.cache.discard_path(docx_path)
+            raise KeyError(template_id)
+
+    def describe(self, template_id: str) -> Optional[dict]:
+        try:
+            with open(self._path(template_id, "json"), encoding="utf-8") as f:
+                return json.load(f)
+        except (KeyError, FileNotFoundError):
+            return None
+
+    def list(self) -> list:
+        if not os.path.isdir(self.directory):
+            return []
+        entries = [self.describe(name[:-5]) for name in os.listdir(self.directory) if name.endswith(".json")]
+        return sorted((entry for entry in entries if entry is not None), key=lambda entry: entry["created"], reverse=True)
+
+    def delete(self, template_id: str) -> bool:
+        with self._lock:
+            try:
+                self.cache.discard_path(self._path(template_id, "docx"))
+                os.remove(self._path(template_id, "json"))
+            except (KeyError, FileNotFoundError):
+                return False
+            try:
+                os.remove(self._path(template_id, "docx"))
+            except FileNotFoundError:
+                pass
+        return True
+
+
+template_registry = TemplateRegistry()
@@ -0,0 +1,143 @@
+import os
+import re
+from collections import Counter
+from typing import NamedTuple, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Max CV tokens sent to the model (estimated). 0 disables truncation.
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "24000"))
+# Rough characters-per-token ratio used for estimates; good enough for budgeting English CVs
+CHARS_PER_TOKEN = 4
+# A line at the top or bottom of this many pages is treated as a running header/footer
+REPEATED_LINE_MIN = int(os.getenv("REPEATED_LINE_MIN", "2"))
+# Only this many lines at the top and bottom of each page can be headers, footers or page numbers
+PAGE_EDGE_LINES = 1
+
+# Extractors end each page of a paginated document (PDF) with this character
+PAGE_BREAK = '\f'
+
+PAGE_NUMBER_LINE_RE = re.compile(r'^\s*(?:-\s*)?(?:page\s*)?\d{1,3}(?:\s*(?:of|/)\s*\d{1,3})?(?:\s*-)?\s*$', re.IGNORECASE)
+LINK_ANNOTATION_RE = re.compile(r'[ \t]*\[Link:\s*([^\]\s]+)\s*\][ \t]*')
+INLINE_SPACE_RE = re.compile(r'[ \t\u00a0\u2000-\u200b\u202f\u3000]+')
+BLANK_LINES_RE = re.compile(r'\n{3,}')
+
+
+class CompactionResult(NamedTuple):
+    """Savings count only the lossless cleanup; text cut by the token budget is reported separately."""
+    text: str
+    original_chars: int
+    cleaned_chars: int
+    compacted_chars: int
+    truncated: bool
+
+    @property
+    def saved_chars(self) -> int:
+        return self.original_chars - self.cleaned_chars
+
+    @property
+    def truncated_chars(self) -> int:
+        return self.cleaned_chars - self.compacted_chars
+
+    @property
+    def original_tokens(self) -> int:
+        return estimate_tokens(self.original_chars)
+
+    @property
+    def compacted_tokens(self) -> int:
+        return estimate_tokens(self.compacted_chars)
+
+    @property
+    def saved_tokens(self) -> int:
+        return self.original_tokens - estimate_tokens(self.cleaned_chars)
+
+
+def estimate_tokens(char_count: int) -> int:
+    return -(-char_count // CHARS_PER_TOKEN)
+
+
+def _dedupe_link_annotations(text: str) -> str:
+    """Keeps the first [Link: ...] per URL, and drops it entirely when the URL is already visible."""
+    visible = LINK_ANNOTATION_RE.sub(' ', text)
+    seen = set()
+
+    def keep_first(m):
+        url = m.group(1)
+        if url in seen or url in visible:
+            return ' '
+        seen.add(url)
+        return f' [Link: {url}] '
+
+    return LINK_ANNOTATION_RE.sub(keep_first, text)
+
+
+def _page_edges(lines: list) -> set:
+    """Indexes of the first and last PAGE_EDGE_LINES lines of a page, ignoring blank and link-only lines."""
+    filled = [index for index, line in enumerate(lines) if line and not LINK_ANNOTATION_RE.fullmatch(line)]
+    return set(filled[:PAGE_EDGE_LINES] + filled[-PAGE_EDGE_LINES:])
+
+
+def _drop_page_furniture(pages: list) -> list:
+    """
+    Removes page numbers and running headers/footers (keeping the first copy). Only lines at
+    the edges of a page are candidates, so body lines that merely repeat, such as the same
+    role held at several employers or a bare "5", are kept.
+    """
+    edges = [_page_edges(lines) for lines in pages]
+    counts = Counter(line for lines, indexes in zip(pages, edges) for line in {lines[index] for index in indexes})
+    seen = set()
+    kept = []
+    for lines, indexes in zip(pages, edges):
+        for index, line in enumerate(lines):
+            if index in indexes:
+                if PAGE_NUMBER_LINE_RE.match(line):
+                    continue
+                # Section labels such as "Responsibilities:" legitimately repeat; keep those
+                if counts[line] >= REPEATED_LINE_MIN and len(line) >= 8 and not line.endswith(':'):
+                    if line in seen:
+                        continue
+                    seen.add(line)
+            kept.append(line)
+    return kept
+
+
+def _truncate_to_budget(text: str, token_budget: int):
+    max_chars = token_budget * CHARS_PER_TOKEN
+    if token_budget <= 0 or len(text) <= max_chars:
+        return text, False
+    cut = text.rfind('\n', 0, max_chars)
+    return text[:cut if cut > max_chars // 2 else max_chars].rstrip(), True
+
+
+def compact_cv_text(text: str, token_budget: Optional[int] = None) -> CompactionResult:
+    """
+    Normalizes extracted CV text before it is inlined into a prompt: collapses whitespace
+    and blank lines, drops page numbers and running headers/footers at page edges (text
+    without PAGE_BREAKs is one page), de-duplicates link annotations, then trims to the
+    token budget at a line boundary.
+    """
+    if token_budget is None:
+        token_budget = PROMPT_TOKEN_BUDGET
+    original_chars = len(text)
+
+    compacted = _dedupe_link_annotations(text.replace('\r\n', '\n').replace('\r', '\n'))
+    paginated = PAGE_BREAK in compacted
+    pages = [[INLINE_SPACE_RE.sub(' ', line).strip() for line in page.split('\n')] for page in compacted.rstrip().split(PAGE_BREAK)]
+    lines = _drop_page_furniture(pages) if paginated else pages[0]
+    compacted = BLANK_LINES_RE.sub('\n\n', '\n'.join(lines)).strip()
+    cleaned_chars = len(compacted)
+    compacted, truncated = _truncate_to_budget(compacted, token_budget)
+
+    return CompactionResult(compacted, original_chars, cleaned_chars, len(compacted), truncated)
+
+
+def compaction_headers(result: CompactionResult) -> dict:
+    """Per-request savings, and what the token budget cut, reported to clients as response headers."""
+    return {
+        "X-CV-Text-Chars": str(result.original_chars),
+        "X-CV-Text-Chars-Sent": str(result.compacted_chars),
+        "X-CV-Text-Tokens-Saved": str(result.saved_tokens),
+        "X-CV-Text-Truncated": "1" if result.truncated else "0",
+        "X-CV-Text-Chars-Truncated": str(result.truncated_chars),
+    }
@@ -0,0 +1,125 @@
+import io
+import os
+import json
+import mmap
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import NamedTuple, Union
+from dotenv import load_dotenv
+from fastapi import HTTPException, UploadFile
+from starlette.concurrency import run_in_threadpool
+from app.services import metrics
+
+load_dotenv()
+
+# Largest request body accepted; checked against Content-Length up front and counted while streaming
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(50 * 1024 * 1024)))
+# Uploads up to this size are read into memory; larger ones are spooled to a file and memory-mapped
+UPLOAD_SPOOL_THRESHOLD = int(os.getenv("UPLOAD_SPOOL_THRESHOLD", str(2 * 1024 * 1024)))
+UPLOAD_SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR") or None
+
+COPY_CHUNK_BYTES = 1024 * 1024
+
+# Metric label values for rejected bodies; any other path is counted as "other" so
+# clients cannot create new series by posting to made-up URLs
+UPLOAD_ROUTES = frozenset({"/templates", "/parse", "/parse-stream", "/parse-batch", "/generate", "/generate-batch", "/process", "/jobs"})
+
+
+class SpooledUpload(NamedTuple):
+    """An upload kept on disk. Picklable, so extraction workers open the file themselves."""
+    path: str
+    size: int
+
+
+UploadContent = Union[bytes, SpooledUpload]
+
+
+def content_size(content: UploadContent) -> int:
+    return content.size if isinstance(content, SpooledUpload) else len(content)
+
+
+@contextmanager
+def open_content(content: UploadContent):
+    """
+    Seekable binary stream over upload content without copying it: a BytesIO sharing the
+    bytes, or a read-only memory map of the spooled file (pages are loaded on demand and
+    can be dropped again by the kernel, so they do not count against the heap).
+    """
+    if not isinstance(content, SpooledUpload) or content.size == 0:
+        yield io.BytesIO(b"" if isinstance(content, SpooledUpload) else content)
+        return
+    with open(content.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+        yield view
+
+
+def _spool(source, size: int) -> SpooledUpload:
+    with tempfile.NamedTemporaryFile(prefix="cv_upload_", dir=UPLOAD_SPOOL_DIR, delete=False) as target:
+        shutil.copyfileobj(source, target, COPY_CHUNK_BYTES)
+    return SpooledUpload(target.name, size)
+
+
+async def read_upload(file: UploadFile) -> UploadContent:
+    """
+    Small uploads come back as bytes. Large ones are copied, 1 MB at a time, from the
+    multipart parser's temp file into a named file the extraction workers can map.
+    Pass the result to release_upload() when done.
+    """
+    size = file.size
+    if size is None:
+        file.file.seek(0, os.SEEK_END)
+        size = file.file.tell()
+    await file.seek(0)
+    if size <= UPLOAD_SPOOL_THRESHOLD:
+        return await file.read()
+    metrics.count(metrics.UPLOADS_SPOOLED)
+    return await run_in_threadpool(_spool, file.file, size)
+
+
+def release_upload(content: UploadContent):
+    if isinstance(content, SpooledUpload):
+        try:
+            os.remove(content.path)
+        except OSError:
+            pass
+
+
+class UploadLimitMiddleware:
+    """
+    ASGI middleware that caps request bodies at max_bytes. A declared Content-Length over
+    the cap is answered with 413 before any of the body is read; chunked or understated
+    bodies fail with 413 as soon as the running count passes the cap.
+    """
+
+    def __init__(self, app, max_bytes: int = UPLOAD_MAX_BYTES):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.max_bytes <= 0:
+            return await self.app(scope, receive, send)
+        endpoint = scope["path"] if scope.get("path") in UPLOAD_ROUTES else "other"
+
+        declared = next((value for name, value in scope["headers"] if name == b"content-length"), None)
+        if declared is not None and declared.isdigit() and int(declared) > self.max_bytes:
+            metrics.UPLOADS_REJECTED.inc(endpoint=endpoint)
+            body = json.dumps({"detail": f"Request body larger than {self.max_bytes} bytes."}).encode()
+            await send({"type": "http.response.start", "status": 413, "headers": [
+                (b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()), (b"connection", b"close"),
+            ]})
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    metrics.UPLOADS_REJECTED.inc(endpoint=endpoint)
+                    raise HTTPException(status_code=413, detail=f"Request body larger than {self.max_bytes} bytes.")
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -1,36 +1,158 @@
-import io
+import os
+import sys
+import asyncio
+import threading
+import multiprocessing
+from typing import Iterator, List, NamedTuple, Optional
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import zipfile
 import pypdf
+from lxml import etree
 from fastapi import UploadFile
+from app.services import metrics
+from app.services.uploads import UploadContent, open_content, content_size, read_upload, release_upload
+from app.services.text_compactor import PAGE_BREAK
 
-def extract_text_from_pdf(file_content: bytes) -> str:
+# Worker processes for CPU-bound text extraction. 0 runs extraction inline on the event loop.
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", str(min(4, os.cpu_count() or 1))))
+# PDFs with at least this many pages are split into page ranges and extracted in parallel
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "8"))
+# Pages per range when a PDF is split; ranges are sent one wave per worker count at a time
+PDF_RANGE_PAGES = int(os.getenv("PDF_RANGE_PAGES", "4"))
+# Extraction budgets: only the first PDF_MAX_PAGES pages are read and text stops at
+# PDF_MAX_CHARS characters. 0 means unlimited.
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "40"))
+PDF_MAX_CHARS = int(os.getenv("PDF_MAX_CHARS", "200000"))
+# Skip scanned pages that hold only images (no fonts) without running the text extractor
+PDF_SKIP_IMAGE_ONLY_PAGES = os.getenv("PDF_SKIP_IMAGE_ONLY_PAGES", "1") not in ("0", "false", "False")
+
+# "stream" parses word/document.xml incrementally; "python-docx" forces the full object model
+DOCX_EXTRACTOR = os.getenv("DOCX_EXTRACTOR", "stream")
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+W_P, W_T, W_TAB, W_BR, W_CR = _W + "p", _W + "t", _W + "tab", _W + "br", _W + "cr"
+W_TBL, W_TR, W_TC, W_SDT, W_HYPERLINK = _W + "tbl", _W + "tr", _W + "tc", _W + "sdt", _W + "hyperlink"
+R_ID = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id"
+
+_extraction_pool = None
+_extraction_pool_lock = threading.Lock()
+
+class PdfPageText(NamedTuple):
+    index: int
+    text: str
+    links: List[str]
+
+def _pdf_page_links(page) -> List[str]:
+    """URIs of the link annotations on a page."""
+    links = []
+    # Extract Links from Annotations
+    try:
+        if "/Annots" in page:
+            for annot in page["/Annots"]:
+                obj = annot.get_object()
+                if "/A" in obj and "/URI" in obj["/A"]:
+                    links.append(obj["/A"]["/URI"])
+    except Exception as e:
+        # Ignore annotation errors to strictly preserve text extraction
+        print(f"Warning: Failed to extract annotations from PDF page: {e}")
+    return links
+
+def is_image_only_page(page) -> bool:
+    """
+    Cheap scanned-page check that never decodes the content stream: a page without
+    fonts cannot draw text, so if all it references are images there is nothing to extract.
+    """
+    resources = page.get("/Resources")
+    if resources is None:
+        return False
+    resources = resources.get_object()
+    if resources.get("/Font"):
+        return False
+    xobjects = resources.get("/XObject")
+    if not xobjects:
+        return False
+    # Form XObjects can carry their own fonts, so only pure image pages qualify
+    return all(xobject.get_object().get("/Subtype") == "/Image" for xobject in xobjects.get_object().values())
+
+def iter_pdf_pages(pdf_reader, start: int = 0, stop: Optional[int] = None, skip_image_only: bool = True) -> Iterator[PdfPageText]:
+    """Yields text and links page by page, so callers can stop as soon as they have enough."""
+    page_count = len(pdf_reader.pages)
+    stop = page_count if stop is None else min(stop, page_count)
+    for index in range(start, stop):
+        page = pdf_reader.pages[index]
+        if skip_image_only and is_image_only_page(page):
+            continue
+        yield PdfPageText(index, page.extract_text(), _pdf_page_links(page))
+
+def _collect_pdf_text(pages: Iterator[PdfPageText], max_chars: int) -> str:
+    """Joins page texts (each followed by its links and a PAGE_BREAK) until the character budget is spent."""
+    parts = []
+    total = 0
+    for page in pages:
+        chunk = page.text + "\n" + "".join(f" [Link: {uri}] " for uri in page.links) + PAGE_BREAK
+        if max_chars > 0 and total + len(chunk) >= max_chars:
+            parts.append(chunk[:max_chars - total])
+            break
+        parts.append(chunk)
+        total += len(chunk)
+    return "".join(parts)
+
+def _pdf_budgets(max_pages: Optional[int], max_chars: Optional[int], skip_image_only: Optional[bool]):
+    return (
+        PDF_MAX_PAGES if max_pages is None else max_pages,
+        PDF_MAX_CHARS if max_chars is None else max_chars,
+        PDF_SKIP_IMAGE_ONLY_PAGES if skip_image_only is None else skip_image_only,
+    )
+
+def _page_stop(page_count: int, max_pages: int) -> int:
+    return min(page_count, max_pages) if max_pages > 0 else page_count
+
+def extract_text_from_pdf(file_content: UploadContent, max_pages: Optional[int] = None, max_chars: Optional[int] = None, skip_image_only: Optional[bool] = None) -> str:
     """Extracts text from a PDF file content, including hidden hyperlinks."""
-    pdf_reader = pypdf.PdfReader(io.BytesIO(file_content))
-    text = ""
-    for page in pdf_reader.pages:
-        text += page.extract_text() + "\n"
-        
-        # Extract Links from Annotations
+    max_pages, max_chars, skip_image_only = _pdf_budgets(max_pages, max_chars, skip_image_only)
+    with open_content(file_content) as stream:
+        pdf_reader = pypdf.PdfReader(stream)
+        stop = _page_stop(len(pdf_reader.pages), max_pages)
+        return _collect_pdf_text(iter_pdf_pages(pdf_reader, 0, stop, skip_image_only), max_chars)
+
+def extract_pdf_page_range(file_content: UploadContent, start: int, stop: int, max_chars: int = 0, skip_image_only: bool = True) -> str:
+    """Extracts pages [start, stop) of a PDF. Used to fan a large PDF out across workers."""
+    with open_content(file_content) as stream:
+        pdf_reader = pypdf.PdfReader(stream)
+        return _collect_pdf_text(iter_pdf_pages(pdf_reader, start, stop, skip_image_only), max_chars)
+
+def _extract_pdf_if_small(file_content: UploadContent, min_parallel_pages: int, max_pages: int, max_chars: int, skip_image_only: bool):
+    """
+    Returns (page_count, text), where page_count is already capped by the page budget.
+    Text is None when that is min_parallel_pages or more, so the caller can split the
+    PDF without paying for a second round trip on small files.
+    """
+    with open_content(file_content) as stream:
+        pdf_reader = pypdf.PdfReader(stream)
+        page_count = _page_stop(len(pdf_reader.pages), max_pages)
+        if page_count >= min_parallel_pages:
+            return page_count, None
+        return page_count, _collect_pdf_text(iter_pdf_pages(pdf_reader, 0, page_count, skip_image_only), max_chars)
+
+def extract_text_from_docx(file_content: UploadContent) -> str:
+    """Extracts text from a DOCX file content."""
+    if DOCX_EXTRACTOR == "stream":
         try:
-            if "/Annots" in page:
-                for annot in page["/Annots"]:
-                    obj = annot.get_object()
-                    if "/A" in obj and "/URI" in obj["/A"]:
-                        uri = obj["/A"]["/URI"]
-                        text += f" [Link: {uri}] "
+            return extract_text_from_docx_stream(file_content)
         except Exception as e:
-            # Ignore annotation errors to strictly preserve text extraction
-            print(f"Warning: Failed to extract annotations from PDF page: {e}")
-            
-    return text
+            print(f"Warning: Streaming DOCX extraction failed ({e}), falling back to python-docx")
+    return extract_text_from_docx_python_docx(file_content)
 
-def extract_text_from_docx(file_content: bytes) -> str:
-    """Extracts text from a DOCX file content."""
+def extract_text_from_docx_python_docx(file_content: UploadContent) -> str:
+    """Extracts text from a DOCX file content via the full python-docx object model."""
     # Note: python-docx can extract text, but for simple extraction we might need to write a temporary file 
     # or handle the zip structure if we want to avoid disk writes. 
     # However, python-docx accepts a file-like object.
     from docx import Document
     
-    doc = Document(io.BytesIO(file_content))
+    with open_content(file_content) as stream:
+        doc = Document(stream)
     text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
     
     # Extract text from tables
@@ -46,11 +168,223 @@ def extract_text_from_docx(file_content: bytes) -> str:
                 
     return text
 
+def _docx_main_part_name(archive: zipfile.ZipFile) -> str:
+    """Finds the main document part via the package relationships (usually word/document.xml)."""
+    try:
+        with archive.open("_rels/.rels") as f:
+            for rel in etree.parse(f).getroot():
+                if rel.get("Type", "").endswith("/officeDocument"):
+                    return rel.get("Target").lstrip("/")
+    except KeyError:
+        pass
+    return "word/document.xml"
+
+def _docx_hyperlink_targets(archive: zipfile.ZipFile, part_name: str) -> dict:
+    """Maps relationship ids to external URLs for the given part."""
+    directory, _, filename = part_name.rpartition("/")
+    rels_name = f"{directory}/_rels/{filename}.rels" if directory else f"_rels/{filename}.rels"
+    targets = {}
+    try:
+        with archive.open(rels_name) as f:
+            for rel in etree.parse(f).getroot():
+                if rel.get("TargetMode") == "External" and rel.get("Type", "").endswith("/hyperlink"):
+                    targets[rel.get("Id")] = rel.get("Target")
+    except KeyError:
+        pass
+    return targets
+
+def extract_text_from_docx_stream(file_content: UploadContent) -> str:
+    """
+    Extracts DOCX text by streaming the main document part through an incremental XML
+    parser, without building the python-docx object model. Paragraphs and table rows come
+    out in document order. Each cell is read once, even when it spans several grid columns.
+    Hyperlink targets are recovered from the part's relationships as [Link: ...] markers.
+    """
+    with open_content(file_content) as stream, zipfile.ZipFile(stream) as archive:
+        part_name = _docx_main_part_name(archive)
+        links = _docx_hyperlink_targets(archive, part_name)
+
+        lines = []
+        paragraphs = []   # text buffers of the open <w:p> elements
+        cells = []        # paragraph lists of the open <w:tc> elements
+        rows = []         # cell-text lists of the open <w:tr> elements
+
+        def emit(line):
+            # Text inside a table cell belongs to that cell; everything else is a body line
+            if cells:
+                cells[-1].append(line)
+            else:
+                lines.append(line)
+
+        with archive.open(part_name) as stream:
+            for event, elem in etree.iterparse(stream, events=("start", "end")):
+                tag = elem.tag
+                if event == "start":
+                    if tag == W_P:
+                        paragraphs.append([])
+                    elif tag == W_TC:
+                        cells.append([])
+                    elif tag == W_TR:
+                        rows.append([])
+                    continue
+
+                if tag == W_T:
+                    if paragraphs and elem.text:
+                        paragraphs[-1].append(elem.text)
+                elif tag == W_TAB:
+                    if paragraphs:
+                        paragraphs[-1].append("\t")
+                elif tag in (W_BR, W_CR):
+                    if paragraphs:
+                        paragraphs[-1].append("\n")
+                elif tag == W_HYPERLINK:
+                    url = links.get(elem.get(R_ID))
+                    if url and paragraphs:
+                        paragraphs[-1].append(f" [Link: {url}] ")
+                elif tag == W_P:
+                    emit("".join(paragraphs.pop()))
+                    elem.clear()
+                elif tag == W_TC:
+                    cell_text = "\n".join(cells.pop()).strip()
+                    if cell_text and rows:
+                        rows[-1].append(cell_text)
+                    elem.clear()
+                elif tag == W_TR:
+                    row_text = rows.pop()
+                    if row_text:
+                        emit(" | ".join(row_text))
+                    elem.clear()
+                elif tag == W_TBL or tag == W_SDT:
+                    elem.clear()
+                else:
+                    continue
+                # Drop already-processed siblings so memory stays flat on large documents
+                parent = elem.getparent()
+                if parent is not None and not paragraphs and not cells:
+                    while elem.getprevious() is not None:
+                        del parent[0]
+
+    return "\n".join(lines)
+
+def get_extraction_pool():
+    """Lazily starts the extraction process pool. Returns None when extraction should run inline."""
+    global _extraction_pool
+    if EXTRACTION_WORKERS <= 0:
+        return None
+    with _extraction_pool_lock:
+        if _extraction_pool is None:
+            try:
+                # spawn avoids forking a process that already runs the event loop and its threads
+                _extraction_pool = ProcessPoolExecutor(
+                    max_workers=EXTRACTION_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            except (OSError, ValueError, NotImplementedError) as e:
+                print(f"Warning: Could not start extraction pool, extracting inline: {e}")
+                return None
+        return _extraction_pool
+
+def shutdown_extraction_pool():
+    global _extraction_pool
+    with _extraction_pool_lock:
+        if _extraction_pool is not None:
+            _extraction_pool.shutdown(wait=True, cancel_futures=True)
+            _extraction_pool = None
+
+def _discard_broken_pool(pool):
+    global _extraction_pool
+    with _extraction_pool_lock:
+        if _extraction_pool is pool:
+            _extraction_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+async def run_extraction(func, *args):
+    """Runs an extraction function in the process pool, falling back to inline execution."""
+    pool = get_extraction_pool()
+    if pool is None:
+        return func(*args)
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(pool, func, *args)
+    except BrokenProcessPool as e:
+        print(f"Warning: Extraction pool broke ({e}), retrying inline")
+        _discard_broken_pool(pool)
+        return func(*args)
+
+async def extract_text_from_pdf_async(file_content: UploadContent) -> str:
+    """Off-loop PDF extraction. Large PDFs are split into page ranges extracted in parallel."""
+    # Budgets are resolved here so worker processes see the same values as this one
+    max_pages, max_chars, skip_image_only = _pdf_budgets(None, None, None)
+    if get_extraction_pool() is None:
+        page_count, text = _extract_pdf_if_small(file_content, sys.maxsize, max_pages, max_chars, skip_image_only)
+        metrics.observe(metrics.DOCUMENT_PAGES, page_count)
+        return text
+
+    page_count, text = await run_extraction(
+        _extract_pdf_if_small, file_content, PDF_PARALLEL_MIN_PAGES, max_pages, max_chars, skip_image_only
+    )
+    metrics.observe(metrics.DOCUMENT_PAGES, page_count)
+    if text is not None:
+        return text
+
+    # With a char budget, ranges go out one wave (a range per worker) at a time, each capped
+    # at the budget still unspent, and no wave starts once the budget is reached
+    range_pages = max(1, PDF_RANGE_PAGES)
+    ranges = [(start, min(start + range_pages, page_count)) for start in range(0, page_count, range_pages)]
+    wave_size = max(1, EXTRACTION_WORKERS) if max_chars > 0 else len(ranges)
+    parts = []
+    total = 0
+    for first in range(0, len(ranges), wave_size):
+        remaining = max_chars - total if max_chars > 0 else 0
+        wave = await asyncio.gather(*(
+            run_extraction(extract_pdf_page_range, file_content, start, stop, remaining, skip_image_only)
+            for start, stop in ranges[first:first + wave_size]
+        ))
+        parts.extend(wave)
+        total += sum(len(part) for part in wave)
+        if max_chars > 0 and total >= max_chars:
+            break
+    text = "".join(parts)
+    return text[:max_chars] if max_chars > 0 else text
+
+class ZipChunkSink:
+    """
+    Write-only file object for zipfile. Bytes written by the archive are buffered
+    until drain() hands them to the response, one entry at a time.
+    """
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+async def extract_text_from_bytes(filename: str, content: UploadContent) -> str:
+    """Extracts CV text from upload bytes or a SpooledUpload, by file extension."""
+    metrics.observe(metrics.PAYLOAD_BYTES, content_size(content), direction="in")
+    with metrics.stage("extract"):
+        if filename.lower().endswith(".pdf"):
+            return await extract_text_from_pdf_async(content)
+        elif filename.lower().endswith(".docx"):
+            return await run_extraction(extract_text_from_docx, content)
+        else:
+            raise ValueError("Unsupported file format. Please upload PDF or DOCX.")
+
 async def extract_text_from_upload_file(file: UploadFile) -> str:
-    content = await file.read()
-    if file.filename.lower().endswith(".pdf"):
-        return extract_text_from_pdf(content)
-    elif file.filename.lower().endswith(".docx"):
-        return extract_text_from_docx(content)
-    else:
-        raise ValueError("Unsupported file format. Please upload PDF or DOCX.")
+    with metrics.stage("upload_read"):
+        content = await read_upload(file)
+    try:
+        return await extract_text_from_bytes(file.filename, content)
+    finally:
+        release_upload(content)
@@ -0,0 +1,74 @@
+"""
+DOCX text extraction benchmark on large, table-heavy CVs: the streaming extractor
+(default) vs. the python-docx object model it replaced.
+
+Run from the repository root:
+    python -m benchmarks.bench_docx_extract --tables 20 --rows 40 --runs 5
+"""
+import os
+import io
+import sys
+import json
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document
+from app.utils import extract_text_from_docx_stream, extract_text_from_docx_python_docx
+
+
+def table_heavy_docx(tables: int = 20, rows: int = 40, cols: int = 5) -> bytes:
+    """A CV made mostly of employment/project tables, with a merged cell per row."""
+    doc = Document()
+    doc.add_heading("Table Heavy Candidate", 0)
+    for t in range(tables):
+        doc.add_heading(f"Section {t}", level=1)
+        table = doc.add_table(rows=rows, cols=cols)
+        for r, row in enumerate(table.rows):
+            for c, cell in enumerate(row.cells):
+                cell.text = f"Item {t}.{r}.{c} delivered with Python and SQL"
+        for r in range(1, rows, 2):
+            # Horizontally merged cells are the case python-docx handles quadratically
+            table.cell(r, 1).merge(table.cell(r, cols - 1))
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+def time_extractor(extract, content: bytes, runs: int) -> float:
+    extract(content)
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        extract(content)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def run(tables: int = 20, rows: int = 40, runs: int = 5) -> dict:
+    content = table_heavy_docx(tables, rows)
+    python_docx_ms = time_extractor(extract_text_from_docx_python_docx, content, runs)
+    stream_ms = time_extractor(extract_text_from_docx_stream, content, runs)
+    return {
+        "docx_bytes": len(content),
+        "tables": tables,
+        "rows_per_table": rows,
+        "python_docx_median_ms": round(python_docx_ms, 2),
+        "stream_median_ms": round(stream_ms, 2),
+        "speedup": round(python_docx_ms / stream_ms, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tables", type=int, default=20)
+    parser.add_argument("--rows", type=int, default=40)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps(run(args.tables, args.rows, args.runs), indent=2))
+
+
+if __name__ == "__main__":
+    main()
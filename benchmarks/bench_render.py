@@ -0,0 +1,116 @@
+"""
+Per-style render benchmark: single-pass rendering vs. the legacy path that saves the
+expanded Document and re-parses it before the Jinja render.
+
+Run from the repository root:
+    python -m benchmarks.bench_render --runs 20 --jobs 15
+"""
+import os
+import io
+import sys
+import json
+import time
+import argparse
+import tempfile
+import contextlib
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.schemas import CVData
+from app.services.doc_generator import DocGenerator
+from app.services.template_cache import TemplateCache
+
+STYLES = ("paragraph", "tabular", "tech6")
+
+
+def build_builtin_templates() -> dict:
+    """Generates the built-in templates into a temp dir and returns {style: bytes}."""
+    import generate_template
+    import generate_tech6_template
+
+    templates = {}
+    with tempfile.TemporaryDirectory() as tmp, contextlib.chdir(tmp):
+        os.makedirs("templates")
+        generate_template.create_paragraph_template()
+        generate_template.create_tabular_template()
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_tech6_template.create_tech6_template()
+        for style in STYLES:
+            with open(f"templates/{style}_template.docx", "rb") as f:
+                templates[style] = f.read()
+    return templates
+
+
+def sample_cv(jobs: int = 10) -> CVData:
+    return CVData(
+        personal_details={
+            "name": "Benchmark Candidate",
+            "job_title": "Senior Engineer",
+            "email": "bench@example.com",
+            "linkedin": "linkedin.com/in/bench",
+            "summary": "Engineer with a long career. Portfolio at https://bench.dev",
+        },
+        firm_name="Bench Consulting",
+        proposed_position="Team Leader",
+        education=[{"degree": f"Degree {i}", "institution": f"University {i}", "year": str(2000 + i)} for i in range(3)],
+        experience=[
+            {
+                "role": f"Engineer {i}",
+                "company": f"Company {i}",
+                "duration": f"{2000 + i} - {2001 + i}",
+                "description": [f"Delivered project {i}.{j}, see https://example.com/{i}/{j}" for j in range(4)],
+            }
+            for i in range(jobs)
+        ],
+        projects=[{"name": f"Project {i}", "description": f"Built thing {i}", "technologies": ["Python", "SQL"]} for i in range(jobs // 2)],
+        skills=["Python", "FastAPI", "SQL", "Docker"],
+        languages=[{"language": "English", "proficiency": "Excellent"}],
+    )
+
+
+def time_renders(generator: DocGenerator, data: CVData, template_bytes: bytes, runs: int) -> list:
+    generator.generate_docx(data, template_bytes=template_bytes)  # warm the template cache
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        generator.generate_docx(data, template_bytes=template_bytes)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def run(runs: int = 20, jobs: int = 10) -> dict:
+    templates = build_builtin_templates()
+    data = sample_cv(jobs)
+    results = {}
+    for style in STYLES:
+        legacy = time_renders(DocGenerator(cache=TemplateCache(), single_pass=False), data, templates[style], runs)
+        single = time_renders(DocGenerator(cache=TemplateCache(), single_pass=True), data, templates[style], runs)
+        legacy_ms, single_ms = statistics.median(legacy), statistics.median(single)
+        results[style] = {
+            "legacy_median_ms": round(legacy_ms, 2),
+            "single_pass_median_ms": round(single_ms, 2),
+            "saved_ms": round(legacy_ms - single_ms, 2),
+            "saved_pct": round(100 * (legacy_ms - single_ms) / legacy_ms, 1),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--jobs", type=int, default=10, help="experience entries in the sample CV")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    results = run(args.runs, args.jobs)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'style':<10} {'legacy ms':>10} {'single ms':>10} {'saved':>8}")
+    for style, r in results.items():
+        print(f"{style:<10} {r['legacy_median_ms']:>10} {r['single_pass_median_ms']:>10} {r['saved_pct']:>7}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Cold-start benchmark: how long a fresh interpreter takes to import app.main and answer
+its first GET /, with a per-module breakdown from `python -X importtime`.
+
+Run from the repository root:
+    python -m benchmarks.bench_startup                      # compare with benchmarks/startup_baseline.json
+    python -m benchmarks.bench_startup --runs 10 --top 25   # longer breakdown
+    python -m benchmarks.bench_startup --update-baseline    # after an intended change
+
+Exits with status 1 when a module that must load lazily (LAZY_MODULES) is imported by
+app.main, or when a timing is slower than the baseline beyond --tolerance and --min-delta-ms.
+"""
+import os
+import sys
+import json
+import platform
+import argparse
+import statistics
+import subprocess
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.run_suite import compare
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup_baseline.json")
+
+# SDKs that only the LLM path needs; importing app.main must not pull them in
+LAZY_MODULES = ("google.generativeai", "google.api_core")
+
+# Runs in the child interpreter; prints the timings as JSON on stdout
+CHILD = """
+import json, time
+start = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+TestClient(app.main.app).get("/")
+print(json.dumps({"import_ms": (imported - start) * 1000, "first_response_ms": (time.perf_counter() - start) * 1000}))
+"""
+
+
+def parse_importtime(stderr: str) -> dict:
+    """{module: (self_us, cumulative_us, depth)} from -X importtime output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        modules[name.strip()] = (int(self_us), int(cumulative_us), depth)
+    return modules
+
+
+def cold_start() -> tuple:
+    """One fresh interpreter: (timings dict, importtime modules)."""
+    env = {**os.environ, "PYTHONPATH": ROOT}
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", CHILD], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    return json.loads(proc.stdout.strip().splitlines()[-1]), parse_importtime(proc.stderr)
+
+
+def _summary(values: list) -> dict:
+    values = sorted(values)
+    return {
+        "median_ms": round(statistics.median(values), 3),
+        "p95_ms": round(values[min(len(values) - 1, int(0.95 * len(values)))], 3),
+        "min_ms": round(values[0], 3),
+        "runs": len(values),
+    }
+
+
+def run(runs: int = 5) -> dict:
+    timings = {"import_ms": [], "first_response_ms": []}
+    breakdown = {}
+    lazy_violations = set()
+    for _ in range(runs):
+        result, modules = cold_start()
+        for key in timings:
+            timings[key].append(result[key])
+        # Direct imports of app.main (depth 1) plus every app.* module, by cumulative time
+        for name, (_, cumulative_us, depth) in modules.items():
+            if depth == 1 or name.startswith("app."):
+                breakdown.setdefault(name, []).append(cumulative_us / 1000)
+        lazy_violations.update(name for name in modules if name.startswith(LAZY_MODULES))
+
+    results = {
+        "import[app.main]": _summary(timings["import_ms"]),
+        "first_response[/]": _summary(timings["first_response_ms"]),
+    }
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "runs": runs,
+        },
+        "results": results,
+        "breakdown": {name: _summary(values) for name, values in breakdown.items()},
+        "lazy_violations": sorted(lazy_violations),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="modules to show in the import breakdown")
+    parser.add_argument("--output", help="write the results JSON here")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="overwrite the baseline with this run")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown (0.25 = 25%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=50.0, help="ignore slowdowns smaller than this")
+    args = parser.parse_args()
+
+    current = run(args.runs)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+
+    print(f"{'module (cumulative import time)':<44} {'median ms':>10}")
+    ranked = sorted(current["breakdown"].items(), key=lambda item: item[1]["median_ms"], reverse=True)
+    for name, summary in ranked[:args.top]:
+        print(f"{name:<44} {summary['median_ms']:>10}")
+    print()
+
+    status = 0
+    if current["lazy_violations"]:
+        print(f"Imported at startup but must load lazily: {', '.join(current['lazy_violations'])}\n")
+        status = 1
+
+    if args.update_baseline or not os.path.exists(args.baseline):
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"meta": current["meta"], "results": current["results"]}, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return status
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    rows = compare(current, baseline, args.tolerance, args.min_delta_ms)
+    print(f"{'stage':<34} {'baseline ms':>12} {'current ms':>11} {'ratio':>7}  status")
+    for stage, old, new, ratio, row_status in rows:
+        print(f"{stage:<34} {old if old is not None else '-':>12} {new if new is not None else '-':>11} {ratio if ratio is not None else '-':>7}  {row_status}")
+    regressions = [row for row in rows if row[4] == "REGRESSION"]
+    if regressions:
+        print(f"\n{len(regressions)} timing(s) slower than baseline by more than {args.tolerance:.0%}")
+        status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
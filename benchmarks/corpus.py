@@ -0,0 +1,182 @@
+"""
+Synthetic CV corpus: structured CVData plus matching PDF and DOCX files of configurable
+size (pages, jobs, table rows, links). Everything is deterministic for a given seed.
+
+Write a corpus to disk from the repository root:
+    python -m benchmarks.corpus --out /tmp/cv_corpus --count 10 --jobs 15 --pages 4
+"""
+import os
+import io
+import sys
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from app.schemas import CVData
+
+COMPANIES = ("Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark", "Wayne", "Wonka")
+ROLES = ("Engineer", "Senior Engineer", "Tech Lead", "Architect", "Consultant", "Manager")
+SKILLS = ("Python", "FastAPI", "SQL", "Docker", "Kubernetes", "AWS", "React", "Go", "Terraform", "Kafka")
+
+
+def synthetic_cv_data(jobs: int = 10, links: int = 4, seed: int = 0) -> CVData:
+    """A CVData with `jobs` experience entries, each carrying `links` URLs in its bullets."""
+    rng = random.Random(seed)
+    name = f"Candidate {seed:03d}"
+    return CVData(
+        personal_details={
+            "name": name,
+            "job_title": rng.choice(ROLES),
+            "email": f"candidate{seed}@example.com",
+            "phone": f"+1 555 {rng.randint(100, 999)} {rng.randint(1000, 9999)}",
+            "linkedin": f"https://www.linkedin.com/in/candidate{seed}",
+            "github": f"https://github.com/candidate{seed}",
+            "summary": f"Engineer with {jobs} roles. Portfolio at https://candidate{seed}.dev",
+        },
+        firm_name="Bench Consulting",
+        proposed_position="Team Leader",
+        nationality="Indian",
+        education=[{"degree": f"Degree {i}", "institution": f"University {i}", "year": str(2000 + i)} for i in range(3)],
+        training=[{"title": f"Course {i}", "start_date": f"Jan {2010 + i}", "end_date": f"Mar {2010 + i}"} for i in range(2)],
+        countries_of_work=["India", "Vietnam"],
+        experience=[
+            {
+                "role": rng.choice(ROLES),
+                "company": f"{rng.choice(COMPANIES)} {i}",
+                "duration": f"{2000 + i} - {2001 + i}",
+                "description": [f"Delivered project {i}.{j}, see https://example.com/{i}/{j}" if j < links else f"Owned workstream {i}.{j}" for j in range(max(4, links))],
+            }
+            for i in range(jobs)
+        ],
+        representative_project={
+            "name": "Platform Rebuild", "year": "2020-2022", "location": "Pune, India", "client": "Acme",
+            "main_features": "Rebuilt the platform.", "positions_held": "Lead", "activities": "Design, delivery.",
+        },
+        projects=[{"name": f"Project {i}", "description": f"Built thing {i}", "technologies": rng.sample(SKILLS, 3), "url": f"https://example.com/p/{i}"} for i in range(max(1, jobs // 2))],
+        skills=list(SKILLS),
+        languages=[{"language": "English", "proficiency": "Excellent"}],
+    )
+
+
+def cv_text_lines(data: CVData) -> list:
+    """The CV as it would read once extracted: headings, contact lines, bullets."""
+    p = data.personal_details
+    lines = [p.name, p.job_title or "", f"Email: {p.email} | Phone: {p.phone}", p.linkedin or "", "Summary", p.summary or "", "Experience"]
+    for job in data.experience:
+        lines.append(f"{job.role} - {job.company} ({job.duration})")
+        lines.extend(f"- {bullet}" for bullet in job.description)
+    lines.append("Education")
+    lines.extend(f"{e.degree}, {e.institution} {e.year}" for e in data.education)
+    lines.append("Projects")
+    lines.extend(f"{pr.name}: {pr.description} ({', '.join(pr.technologies)})" for pr in data.projects)
+    lines.append("Skills")
+    lines.append(", ".join(data.skills))
+    return lines
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(lines: list, pages: int = 2, links_per_page: int = 2) -> bytes:
+    """Spreads the lines over `pages` pages of Helvetica text, with URI link annotations on each page."""
+    per_page = max(1, -(-len(lines) // max(1, pages)))
+    chunks = [lines[i:i + per_page] for i in range(0, per_page * pages, per_page)]
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for page_number, chunk in enumerate(chunks, start=1):
+        ops = ["BT /F1 10 Tf 14 TL 50 760 Td"]
+        ops.extend(f"({_pdf_escape(line)}) '" for line in chunk)
+        ops.append("ET")
+        stream = "\n".join(ops)
+        annots = " ".join(
+            f"<< /Type /Annot /Subtype /Link /Rect [50 {700 - 20 * i} 200 {712 - 20 * i}] /A << /S /URI /URI (https://example.com/page{page_number}/link{i}) >> >>"
+            for i in range(links_per_page)
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> /Annots [{annots}] /Contents {len(objects)} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1", "replace")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    return out
+
+
+def _add_hyperlink(paragraph, url: str, text: str):
+    r_id = paragraph.part.relate_to(url, RT.HYPERLINK, is_external=True)
+    hyperlink = OxmlElement("w:hyperlink")
+    hyperlink.set(qn("r:id"), r_id)
+    run = OxmlElement("w:r")
+    t = OxmlElement("w:t")
+    t.text = text
+    run.append(t)
+    hyperlink.append(run)
+    paragraph._p.append(hyperlink)
+
+
+def make_docx(data: CVData, table_rows: int = 10, links: int = 4) -> bytes:
+    """The CV as a DOCX: paragraphs for the body, one employment table, and real w:hyperlink runs."""
+    doc = Document()
+    for line in cv_text_lines(data):
+        doc.add_paragraph(line)
+    table = doc.add_table(rows=table_rows + 1, cols=4)
+    for c, heading in enumerate(("Company", "Role", "Duration", "Notes")):
+        table.cell(0, c).text = heading
+    for r in range(1, table_rows + 1):
+        job = data.experience[(r - 1) % len(data.experience)] if data.experience else None
+        values = (job.company, job.role, job.duration or "", "; ".join(job.description[:2])) if job else ("", "", "", "")
+        for c, value in enumerate(values):
+            table.cell(r, c).text = value
+    for i in range(links):
+        _add_hyperlink(doc.add_paragraph("Link: "), f"https://example.com/docx/{i}", f"profile {i}")
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+def build_corpus(count: int = 5, jobs: int = 10, pages: int = 3, table_rows: int = 10, links: int = 4) -> list:
+    """[(name, CVData, pdf_bytes, docx_bytes)] for `count` candidates."""
+    corpus = []
+    for seed in range(count):
+        data = synthetic_cv_data(jobs, links, seed)
+        lines = cv_text_lines(data)
+        corpus.append((f"cv_{seed:03d}", data, make_pdf(lines, pages, links), make_docx(data, table_rows, links)))
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", required=True, help="directory to write the PDF/DOCX/JSON files to")
+    parser.add_argument("--count", type=int, default=5)
+    parser.add_argument("--jobs", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--table-rows", type=int, default=10)
+    parser.add_argument("--links", type=int, default=4)
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    for name, data, pdf, docx in build_corpus(args.count, args.jobs, args.pages, args.table_rows, args.links):
+        with open(os.path.join(args.out, f"{name}.pdf"), "wb") as f:
+            f.write(pdf)
+        with open(os.path.join(args.out, f"{name}.docx"), "wb") as f:
+            f.write(docx)
+        with open(os.path.join(args.out, f"{name}.json"), "w", encoding="utf-8") as f:
+            f.write(data.model_dump_json(indent=2))
+    print(f"Wrote {args.count} CVs to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
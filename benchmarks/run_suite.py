@@ -0,0 +1,171 @@
+"""
+End-to-end benchmark suite over a synthetic corpus (see benchmarks/corpus.py), with the
+LLM replaced by the offline fake backend. Times PDF/DOCX extraction, link processing,
+table expansion and full generate_docx for each built-in template, writes the results
+as JSON and compares them with a stored baseline.
+
+Run from the repository root:
+    python -m benchmarks.run_suite                      # compare with benchmarks/baseline.json
+    python -m benchmarks.run_suite --output results.json --runs 20
+    python -m benchmarks.run_suite --update-baseline    # after an intended performance change
+
+Exits with status 1 when a stage's median is slower than the baseline by more than
+--tolerance (relative) and --min-delta-ms (absolute), so it can gate CI.
+"""
+import gc
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import statistics
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils import extract_text_from_pdf, extract_text_from_docx
+from app.services.doc_generator import DocGenerator
+from app.services.template_cache import TemplateCache
+from app.services.gemini_parser import GeminiParser
+from app.services.llm_backends import FakeBackend
+from benchmarks.corpus import synthetic_cv_data, cv_text_lines, make_pdf, make_docx
+from benchmarks.bench_render import build_builtin_templates, STYLES
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# name: (jobs, pages, table_rows, links)
+PROFILES = {
+    "small": (5, 2, 10, 2),
+    "large": (30, 12, 60, 8),
+}
+
+
+def time_stage(func, runs: int, setup=None) -> dict:
+    """Median/p95/min of func(setup()) in ms; setup runs outside the timed section."""
+    func(setup() if setup else None)  # warm-up
+    # Start every stage from a clean heap so one stage's garbage is not collected on another's clock
+    gc.collect()
+    timings = []
+    for _ in range(runs):
+        arg = setup() if setup else None
+        start = time.perf_counter()
+        func(arg)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "median_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[min(len(timings) - 1, int(0.95 * len(timings)))], 3),
+        "min_ms": round(timings[0], 3),
+        "runs": runs,
+    }
+
+
+def run(runs: int = 10, profiles=PROFILES) -> dict:
+    templates = build_builtin_templates()
+    generator = DocGenerator(cache=TemplateCache())
+    compiled = {style: generator.get_compiled_template(templates[style], style) for style in STYLES}
+    results = {}
+
+    for profile, (jobs, pages, table_rows, links) in profiles.items():
+        data = synthetic_cv_data(jobs, links)
+        pdf = make_pdf(cv_text_lines(data), pages, links)
+        docx = make_docx(data, table_rows, links)
+
+        results[f"extract_pdf[{profile}]"] = time_stage(lambda _: extract_text_from_pdf(pdf), runs)
+        results[f"extract_docx[{profile}]"] = time_stage(lambda _: extract_text_from_docx(docx), runs)
+
+        for style in STYLES:
+            template = compiled[style]
+
+            def fresh():
+                return template.clone(), data.model_dump()
+
+            def linked():
+                document, context = fresh()
+                generator._process_links(context, document)
+                return document, context
+
+            results[f"process_links[{style},{profile}]"] = time_stage(lambda arg: generator._process_links(arg[1], arg[0]), runs, fresh)
+            results[f"expand_tables[{style},{profile}]"] = time_stage(
+                lambda arg: generator._manually_expand_tables(arg[0], arg[1], plan=template.expansion_plan), runs, linked)
+            results[f"generate_docx[{style},{profile}]"] = time_stage(
+                lambda _: generator.generate_docx(data, template_style=style, template=template), runs)
+
+        # Extraction -> parse (mocked LLM) -> render, as /process does it
+        parser = GeminiParser(cache=None, client=None, backend=FakeBackend(reply=data.model_dump_json()))
+
+        def pipeline(_):
+            parsed = parser.parse_cv(extract_text_from_docx(docx))
+            generator.generate_docx(parsed, template_style="paragraph", template=compiled["paragraph"])
+
+        results[f"process_pipeline[{profile}]"] = time_stage(pipeline, runs)
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "runs": runs,
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float, min_delta_ms: float) -> list:
+    """Rows of (stage, baseline_ms, current_ms, ratio, status) for every stage in either run."""
+    rows = []
+    for stage in sorted(set(current["results"]) | set(baseline["results"])):
+        new = current["results"].get(stage)
+        old = baseline["results"].get(stage)
+        if new is None or old is None:
+            rows.append((stage, old and old["median_ms"], new and new["median_ms"], None, "missing" if new is None else "new"))
+            continue
+        ratio = new["median_ms"] / old["median_ms"] if old["median_ms"] else 1.0
+        delta = new["median_ms"] - old["median_ms"]
+        if ratio > 1 + tolerance and delta > min_delta_ms:
+            status = "REGRESSION"
+        elif ratio < 1 - tolerance and -delta > min_delta_ms:
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append((stage, old["median_ms"], new["median_ms"], round(ratio, 3), status))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--output", help="write the results JSON here")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="overwrite the baseline with this run")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown (0.25 = 25%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="ignore slowdowns smaller than this")
+    args = parser.parse_args()
+
+    current = run(args.runs)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+
+    if args.update_baseline or not os.path.exists(args.baseline):
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    rows = compare(current, baseline, args.tolerance, args.min_delta_ms)
+    print(f"{'stage':<34} {'baseline ms':>12} {'current ms':>11} {'ratio':>7}  status")
+    for stage, old, new, ratio, status in rows:
+        print(f"{stage:<34} {old if old is not None else '-':>12} {new if new is not None else '-':>11} {ratio if ratio is not None else '-':>7}  {status}")
+    regressions = [row for row in rows if row[4] == "REGRESSION"]
+    if regressions:
+        print(f"\n{len(regressions)} stage(s) slower than baseline by more than {args.tolerance:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,37 @@
+import io
+import pytest
+from docx import Document
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services.gemini_parser import GeminiParser, get_parser_service
+from app.services.llm_backends import FakeBackend
+
+def make_docx(*paragraphs: str) -> bytes:
+    doc = Document()
+    for text in paragraphs:
+        doc.add_paragraph(text)
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+@pytest.fixture
+def docx_bytes():
+    """docx_bytes("Line 1", "Line 2") -> bytes of a DOCX with one paragraph per argument."""
+    return make_docx
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+@pytest.fixture
+def fake_parser(monkeypatch):
+    """
+    fake_parser(reply=..., **FakeBackend options) builds an offline, uncached GeminiParser and
+    makes the endpoints use it, so tests never need GEMINI_API_KEY. Returns the parser.
+    """
+    def install(**fake_options) -> GeminiParser:
+        parser = GeminiParser(cache=None, backend=FakeBackend(**fake_options))
+        monkeypatch.setitem(app.dependency_overrides, get_parser_service, lambda: parser)
+        return parser
+
+    return install
@@ -0,0 +1,106 @@
+import os
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.services.gemini_parser import GeminiParser
+
+MOCK_RESPONSE = '{"personal_details": {"name": "Async Candidate"}, "skills": ["Python"]}'
+
+def test_parse_cv_async_caps_in_flight_calls():
+    in_flight = 0
+    peak = 0
+
+    async def fake_generate(prompt):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        response = MagicMock()
+        response.text = MOCK_RESPONSE
+        return response
+
+    with patch('app.services.gemini_parser.genai') as mock_genai, patch.dict(os.environ, {"GEMINI_API_KEY": "fake_key"}):
+        mock_model = MagicMock()
+        mock_model.generate_content_async = AsyncMock(side_effect=fake_generate)
+        mock_genai.GenerativeModel.return_value = mock_model
+        parser = GeminiParser(cache=None, max_concurrency=3)
+
+        async def run():
+            return await asyncio.gather(*(parser.parse_cv_async(f"cv {i}") for i in range(10)))
+
+        results = asyncio.run(run())
+
+    assert len(results) == 10
+    assert all(r.personal_details.name == "Async Candidate" for r in results)
+    assert mock_model.generate_content_async.await_count == 10
+    assert peak == 3
+    mock_model.generate_content.assert_not_called()
+
+LONG_CV = """Jane Doe
+jane.doe@example.com
+SUMMARY
+Backend engineer.
+WORK EXPERIENCE:
+Acme Corp - Engineer
+Built things.
+Education
+BSc Computer Science
+Skills
+Python, Go
+Certifications
+AWS Solutions Architect
+"""
+
+SECTION_RESPONSES = {
+    "experience": '{"experience": [{"role": "Engineer", "company": "Acme Corp", "description": ["Built things."]}]}',
+    "education": '```json\n{"education": [{"degree": "BSc Computer Science", "institution": "Uni"}]}\n```',
+    "skills": '{"skills": ["Python", "Go"]}',
+    "custom": '{"custom_sections": [{"title": "Certifications", "content": ["AWS Solutions Architect"]}]}',
+    "personal": '{"personal_details": {"name": "Jane Doe", "email": null, "summary": "Backend engineer."}}',
+}
+
+def test_sectioned_parse_runs_sections_concurrently_and_merges():
+    in_flight = 0
+    peak = 0
+
+    async def fake_generate(prompt):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        section_text = prompt.split("CV Section Text:")[1]
+        key = next(k for k, marker in [("experience", "Acme"), ("education", "BSc"), ("skills", "Python"), ("custom", "AWS"), ("personal", "Jane")] if marker in section_text)
+        response = MagicMock()
+        response.text = SECTION_RESPONSES[key]
+        return response
+
+    with patch('app.services.gemini_parser.genai') as mock_genai, patch.dict(os.environ, {"GEMINI_API_KEY": "fake_key"}):
+        mock_model = MagicMock()
+        mock_model.generate_content_async = AsyncMock(side_effect=fake_generate)
+        mock_genai.GenerativeModel.return_value = mock_model
+        parser = GeminiParser(cache=None)
+        result = asyncio.run(parser.parse_cv_async(LONG_CV, sectioned=True))
+
+    assert mock_model.generate_content_async.await_count == 5
+    assert peak == 5
+    assert result.personal_details.name == "Jane Doe"
+    assert result.personal_details.email == "jane.doe@example.com"
+    assert result.personal_details.summary == "Backend engineer."
+    assert result.experience[0].company == "Acme Corp"
+    assert result.education[0].degree == "BSc Computer Science"
+    assert result.skills == ["Python", "Go"]
+    assert result.custom_sections[0].title == "Certifications"
+
+def test_short_or_tech6_cvs_use_a_single_call():
+    with patch('app.services.gemini_parser.genai') as mock_genai, patch.dict(os.environ, {"GEMINI_API_KEY": "fake_key"}):
+        mock_model = MagicMock()
+        response = MagicMock()
+        response.text = MOCK_RESPONSE
+        mock_model.generate_content_async = AsyncMock(return_value=response)
+        mock_genai.GenerativeModel.return_value = mock_model
+        parser = GeminiParser(cache=None)
+        asyncio.run(parser.parse_cv_async(LONG_CV))
+        asyncio.run(parser.parse_cv_async(LONG_CV, tech6=True, sectioned=True))
+
+    assert mock_model.generate_content_async.await_count == 2
@@ -0,0 +1,20 @@
+from app.utils import extract_text_from_pdf, extract_text_from_docx
+from benchmarks.corpus import build_corpus
+from benchmarks.run_suite import compare
+
+def test_corpus_files_extract_with_links():
+    name, data, pdf, docx = build_corpus(count=1, jobs=4, pages=3, table_rows=5, links=2)[0]
+    pdf_text = extract_text_from_pdf(pdf)
+    assert data.personal_details.name in pdf_text
+    assert "[Link: https://example.com/page3/link1]" in pdf_text
+    docx_text = extract_text_from_docx(docx)
+    assert data.experience[0].company in docx_text
+    assert "[Link: https://example.com/docx/1]" in docx_text
+
+def test_compare_flags_only_real_regressions():
+    def result(**medians):
+        return {"results": {stage: {"median_ms": ms} for stage, ms in medians.items()}}
+
+    rows = compare(result(a=20.0, b=0.6, c=5.0, d=1.0), result(a=10.0, b=0.3, c=10.0, e=1.0), tolerance=0.25, min_delta_ms=1.0)
+    status = {row[0]: row[4] for row in rows}
+    assert status == {"a": "REGRESSION", "b": "ok", "c": "improved", "d": "new", "e": "missing"}
@@ -0,0 +1,20 @@
+from app.services.cv_sections import split_cv_sections, section_key_for_heading
+
+def test_heading_aliases():
+    assert section_key_for_heading("WORK EXPERIENCE:") == "experience"
+    assert section_key_for_heading("## Key Projects") == "projects"
+    assert section_key_for_heading("Academic Background") == "education"
+    assert section_key_for_heading("Experience with large distributed systems at scale") is None
+    assert section_key_for_heading("Built an experience platform") is None
+
+def test_split_groups_sections_by_key():
+    text = "Jane Doe\njane@example.com\nExperience\nAcme\nEducation\nBSc\nInternships\nGlobex\nAwards\nBest hire\nPublications\nA paper"
+    sections = {s.key: s for s in split_cv_sections(text)}
+    assert list(sections) == ["personal", "experience", "education", "custom"]
+    assert sections["personal"].text == "Jane Doe\njane@example.com"
+    assert sections["experience"].text == "Acme\n\nGlobex"
+    assert sections["experience"].titles == ("Experience", "Internships")
+    assert sections["custom"].text == "Awards\nBest hire\n\nPublications\nA paper"
+
+def test_text_without_headings_is_one_section():
+    assert len(split_cv_sections("Jane Doe\nSome free-form text")) == 1
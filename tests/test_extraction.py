@@ -0,0 +1,137 @@
+import io
+import asyncio
+import pypdf
+from app import utils
+
+def make_pdf(page_texts):
+    """
+    Builds a minimal PDF with one Helvetica line per page.
+    A None entry makes a scanned-style page that only paints an image.
+    """
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        None,
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        "<< /Type /XObject /Subtype /Image /Width 1 /Height 1 /ColorSpace /DeviceGray /BitsPerComponent 8 /Length 1 >>\nstream\n\x00\nendstream",
+    ]
+    kids = []
+    for text in page_texts:
+        if text is None:
+            stream = "q 612 0 0 792 0 0 cm /Im1 Do Q"
+            resources = "<< /XObject << /Im1 4 0 R >> >>"
+        else:
+            stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+            resources = "<< /Font << /F1 3 0 R >> >>"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources {resources} /Contents {len(objects)} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    out += "".join(f"{o:010d} 00000 n \n" for o in offsets).encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    return out
+
+def test_parallel_pdf_extraction_matches_inline(monkeypatch):
+    pdf = make_pdf([f"Page {i}" for i in range(12)])
+    inline = utils.extract_text_from_pdf(pdf)
+    assert "Page 0" in inline and "Page 11" in inline
+
+    monkeypatch.setattr(utils, "EXTRACTION_WORKERS", 2)
+    monkeypatch.setattr(utils, "PDF_PARALLEL_MIN_PAGES", 4)
+    try:
+        pooled = asyncio.run(utils.extract_text_from_bytes("cv.pdf", pdf))
+    finally:
+        utils.shutdown_extraction_pool()
+    assert pooled == inline
+
+def test_inline_fallback_when_pool_disabled(monkeypatch):
+    monkeypatch.setattr(utils, "EXTRACTION_WORKERS", 0)
+    pdf = make_pdf(["Inline only"])
+    assert asyncio.run(utils.extract_text_from_bytes("CV.PDF", pdf)) == utils.extract_text_from_pdf(pdf)
+
+def test_page_and_char_budgets_cut_extraction_early():
+    pdf = make_pdf([f"Page {i}" for i in range(200)])
+    text = utils.extract_text_from_pdf(pdf, max_pages=3, max_chars=0)
+    assert "Page 2" in text and "Page 3" not in text
+
+    text = utils.extract_text_from_pdf(pdf, max_pages=0, max_chars=20)
+    assert len(text) == 20 and text.startswith("Page 0")
+
+def test_parallel_extraction_stops_at_the_char_budget(monkeypatch):
+    pdf = make_pdf([f"Page {i}" for i in range(200)])
+    scheduled = []
+
+    async def inline_extraction(func, *args):
+        if func is utils.extract_pdf_page_range:
+            scheduled.append(args[2] - args[1])
+        return func(*args)
+
+    monkeypatch.setattr(utils, "get_extraction_pool", lambda: object())
+    monkeypatch.setattr(utils, "run_extraction", inline_extraction)
+    monkeypatch.setattr(utils, "EXTRACTION_WORKERS", 2)
+    monkeypatch.setattr(utils, "PDF_PARALLEL_MIN_PAGES", 4)
+    monkeypatch.setattr(utils, "PDF_RANGE_PAGES", 4)
+    monkeypatch.setattr(utils, "PDF_MAX_PAGES", 0)
+    monkeypatch.setattr(utils, "PDF_MAX_CHARS", 100)
+
+    text = asyncio.run(utils.extract_text_from_pdf_async(pdf))
+    assert text == utils.extract_text_from_pdf(pdf, max_pages=0, max_chars=100)
+    # About ten pages fill the budget; two waves of two 4-page ranges, not all 200 pages
+    assert sum(scheduled) <= 16
+
+def test_image_only_pages_are_skipped():
+    pdf = make_pdf(["Cover letter", None, None, "Experience"])
+    pages = list(utils.iter_pdf_pages(pypdf.PdfReader(io.BytesIO(pdf))))
+    assert [p.index for p in pages] == [0, 3]
+    assert len(list(utils.iter_pdf_pages(pypdf.PdfReader(io.BytesIO(pdf)), skip_image_only=False))) == 4
+
+def _docx_with_table_and_link():
+    from docx import Document
+    from docx.oxml import OxmlElement
+    from docx.oxml.ns import qn
+    from docx.opc.constants import RELATIONSHIP_TYPE as RT
+
+    doc = Document()
+    paragraph = doc.add_paragraph("Portfolio: ")
+    rel_id = doc.part.relate_to("https://jane.dev", RT.HYPERLINK, is_external=True)
+    hyperlink = OxmlElement("w:hyperlink")
+    hyperlink.set(qn("r:id"), rel_id)
+    run = OxmlElement("w:r")
+    text = OxmlElement("w:t")
+    text.text = "jane.dev"
+    run.append(text)
+    hyperlink.append(run)
+    paragraph._p.append(hyperlink)
+
+    table = doc.add_table(rows=2, cols=3)
+    table.rows[0].cells[0].text = "Company"
+    table.rows[0].cells[1].text = "Role"
+    table.cell(1, 0).merge(table.cell(1, 1)).text = "Acme Corp"
+    table.rows[1].cells[2].text = "Engineer"
+    doc.add_paragraph("References on request")
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+def test_streaming_docx_extractor_keeps_document_order_and_links():
+    text = utils.extract_text_from_docx_stream(_docx_with_table_and_link())
+    assert text.splitlines() == [
+        "Portfolio: jane.dev [Link: https://jane.dev] ",
+        "Company | Role",
+        "Acme Corp | Engineer",
+        "References on request",
+    ]
+
+def test_docx_extractor_falls_back_to_python_docx(monkeypatch):
+    def broken(_):
+        raise ValueError("boom")
+    monkeypatch.setattr(utils, "extract_text_from_docx_stream", broken)
+    text = utils.extract_text_from_docx(_docx_with_table_and_link())
+    assert "References on request" in text
@@ -0,0 +1,26 @@
+import io
+import json
+import zipfile
+from fastapi.testclient import TestClient
+from app.main import app
+
+client = TestClient(app)
+
+def test_generate_batch_streams_zip_with_one_docx_per_cv():
+    cvs = [
+        {"personal_details": {"name": "Jane Doe", "email": "jane@example.com"}, "skills": ["Python"]},
+        {"personal_details": {"name": "John Smith"}, "skills": ["Go"]},
+    ]
+    response = client.post("/generate-batch", data={"cvs": json.dumps(cvs), "style": "paragraph", "masking": "true"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+        assert archive.namelist() == ["001_Jane_Doe.docx", "002_John_Smith.docx"]
+        document_xml = zipfile.ZipFile(io.BytesIO(archive.read("001_Jane_Doe.docx"))).read("word/document.xml").decode()
+    assert "Jane Doe" in document_xml
+    assert "jane@example.com" not in document_xml
+
+def test_generate_batch_rejects_invalid_payload():
+    response = client.post("/generate-batch", data={"cvs": json.dumps([{"skills": []}])})
+    assert response.status_code == 422
@@ -0,0 +1,127 @@
+import io
+import asyncio
+from docx import Document
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services import job_queue as job_queue_module
+from app.services.job_queue import JobQueue, JobStore, JobQueueFull, QUEUED, DONE, FAILED
+from app.services.uploads import SpooledUpload
+
+async def echo_runner(job):
+    await asyncio.sleep(0.01)
+    if job["filename"] == "bad.docx":
+        raise ValueError("unreadable")
+    return job["content"][::-1], {"X-Filename": job["filename"]}
+
+def test_jobs_run_and_failures_are_recorded(tmp_path):
+    async def scenario():
+        queue = JobQueue(db_path=str(tmp_path / "jobs.db"), workers=2)
+        await queue.start(echo_runner)
+        ok = await queue.submit("cv.docx", b"abc", "tabular", None, True)
+        bad = await queue.submit("bad.docx", b"xyz")
+        done, failed = await queue.wait(ok, 5), await queue.wait(bad, 5)
+        result = await queue.result(ok)
+        await queue.drain()
+        return queue, done, failed, result
+
+    queue, done, failed, result = asyncio.run(scenario())
+    assert (done["status"], done["style"], done["masking"]) == (DONE, "tabular", True)
+    assert result == (b"cba", {"X-Filename": "cv.docx"})
+    assert (failed["status"], failed["error"]) == (FAILED, "unreadable")
+    assert queue.stats()["completed"] == 1 and queue.stats()["failed"] == 1
+
+def test_queued_and_interrupted_jobs_survive_a_restart(tmp_path):
+    db_path = str(tmp_path / "jobs.db")
+
+    async def slow_runner(job):
+        await asyncio.sleep(10)
+
+    async def first_life():
+        queue = JobQueue(db_path=db_path, workers=1)
+        await queue.start(slow_runner)
+        ids = [await queue.submit(f"cv{i}.docx", b"data") for i in range(2)]
+        await asyncio.sleep(0.05)
+        # The running job is put back rather than lost; the other one never started
+        await queue.drain(timeout=0.05)
+        return ids
+
+    ids = asyncio.run(first_life())
+    store = JobStore(db_path)
+    assert [store.get(job_id)["status"] for job_id in ids] == [QUEUED, QUEUED]
+    assert store.get(ids[0])["attempts"] == 0
+    store.close()
+
+    async def second_life():
+        queue = JobQueue(db_path=db_path, workers=1)
+        await queue.start(echo_runner)
+        jobs = [await queue.wait(job_id, 5) for job_id in ids]
+        await queue.drain()
+        return jobs
+
+    assert [job["status"] for job in asyncio.run(second_life())] == [DONE, DONE]
+
+def test_submit_is_bounded(tmp_path):
+    async def slow_runner(job):
+        await asyncio.sleep(10)
+
+    async def scenario():
+        queue = JobQueue(db_path=str(tmp_path / "jobs.db"), workers=1, max_queued=1)
+        await queue.start(slow_runner)
+        await queue.submit("running.docx", b"data")
+        await asyncio.sleep(0.05)
+        await queue.submit("waiting.docx", b"data")
+        try:
+            await queue.submit("refused.docx", b"data")
+            return False
+        except JobQueueFull:
+            return True
+        finally:
+            await queue.drain(timeout=0)
+
+    assert asyncio.run(scenario())
+
+def test_spooled_content_and_periodic_purge(monkeypatch, tmp_path):
+    monkeypatch.setattr(job_queue_module, "JOB_PURGE_INTERVAL_SECONDS", 0.05)
+    monkeypatch.setattr(job_queue_module, "JOB_POLL_SECONDS", 0.02)
+    upload = tmp_path / "cv.docx"
+    upload.write_bytes(b"spooled" * 1000)
+
+    async def scenario():
+        queue = JobQueue(db_path=str(tmp_path / "jobs.db"), workers=1)
+        await queue.start(echo_runner)
+        job_id = await queue.submit("cv.docx", SpooledUpload(str(upload), upload.stat().st_size))
+        await queue.wait(job_id, 5)
+        result = await queue.result(job_id)
+        # Expire it; a running worker removes it without a restart
+        queue.result_ttl = 0
+        await asyncio.sleep(0.2)
+        gone = await queue.get(job_id)
+        await queue.drain()
+        return result, gone
+
+    result, gone = asyncio.run(scenario())
+    assert result[0] == (b"spooled" * 1000)[::-1]
+    assert gone is None
+
+def test_job_endpoints_end_to_end(monkeypatch, tmp_path, docx_bytes, fake_parser):
+    fake_parser(reply='{"personal_details": {"name": "Queued Candidate"}}')
+    monkeypatch.setattr("app.main.job_queue", JobQueue(db_path=str(tmp_path / "jobs.db"), workers=2))
+
+    # Entered, so the lifespan starts the queue
+    with TestClient(app) as client:
+        submitted = client.post("/jobs", files={"file": ("cv.docx", docx_bytes("Queued Candidate"), "application/octet-stream")}, data={"style": "paragraph"})
+        assert submitted.status_code == 202
+        job_id = submitted.json()["job_id"]
+        assert submitted.headers["location"] == f"/jobs/{job_id}"
+
+        status = client.get(f"/jobs/{job_id}", params={"wait": 10}).json()
+        assert status["status"] == "done", status
+        result = client.get(status["result_url"])
+        assert result.status_code == 200
+        assert "x-cv-text-chars" in result.headers
+        text = "\n".join(p.text for p in Document(io.BytesIO(result.content)).paragraphs)
+        assert "Queued Candidate" in text
+
+        assert client.get("/jobs/" + "0" * 32).status_code == 404
+        assert client.post("/jobs", files={"file": ("cv.txt", b"text", "text/plain")}).status_code == 400
+        assert client.get("/job-queue/stats").json()["done"] == 1
@@ -0,0 +1,48 @@
+import io
+import os
+import asyncio
+import pytest
+from docx import Document
+from app.services.llm_backends import LLMBackend, FakeBackend, RecordReplayBackend
+
+REPLY = '{"personal_details": {"name": "Recorded Candidate"}, "skills": ["Python"]}'
+
+def test_record_then_replay_offline(tmp_path):
+    inner = FakeBackend(reply=REPLY)
+    recorder = RecordReplayBackend(inner, str(tmp_path), mode="auto").create_model({"response_mime_type": "application/json"})
+    assert recorder.generate_content("prompt one").text == REPLY
+    assert recorder.generate_content("prompt one").text == REPLY
+    assert inner.models[0].calls == 1
+    assert len(os.listdir(tmp_path)) == 1
+
+    replayer = RecordReplayBackend(None, str(tmp_path), mode="replay").create_model({"response_mime_type": "application/json"})
+    assert asyncio.run(replayer.generate_content_async("prompt one")).text == REPLY
+
+    async def stream_text():
+        response = await replayer.generate_content_async("prompt one", stream=True)
+        return "".join([chunk.text async for chunk in response])
+
+    assert asyncio.run(stream_text()) == REPLY
+    with pytest.raises(LookupError):
+        replayer.generate_content("prompt two")
+    # A different response schema is a different recording
+    with pytest.raises(LookupError):
+        RecordReplayBackend(None, str(tmp_path), mode="replay").create_model(None).generate_content("prompt one")
+
+def test_replay_mode_needs_no_inner_backend_but_record_does(tmp_path):
+    with pytest.raises(ValueError):
+        RecordReplayBackend(None, str(tmp_path), mode="record")
+
+def test_process_runs_offline_with_fake_backend(client, docx_bytes, fake_parser):
+    fake_parser(reply=REPLY, latency=0.01)
+    response = client.post("/process", files={"file": ("cv.docx", docx_bytes("Recorded Candidate"), "application/octet-stream")}, data={"style": "paragraph"})
+    assert response.status_code == 200
+    text = "\n".join(p.text for p in Document(io.BytesIO(response.content)).paragraphs)
+    assert "Recorded Candidate" in text
+
+def test_backend_without_create_model_cannot_be_instantiated():
+    class Incomplete(LLMBackend):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
@@ -0,0 +1,73 @@
+import time
+import asyncio
+import pytest
+from google.api_core import exceptions as api_exceptions
+from app.services.gemini_parser import GeminiParser
+from app.services.fake_llm import FakeGenerativeModel
+from app.services.llm_backends import FakeBackend
+from app.services.llm_client import LLMClient, TokenBucket, CircuitBreaker, LLMUnavailableError
+
+def _client(**kwargs):
+    kwargs.setdefault("rate_limiter", TokenBucket(rate_per_minute=0))
+    return LLMClient(backoff_base=0, **kwargs)
+
+def test_transient_errors_are_retried():
+    backend = FakeGenerativeModel(fail_first=2)
+    model = _client(max_retries=3).wrap(backend)
+    assert asyncio.run(model.generate_content_async("prompt")).text
+    assert model.generate_content("prompt").text
+    assert backend.calls == 4
+
+def test_retries_are_bounded_and_client_errors_are_not_retried():
+    backend = FakeGenerativeModel(error_rate=1.0)
+    with pytest.raises(LLMUnavailableError):
+        _client(max_retries=2).wrap(backend).generate_content("prompt")
+    assert backend.calls == 3
+
+    bad_request = FakeGenerativeModel(fail_first=1, error_factory=lambda: api_exceptions.InvalidArgument("bad prompt"))
+    with pytest.raises(api_exceptions.InvalidArgument):
+        _client().wrap(bad_request).generate_content("prompt")
+    assert bad_request.calls == 1
+
+def test_circuit_opens_fails_fast_then_recovers():
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=0.05)
+    backend = FakeGenerativeModel(fail_first=3)
+    model = _client(max_retries=0, breaker=breaker).wrap(backend)
+    for _ in range(3):
+        with pytest.raises(LLMUnavailableError):
+            model.generate_content("prompt")
+    assert breaker.state == "open"
+    with pytest.raises(LLMUnavailableError, match="circuit open"):
+        model.generate_content("prompt")
+    assert backend.calls == 3
+
+    time.sleep(0.06)
+    assert model.generate_content("prompt").text
+    assert breaker.state == "closed"
+
+def test_token_bucket_spaces_out_bursts():
+    bucket = TokenBucket(rate_per_minute=600, burst=2)
+    delays = [bucket.reserve() for _ in range(4)]
+    assert delays[:2] == [0.0, 0.0]
+    assert delays[2] == pytest.approx(0.1, abs=0.01)
+    assert delays[3] == pytest.approx(0.2, abs=0.01)
+
+def test_parser_survives_flaky_backend():
+    parser = GeminiParser(cache=None, client=_client(max_retries=5), backend=FakeBackend(latency=0.005, jitter=0.005, error_rate=0.3, seed=7))
+
+    async def run():
+        return await asyncio.gather(*(parser.parse_cv_async(f"cv {i}") for i in range(20)))
+
+    results = asyncio.run(run())
+    assert all(r.personal_details.name == "Fake Candidate" for r in results)
+    # parser.model is the first model the backend built
+    assert parser.backend.models[0].errors > 0
+
+def test_unavailable_backend_returns_503(monkeypatch, client, docx_bytes, fake_parser):
+    async def unavailable(text, tech6=False, sectioned=None):
+        raise LLMUnavailableError("down", retry_after=12.5)
+
+    monkeypatch.setattr(fake_parser(), "parse_cv_async", unavailable)
+    response = client.post("/parse", files={"file": ("alice.docx", docx_bytes("Alice"), "application/octet-stream")})
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "13"
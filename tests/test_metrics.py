@@ -0,0 +1,30 @@
+from app.services.metrics import MetricsRegistry
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("demo_seconds", "Demo.", ("stage",), buckets=(0.1, 1.0))
+    counter = registry.counter("demo_total", "Demo.", ("stage",))
+    histogram.observe(0.05, stage="a")
+    histogram.observe(0.5, stage="a")
+    histogram.observe(5, stage="a")
+    counter.inc(3, stage='say "hi"')
+    text = registry.render()
+    assert 'demo_seconds_bucket{stage="a",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{stage="a",le="1.0"} 2' in text
+    assert 'demo_seconds_bucket{stage="a",le="+Inf"} 3' in text
+    assert 'demo_seconds_count{stage="a"} 3' in text
+    assert 'demo_total{stage="say \\"hi\\""} 3' in text
+
+def test_process_stages_show_up_on_metrics(client, docx_bytes, fake_parser):
+    fake_parser(reply='{"personal_details": {"name": "Metric Candidate"}, "experience": [{"role": "Dev", "company": "Acme"}]}')
+    assert client.post("/process", files={"file": ("cv.docx", docx_bytes("Metric Candidate"), "application/octet-stream")}, data={"style": "tabular"}).status_code == 200
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    for stage in ("upload_read", "extract", "compact", "llm", "template", "process_links", "expand_rows", "render", "save"):
+        assert f'cv_stage_duration_seconds_count{{endpoint="/process",stage="{stage}"}}' in text
+    assert 'cv_requests_total{endpoint="/process",outcome="ok"}' in text
+    assert 'cv_payload_bytes_count{endpoint="/process",direction="out"}' in text
+    assert 'cv_llm_prompt_chars_count{endpoint="/process",mode="standard"}' in text
@@ -0,0 +1,64 @@
+import json
+from fastapi.testclient import TestClient
+from app.main import app
+from app.schemas import CVData
+from app.services.output_cache import OutputCache, make_output_key, etag_for, etag_matches, output_cache
+
+client = TestClient(app)
+
+CV = {"personal_details": {"name": "Cached Candidate", "email": "cached@example.com"}, "skills": ["Python", "SQL"]}
+
+def test_key_is_canonical_and_covers_every_input():
+    data = CVData.model_validate(CV)
+    reordered = CVData.model_validate_json(json.dumps({"skills": ["Python", "SQL"], "personal_details": {"email": "cached@example.com", "name": "Cached Candidate"}}))
+    template = ("path", "/templates/paragraph_template.docx", 1, 100)
+    key = make_output_key(data, template, "paragraph", False)
+    assert make_output_key(reordered, template, "paragraph", False) == key
+    assert make_output_key(data, template, "paragraph", True) != key
+    assert make_output_key(data, template, "tabular", False) != key
+    assert make_output_key(data, ("path", "/templates/paragraph_template.docx", 2, 100), "paragraph", False) != key
+    assert make_output_key(CVData.model_validate({**CV, "skills": ["Go"]}), template, "paragraph", False) != key
+
+def test_lru_is_bounded_by_bytes():
+    cache = OutputCache(max_entries=10, max_bytes=10)
+    cache.set("a", b"1234")
+    cache.set("b", b"1234")
+    cache.get("a")
+    cache.set("c", b"1234")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1234" and cache.get("c") == b"1234"
+    cache.set("huge", b"x" * 11)
+    assert cache.get("huge") is None
+    assert cache.stats()["total_bytes"] == 8 and cache.stats()["evictions"] == 1
+
+def test_etag_matching():
+    etag = etag_for("abc")
+    assert etag_matches('W/"abc"', etag)
+    assert etag_matches('"abc"', etag)
+    assert etag_matches('"zzz", W/"abc"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"zzz"', etag)
+    assert not etag_matches(None, etag)
+
+def test_generate_serves_repeats_from_cache_and_honours_if_none_match():
+    output_cache.clear()
+    form = {"data": json.dumps(CV)}
+    first = client.post("/generate", data=form)
+    assert first.status_code == 200
+    assert first.headers["x-output-cache"] == "miss"
+    etag = first.headers["etag"]
+
+    second = client.post("/generate", data=form)
+    assert second.headers["x-output-cache"] == "hit"
+    assert second.headers["etag"] == etag
+    assert second.content == first.content
+
+    not_modified = client.post("/generate", data=form, headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+    masked = client.post("/generate", data=form, params={"masking": True}, headers={"If-None-Match": etag})
+    assert masked.status_code == 200
+    assert masked.headers["etag"] != etag
+
+    assert client.post("/generate", data={"data": "{}"}).status_code == 422
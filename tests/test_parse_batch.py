@@ -0,0 +1,23 @@
+import json
+from app.schemas import CVData
+
+def test_parse_batch_streams_one_line_per_file(monkeypatch, client, docx_bytes, fake_parser):
+    async def fake_parse(text, tech6=False):
+        return CVData(personal_details={"name": text.strip()})
+
+    monkeypatch.setattr(fake_parser(), "parse_cv_async", fake_parse)
+    files = [
+        ("files", ("alice.docx", docx_bytes("Alice"), "application/octet-stream")),
+        ("files", ("notes.txt", b"plain text", "text/plain")),
+        ("files", ("bob.docx", docx_bytes("Bob"), "application/octet-stream")),
+    ]
+    response = client.post("/parse-batch", files=files)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    by_index = {line["index"]: line for line in lines}
+    assert len(lines) == 3
+    assert by_index[0]["data"]["personal_details"]["name"] == "Alice"
+    assert by_index[2]["data"]["personal_details"]["name"] == "Bob"
+    assert "Unsupported file format" in by_index[1]["error"]
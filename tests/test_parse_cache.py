@@ -0,0 +1,59 @@
+import time
+from app.schemas import CVData
+from app.services.parse_cache import ParseCache, make_cache_key
+
+def _cv(name="Jane Doe"):
+    return CVData(personal_details={"name": name, "email": "jane@example.com"})
+
+def test_cache_key_normalizes_whitespace_and_separates_modes():
+    key = make_cache_key("Jane  Doe\n\nEngineer ", "standard", "1")
+    assert key == make_cache_key("Jane Doe Engineer", "standard", "1")
+    assert key != make_cache_key("Jane Doe Engineer", "tech6", "1")
+    assert key != make_cache_key("Jane Doe Engineer", "standard", "2")
+
+def test_memory_tier_lru_and_copies():
+    cache = ParseCache(max_entries=2, ttl_seconds=0, db_path=None)
+    cache.set("a", _cv("A"))
+    cache.set("b", _cv("B"))
+    assert cache.get("a").personal_details.name == "A"
+    cache.set("c", _cv("C"))  # evicts "b", the least recently used
+    assert cache.get("b") is None
+
+    hit = cache.get("a")
+    hit.personal_details.email = None  # masking must not leak into the cache
+    assert cache.get("a").personal_details.email == "jane@example.com"
+
+    stats = cache.stats()
+    assert stats["memory_hits"] == 3
+    assert stats["misses"] == 1
+    assert stats["evictions"] == 1
+
+def test_ttl_expiry():
+    cache = ParseCache(max_entries=10, ttl_seconds=0.05, db_path=None)
+    cache.set("a", _cv())
+    time.sleep(0.1)
+    assert cache.get("a") is None
+
+def test_disk_tier_survives_new_instance(tmp_path):
+    db_path = str(tmp_path / "parse_cache.sqlite3")
+    ParseCache(max_entries=10, ttl_seconds=0, db_path=db_path).set("a", _cv("Disk"))
+
+    fresh = ParseCache(max_entries=10, ttl_seconds=0, db_path=db_path)
+    assert fresh.get("a").personal_details.name == "Disk"
+    assert fresh.stats()["disk_hits"] == 1
+    assert fresh.get("a") is not None
+    assert fresh.stats()["memory_hits"] == 1
+
+def test_disk_tier_is_purged_and_capped(tmp_path):
+    db_path = str(tmp_path / "parse_cache.sqlite3")
+    cache = ParseCache(max_entries=0, ttl_seconds=0, db_path=db_path, max_rows=3, purge_every=5)
+    for i in range(5):
+        cache.set(f"k{i}", _cv(f"N{i}"))
+    # The fifth write triggers a purge down to the three newest rows
+    assert [cache.get(f"k{i}") is not None for i in range(5)] == [False, False, True, True, True]
+
+    cache.set("old", _cv())
+    cache._db.execute("UPDATE parse_cache SET stored_at = 0 WHERE key = 'old'")
+    # Startup purges expired rows
+    reopened = ParseCache(max_entries=0, ttl_seconds=60, db_path=db_path, max_rows=10)
+    assert reopened._db.execute("SELECT COUNT(*) FROM parse_cache WHERE key = 'old'").fetchone()[0] == 0
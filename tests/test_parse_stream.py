@@ -0,0 +1,109 @@
+import json
+import asyncio
+from app.schemas import CVData
+from app.services.gemini_parser import GeminiParser
+from app.services.json_stream import JSONSectionDecoder
+from app.services.llm_backends import FakeBackend
+
+REPLY = json.dumps({
+    "personal_details": {"name": "Stream Candidate", "email": None},
+    "experience": [
+        {"role": "Engineer", "company": "Acme {inc}", "description": ["a, b", "c \"quoted\""]},
+        {"role": "Lead", "company": "Globex", "description": []},
+    ],
+    "skills": ["Python", "Go"],
+    "representative_project": None,
+})
+
+def _feed_in_chunks(decoder, text, size):
+    events = []
+    for i in range(0, len(text), size):
+        events.extend(decoder.feed(text[i:i + size]))
+    return events
+
+def test_decoder_emits_sections_and_items_as_they_close():
+    for size in (1, 5, len(REPLY)):
+        decoder = JSONSectionDecoder()
+        events = _feed_in_chunks(decoder, "```json\n" + REPLY + "\n```", size)
+        assert decoder.done
+        assert [e[:2] for e in events] == [
+            ("section", "personal_details"), ("item", "experience"), ("item", "experience"),
+            ("section", "skills"), ("section", "representative_project"),
+        ]
+        assert events[1][2:] == (0, json.loads(REPLY)["experience"][0])
+
+def test_decoder_emits_first_section_before_reply_finishes():
+    decoder = JSONSectionDecoder()
+    events = decoder.feed(REPLY[:REPLY.index('"experience"')])
+    assert events == [("section", "personal_details", {"name": "Stream Candidate", "email": None})]
+
+def test_parse_cv_stream_merges_known_details():
+    parser = GeminiParser(cache=None, backend=FakeBackend(reply=REPLY, chunk_chars=16))
+
+    async def collect():
+        return [event async for event in parser.parse_cv_stream("Stream Candidate\nstream@example.com")]
+
+    events = asyncio.run(collect())
+    assert events[0] == ("section", "personal_details", {"name": "Stream Candidate", "email": "stream@example.com"})
+    assert events[-1][0] == "result"
+    assert events[-1][1].personal_details.email == "stream@example.com"
+    assert len(events[-1][1].experience) == 2
+
+def test_parse_stream_endpoint_sends_sse(monkeypatch, client, docx_bytes, fake_parser):
+    async def fake_stream(text, tech6=False):
+        yield ("section", "personal_details", {"name": "Alice"})
+        yield ("item", "experience", 0, {"role": "Dev", "company": "Acme"})
+        yield ("result", CVData(personal_details={"name": "Alice"}))
+
+    monkeypatch.setattr(fake_parser(), "parse_cv_stream", fake_stream)
+    response = client.post("/parse-stream", files={"file": ("alice.docx", docx_bytes("Alice"), "application/octet-stream")})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    blocks = [b.split("\n", 1) for b in response.text.strip().split("\n\n")]
+    assert [b[0] for b in blocks] == ["event: section", "event: item", "event: result"]
+    assert json.loads(blocks[1][1][len("data: "):]) == {"field": "experience", "index": 0, "value": {"role": "Dev", "company": "Acme"}}
+
+def test_stream_holds_one_slot_for_the_model_stream_only():
+    parser = GeminiParser(cache=None, max_concurrency=1, backend=FakeBackend(reply=REPLY, chunk_chars=16, chunk_latency=0.02))
+
+    async def read_slowly():
+        events = parser.parse_cv_stream("Stream Candidate")
+        first = await events.__anext__()
+        other = asyncio.create_task(parser.parse_cv_async("Other Candidate"))
+        await asyncio.sleep(0.05)
+        # The model stream is still open and holds the only slot
+        capped = not other.done()
+        # It finishes once the model stream does, while the client still holds its first event
+        other_result = await asyncio.wait_for(other, 2)
+        rest = [event async for event in events]
+        return first, capped, other_result, rest
+
+    first, capped, other, rest = asyncio.run(read_slowly())
+    assert first[:2] == ("section", "personal_details")
+    assert capped
+    assert other.personal_details.name == "Stream Candidate"
+    assert rest[-1][0] == "result"
+
+def test_abandoned_stream_releases_its_slot():
+    parser = GeminiParser(cache=None, max_concurrency=1, backend=FakeBackend(reply=REPLY, chunk_chars=4, chunk_latency=0.05))
+
+    async def abandon():
+        events = parser.parse_cv_stream("Stream Candidate")
+        await events.__anext__()
+        await events.aclose()
+        await asyncio.sleep(0)
+        return parser._get_semaphore().locked()
+
+    assert asyncio.run(abandon()) is False
+
+def test_parse_stream_reports_extraction_failures_as_events(monkeypatch, client, fake_parser):
+    async def broken_extraction(file):
+        raise RuntimeError("pool crashed")
+
+    fake_parser()
+    monkeypatch.setattr("app.main.extract_text_from_upload_file", broken_extraction)
+    response = client.post("/parse-stream", files={"file": ("cv.docx", b"PK", "application/octet-stream")})
+    assert response.status_code == 200
+    assert response.text.startswith("event: error\n")
+    assert "pool crashed" in response.text
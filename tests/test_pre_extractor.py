@@ -0,0 +1,55 @@
+from app.schemas import CVData
+from app.services.pre_extractor import pre_extract_contact_details, merge_known_details, known_facts_prompt, parse_cv_local
+
+SAMPLE_CV = """Jane Doe
+Senior Engineer
+Email: jane.doe@example.com | Phone: +91 98765 43210
+github.com/janedoe
+Portfolio: https://janedoe.dev.
+Experience
+Acme Corp 2015 - 2020
+ [Link: https://www.linkedin.com/in/janedoe] 
+"""
+
+def test_pre_extracts_contact_fields():
+    assert pre_extract_contact_details(SAMPLE_CV) == {
+        "email": "jane.doe@example.com",
+        "phone": "+91 98765 43210",
+        "linkedin": "https://www.linkedin.com/in/janedoe",
+        "github": "github.com/janedoe",
+        "portfolio": "https://janedoe.dev",
+    }
+
+def test_year_ranges_are_not_phone_numbers():
+    assert "phone" not in pre_extract_contact_details("Acme 2015 - 2020\nGlobex 2010-2015")
+
+def test_labels_must_directly_precede_the_number():
+    for line in (
+        "Tel Aviv University 2012 - 2016 (4 years)",
+        "Mobile App Developer, Acme 2014 - 2016 2017",
+        "Contact Center Lead | 01.2015 - 08.2019",
+    ):
+        assert "phone" not in pre_extract_contact_details(line), line
+    # An earlier false "label" no longer hides the real number
+    cv = "Tel Aviv University 2012 - 2016 (4 years)\nPhone: +91 98765 43210"
+    assert pre_extract_contact_details(cv)["phone"] == "+91 98765 43210"
+    assert pre_extract_contact_details("Mob. 98765 43210")["phone"] == "98765 43210"
+
+def test_verified_details_override_model_output_and_guesses_only_fill_gaps():
+    data = CVData(personal_details={"name": "Jane Doe", "email": "JANE@EXAMPLE", "phone": "+1 555 0100"})
+    merge_known_details(data, {"email": "jane.doe@example.com", "phone": "2012 2016 44", "portfolio": "https://janedoe.dev"})
+    assert data.personal_details.email == "jane.doe@example.com"
+    assert data.personal_details.phone == "+1 555 0100"
+    assert data.personal_details.portfolio == "https://janedoe.dev"
+
+    prompt = known_facts_prompt({"email": "jane.doe@example.com", "phone": "+91 98765 43210"})
+    verified, guessed = prompt.split("DETECTED LOCALLY")
+    assert "email: jane.doe@example.com" in verified and "phone" not in verified
+    assert "phone: +91 98765 43210" in guessed
+    assert known_facts_prompt({}) == ""
+
+def test_local_only_parse():
+    data = parse_cv_local(SAMPLE_CV)
+    assert data.personal_details.name == "Jane Doe"
+    assert data.personal_details.github == "github.com/janedoe"
+    assert data.experience == []
@@ -0,0 +1,35 @@
+import pstats
+from app.services.profiler import request_profiler
+
+def test_opted_in_request_is_profiled_and_downloadable(monkeypatch, tmp_path, client, docx_bytes, fake_parser):
+    def _process(**kwargs):
+        return client.post("/process", files={"file": ("cv.docx", docx_bytes("Profiled Candidate"), "application/octet-stream")}, data={"style": "tabular"}, **kwargs)
+
+    fake_parser()
+    monkeypatch.setattr(request_profiler, "enabled", True)
+    monkeypatch.setattr(request_profiler, "directory", str(tmp_path))
+
+    plain = _process()
+    assert plain.status_code == 200
+    assert "x-profile-id" not in plain.headers
+
+    profiled = _process(params={"profile": "1"})
+    assert profiled.status_code == 200
+    profile_id = profiled.headers["x-profile-id"]
+    assert _process(headers={"X-Profile": "1"}).headers["x-profile-id"] != profile_id
+
+    assert [p["id"] for p in client.get("/profiles").json()].count(profile_id) == 1
+    report = client.get(f"/profiles/{profile_id}", params={"format": "text"})
+    assert "generate_docx" in report.text
+    download = client.get(f"/profiles/{profile_id}")
+    dump = tmp_path / "download.prof"
+    dump.write_bytes(download.content)
+    assert pstats.Stats(str(dump)).total_calls > 0
+    assert client.get("/profiles/not-an-id").status_code == 404
+    assert client.get("/profiles/" + "0" * 32).status_code == 404
+
+def test_profiling_is_off_unless_enabled(monkeypatch, client):
+    monkeypatch.setattr(request_profiler, "enabled", False)
+    response = client.get("/?profile=1")
+    assert "x-profile-id" not in response.headers
+    assert client.get("/profiles").status_code == 404
@@ -0,0 +1,33 @@
+import os
+import json
+import pytest
+from unittest.mock import MagicMock, patch
+from app.services.gemini_parser import GeminiParser
+from app.services.response_schema import cv_response_schema, TECH6_FIELDS
+
+def test_schema_is_inlined_and_nullable():
+    schema = cv_response_schema()
+    assert "$ref" not in json.dumps(schema) and "anyOf" not in json.dumps(schema)
+    personal = schema["properties"]["personal_details"]
+    assert personal["required"] == ["name"]
+    assert personal["properties"]["email"] == {"type": "string", "description": "Email address", "nullable": True}
+    assert schema["properties"]["representative_project"]["nullable"] is True
+
+def test_tech6_schema_is_a_subset():
+    schema = cv_response_schema(TECH6_FIELDS)
+    assert set(schema["properties"]) == set(TECH6_FIELDS)
+    assert "projects" not in schema["properties"]
+    assert schema["required"] == ["personal_details"]
+
+def test_replies_validate_directly_with_fence_fallback():
+    with patch('app.services.gemini_parser.genai') as mock_genai, patch.dict(os.environ, {"GEMINI_API_KEY": "fake_key"}):
+        mock_genai.GenerativeModel.return_value = MagicMock()
+        parser = GeminiParser(cache=None)
+        config = mock_genai.GenerativeModel.call_args_list[0].kwargs["generation_config"]
+
+    assert config["response_mime_type"] == "application/json"
+    assert parser._response_to_cv(b'{"personal_details": {"name": "Raw"}}', tech6=False).personal_details.name == "Raw"
+    fenced = '```json\n{"personal_details": {"name": "Fenced"}}\n```'
+    assert parser._response_to_cv(fenced, tech6=False).personal_details.name == "Fenced"
+    with pytest.raises(ValueError, match="TECH-6"):
+        parser._response_to_cv('{"personal_details": {}}', tech6=True)
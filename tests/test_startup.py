@@ -0,0 +1,47 @@
+import os
+import sys
+import json
+import subprocess
+from app.services import gemini_parser, doc_generator
+from app.services.gemini_parser import get_parser_service
+from benchmarks.bench_startup import parse_importtime, LAZY_MODULES
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_import_is_cheap_and_works_without_api_key():
+    child = (
+        "import sys, json\n"
+        "from fastapi.testclient import TestClient\n"
+        "import app.main\n"
+        "status = TestClient(app.main.app).get('/').status_code\n"
+        "print(json.dumps({'status': status, 'modules': sorted(sys.modules)}))\n"
+    )
+    # An empty value wins over .env, so the parser cannot be configured
+    env = {**os.environ, "PYTHONPATH": ROOT, "GEMINI_API_KEY": ""}
+    proc = subprocess.run([sys.executable, "-c", child], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    assert result["status"] == 200
+    assert not [name for name in result["modules"] if name.startswith(LAZY_MODULES)]
+
+def test_services_are_built_once_on_first_use(monkeypatch):
+    # A fresh, offline singleton; the real one is restored afterwards
+    monkeypatch.setattr(gemini_parser, "_parser_service", None)
+    monkeypatch.setattr(gemini_parser, "LLM_BACKEND", "fake")
+    assert get_parser_service() is get_parser_service()
+    assert get_parser_service().backend.name == "fake"
+    assert gemini_parser.parser_service is get_parser_service()
+    assert doc_generator.get_doc_generator() is doc_generator.doc_generator
+
+def test_endpoints_take_the_parser_by_injection(client, docx_bytes, fake_parser):
+    fake_parser(reply='{"personal_details": {"name": "Injected"}}')
+    response = client.post("/parse", files={"file": ("cv.docx", docx_bytes("Injected"), "application/octet-stream")})
+    assert response.status_code == 200
+    assert response.json()["personal_details"]["name"] == "Injected"
+
+def test_parse_importtime():
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   json.decoder\n"
+        "import time:       300 |        420 | json\n"
+    )
+    assert parse_importtime(stderr) == {"json.decoder": (120, 120, 1), "json": (300, 420, 0)}
@@ -0,0 +1,71 @@
+import io
+import os
+from docx import Document
+from app.services.template_cache import TemplateCache, LoopRow
+
+def _template_bytes(heading="{{ personal_details.name }}"):
+    doc = Document()
+    doc.add_paragraph(heading)
+    table = doc.add_table(rows=2, cols=2)
+    table.rows[0].cells[0].text = "S.No"
+    table.rows[1].cells[0].text = "[tr for edu in education][[SNO]]"
+    table.rows[1].cells[1].text = "{{ edu.degree }}[/tr]"
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+def test_compiled_template_is_prescanned_and_reused():
+    cache = TemplateCache()
+    template_bytes = _template_bytes()
+    compiled = cache.get_for_bytes(template_bytes)
+
+    assert compiled.loop_rows == [LoopRow(0, 1, "edu", "education")]
+    assert compiled.placeholders["personal_details.name"] == 1
+    assert cache.get_for_bytes(template_bytes) is compiled
+    assert cache.stats()["hits"] == 1
+
+def test_clone_is_isolated_from_cached_template():
+    compiled = TemplateCache().get_for_bytes(_template_bytes())
+    clone = compiled.clone()
+    clone.paragraphs[0].text = "changed"
+    clone.core_properties.title = "changed"
+
+    assert compiled.document.paragraphs[0].text == "{{ personal_details.name }}"
+    assert compiled.document.core_properties.title != "changed"
+    buf = io.BytesIO()
+    clone.save(buf)
+    assert Document(io.BytesIO(buf.getvalue())).paragraphs[0].text == "changed"
+
+def test_eviction_by_size_and_path_invalidation(tmp_path):
+    first = _template_bytes("first")
+    cache = TemplateCache(max_entries=10, max_bytes=int(TemplateCache().get_for_bytes(first).size_bytes * 1.5))
+    cache.get_for_bytes(first)
+    cache.get_for_bytes(_template_bytes("second"))
+    assert cache.stats()["entries"] == 1
+    assert cache.stats()["evictions"] == 1
+
+    path = tmp_path / "template.docx"
+    path.write_bytes(first)
+    original = cache.get_for_path(str(path))
+    path.write_bytes(_template_bytes("edited"))
+    os.utime(path, ns=(original.key[2] + 10**9, original.key[2] + 10**9))
+    assert cache.get_for_path(str(path)).document.paragraphs[0].text == "edited"
+
+def test_expansion_plan_stamps_rows_without_rescanning():
+    from app.services.doc_generator import DocGenerator
+    compiled = TemplateCache().get_for_bytes(_template_bytes())
+    (row_plan,) = compiled.expansion_plan
+    assert (row_plan.item_name, row_plan.list_name) == ("edu", "education")
+    assert [slot.segments for slot in row_plan.slots] == [
+        (("sno",),),
+        (("prop", "degree"),),
+    ]
+
+    docx = compiled.clone()
+    context = {"education": [{"degree": f"Degree {i}"} for i in range(50)]}
+    DocGenerator()._manually_expand_tables(docx, context, plan=compiled.expansion_plan)
+
+    rows = docx.tables[0].rows
+    assert len(rows) == 51
+    assert [c.text for c in rows[1].cells] == ["1", "Degree 0"]
+    assert [c.text for c in rows[50].cells] == ["50", "Degree 49"]
@@ -0,0 +1,96 @@
+import io
+import json
+import pytest
+from docx import Document
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services.template_cache import CompiledTemplate, TemplateCache, normalize_split_placeholders, index_placeholders
+from app.services.template_registry import TemplateRegistry, TemplateValidationError
+
+client = TestClient(app)
+
+CV = {"personal_details": {"name": "Registry Candidate"}, "experience": [{"role": "Dev", "company": "Acme"}, {"role": "Lead", "company": "Globex"}]}
+
+def corporate_template(extra_text: str = "") -> bytes:
+    doc = Document()
+    heading = doc.add_paragraph()
+    # How Word often stores a placeholder after an edit: split over three runs
+    for text in ("Candidate: {{ personal_", "details.na", "me }}"):
+        heading.add_run(text)
+    table = doc.add_table(rows=1, cols=2)
+    loop = table.rows[0].cells[0].paragraphs[0]
+    loop.add_run("[tr for exp in ")
+    loop.add_run("experience][[SNO]]")
+    table.rows[0].cells[1].paragraphs[0].add_run("{{ exp.company }}")
+    if extra_text:
+        doc.add_paragraph(extra_text)
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+def test_split_runs_are_merged():
+    doc = Document(io.BytesIO(corporate_template()))
+    assert index_placeholders(doc) == {"exp.company": 1}
+    assert normalize_split_placeholders(doc) == 2
+    assert doc.paragraphs[0].runs[0].text == "Candidate: {{ personal_details.name }}"
+    assert index_placeholders(doc) == {"personal_details.name": 1, "exp.company": 1}
+
+def test_register_render_list_delete(monkeypatch, tmp_path):
+    monkeypatch.setattr("app.main.template_registry", TemplateRegistry(directory=str(tmp_path)))
+    content = corporate_template()
+    response = client.post("/templates", files={"file": ("corporate.docx", content, "application/octet-stream")})
+    assert response.status_code == 201
+    info = response.json()
+    template_id = info["template_id"]
+    assert info["name"] == "corporate.docx"
+    assert info["loop_rows"] == [{"list": "experience", "item": "exp"}]
+    assert info["placeholders"] == ["exp.company", "personal_details.name"]
+    # Same bytes, same ID
+    assert client.post("/templates", files={"file": ("again.docx", content, "application/octet-stream")}).json()["template_id"] == template_id
+
+    rendered = client.post("/generate", data={"data": json.dumps(CV)}, params={"template_id": template_id})
+    assert rendered.status_code == 200
+    doc = Document(io.BytesIO(rendered.content))
+    assert doc.paragraphs[0].text == "Candidate: Registry Candidate"
+    assert [row.cells[1].text for row in doc.tables[0].rows] == ["Acme", "Globex"]
+
+    # A fresh registry over the same directory (i.e. after a restart) still knows it
+    assert TemplateRegistry(directory=str(tmp_path)).get(template_id).loop_rows[0].list_name == "experience"
+
+    assert [t["template_id"] for t in client.get("/templates").json()] == [template_id]
+    assert client.delete(f"/templates/{template_id}").status_code == 204
+    assert client.get(f"/templates/{template_id}").status_code == 404
+    assert client.post("/generate", data={"data": json.dumps(CV)}, params={"template_id": template_id}).status_code == 404
+
+def test_invalid_templates_are_rejected(monkeypatch, tmp_path):
+    monkeypatch.setattr("app.main.template_registry", TemplateRegistry(directory=str(tmp_path)))
+    broken_jinja = client.post("/templates", files={"file": ("bad.docx", corporate_template("{% if personal_details.name %}unclosed"), "application/octet-stream")})
+    assert broken_jinja.status_code == 400
+    assert "Jinja syntax error" in broken_jinja.json()["detail"]
+    not_docx = client.post("/templates", files={"file": ("notes.docx", b"plain text", "application/octet-stream")})
+    assert not_docx.status_code == 400
+    assert client.get("/templates").json() == []
+
+def test_delete_by_another_worker_is_seen(tmp_path):
+    serving, deleting = TemplateRegistry(directory=str(tmp_path)), TemplateRegistry(directory=str(tmp_path))
+    template_id = serving.register(corporate_template())["template_id"]
+    assert serving.get(template_id).loop_rows
+    assert deleting.delete(template_id)
+    with pytest.raises(KeyError):
+        serving.get(template_id)
+
+def test_templates_are_compiled_once_and_capped(monkeypatch, tmp_path):
+    registry = TemplateRegistry(directory=str(tmp_path), max_templates=1, cache=TemplateCache())
+    compiled = []
+    original_init = CompiledTemplate.__init__
+
+    def counting_init(self, *args, **kwargs):
+        compiled.append(args[0])
+        original_init(self, *args, **kwargs)
+
+    monkeypatch.setattr(CompiledTemplate, "__init__", counting_init)
+    template_id = registry.register(corporate_template())["template_id"]
+    assert registry.get(template_id) is registry.get(template_id)
+    assert len(compiled) == 1
+    with pytest.raises(TemplateValidationError):
+        registry.register(corporate_template("another one"))
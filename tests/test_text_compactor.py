@@ -0,0 +1,68 @@
+from app.services.text_compactor import compact_cv_text, compaction_headers
+
+# Three extracted PDF pages, each ending with PAGE_BREAK
+NOISY_CV = """Jane Doe - Curriculum Vitae
+Experience
+  Acme   Corp\t 2015 - 2020
+
+
+
+Page 1 of 3
+\fJane Doe - Curriculum Vitae
+Responsibilities:
+Built the billing service [Link: https://acme.example] [Link: https://acme.example]
+- 2 -
+\fJane Doe - Curriculum Vitae
+Responsibilities:
+Portfolio https://janedoe.dev [Link: https://janedoe.dev]
+3
+\f"""
+
+def test_compaction_removes_noise():
+    result = compact_cv_text(NOISY_CV, token_budget=0)
+    assert result.text == (
+        "Jane Doe - Curriculum Vitae\n"
+        "Experience\n"
+        "Acme Corp 2015 - 2020\n"
+        "\n"
+        "Responsibilities:\n"
+        "Built the billing service [Link: https://acme.example]\n"
+        "\n"
+        "Responsibilities:\n"
+        "Portfolio https://janedoe.dev"
+    )
+    assert not result.truncated
+    assert result.saved_chars == len(NOISY_CV) - len(result.text)
+    assert result.saved_tokens > 0
+
+def test_years_are_not_page_numbers():
+    assert compact_cv_text("Acme Corp\n2015\n2018 - 2020").text == "Acme Corp\n2015\n2018 - 2020"
+
+def test_repeated_body_lines_are_kept():
+    job = "Senior Software Engineer\nAcme Corporation\nYears of experience:\n5\nBuilt things\n"
+    pages = ["Jane Doe\n" + job * 2 + "Page 1\f", "Jane Doe\n" + job * 2 + "Page 2\f"]
+    result = compact_cv_text("".join(pages), token_budget=0)
+    lines = result.text.split("\n")
+    assert lines.count("Senior Software Engineer") == 4
+    assert lines.count("Acme Corporation") == 4
+    assert lines.count("5") == 4
+    assert lines.count("Jane Doe") == 1
+    assert "Page 2" not in lines
+
+def test_unpaginated_text_is_never_treated_as_headers():
+    text = "Senior Software Engineer\n5\n" * 3
+    assert compact_cv_text(text).text == text.strip()
+
+def test_token_budget_truncates_at_line_boundary():
+    text = "\n".join(f"Line number {i:03d} of the CV" for i in range(200))
+    result = compact_cv_text(text, token_budget=100)
+    assert result.truncated
+    assert len(result.text) <= 400
+    assert result.text.endswith("of the CV")
+    # Cutting to the budget is not a saving
+    assert result.saved_chars == len(text) - len(text.strip()) and result.saved_tokens == 0
+    assert result.truncated_chars == len(text) - len(result.text)
+    headers = compaction_headers(result)
+    assert headers["X-CV-Text-Truncated"] == "1"
+    assert headers["X-CV-Text-Chars-Truncated"] == str(result.truncated_chars)
+    assert int(headers["X-CV-Text-Chars-Sent"]) == len(result.text)
@@ -0,0 +1,83 @@
+import os
+import pytest
+from fastapi import FastAPI, UploadFile, File
+from fastapi.testclient import TestClient
+from app.services import metrics, uploads
+from app.services.uploads import UploadLimitMiddleware, SpooledUpload, open_content
+from app.utils import extract_text_from_docx
+
+def limited_app(max_bytes: int):
+    limited = FastAPI()
+    limited.add_middleware(UploadLimitMiddleware, max_bytes=max_bytes)
+    calls = []
+
+    @limited.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        calls.append(file.filename)
+        return {"bytes": len(await file.read())}
+
+    return TestClient(limited), calls
+
+def test_declared_oversized_body_is_rejected_before_reading():
+    client, calls = limited_app(1000)
+    assert client.post("/upload", files={"file": ("cv.docx", b"x" * 100, "application/octet-stream")}).json() == {"bytes": 100}
+    before = metrics.UPLOADS_REJECTED.value(endpoint="other")
+    response = client.post("/upload", files={"file": ("cv.docx", b"x" * 5000, "application/octet-stream")})
+    assert response.status_code == 413
+    assert calls == ["cv.docx"]
+    # Unknown paths share one label value
+    assert client.post("/made-up-path", content=b"x" * 5000).status_code == 413
+    assert metrics.UPLOADS_REJECTED.value(endpoint="other") == before + 2
+    assert "/made-up-path" not in metrics.registry.render()
+
+def test_streamed_body_is_cut_off_at_the_limit():
+    client, calls = limited_app(1000)
+    boundary = "limit"
+    head = f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="cv.docx"\r\n\r\n'.encode()
+
+    def chunks():
+        # No Content-Length: the body arrives chunked and has to be counted
+        yield head
+        for _ in range(10):
+            yield b"x" * 500
+        yield f"\r\n--{boundary}--\r\n".encode()
+
+    response = client.post("/upload", content=chunks(), headers={"Content-Type": f"multipart/form-data; boundary={boundary}"})
+    assert response.status_code == 413
+    assert calls == []
+
+def test_large_uploads_are_spooled_mapped_and_removed(monkeypatch, tmp_path, client, docx_bytes, fake_parser):
+    fake_parser()
+    monkeypatch.setattr(uploads, "UPLOAD_SPOOL_THRESHOLD", 0)
+    monkeypatch.setattr(uploads, "UPLOAD_SPOOL_DIR", str(tmp_path))
+    before = metrics.UPLOADS_SPOOLED.value(endpoint="/parse")
+    response = client.post("/parse", params={"local_only": True}, files={"file": ("cv.docx", docx_bytes("Spooled Candidate"), "application/octet-stream")})
+    assert response.status_code == 200
+    assert response.json()["personal_details"]["name"] == "Spooled Candidate"
+    assert metrics.UPLOADS_SPOOLED.value(endpoint="/parse") == before + 1
+    assert os.listdir(tmp_path) == []
+
+def test_spooled_content_reads_like_bytes(tmp_path, docx_bytes):
+    content = docx_bytes("Spooled Candidate")
+    path = tmp_path / "cv.docx"
+    path.write_bytes(content)
+    spooled = SpooledUpload(str(path), len(content))
+    with open_content(spooled) as view:
+        assert view.read(2) == b"PK"
+    assert extract_text_from_docx(spooled) == extract_text_from_docx(content)
+
+def test_peak_memory_is_measured_per_request(client, docx_bytes, fake_parser):
+    if not metrics.current_rss():
+        pytest.skip("RSS is not readable on this platform")
+    sampler = metrics.MemorySampler(interval=0.01)
+    window = sampler.begin()
+    block = bytearray(64 * 1024 * 1024)
+    block[::4096] = b"x" * len(block[::4096])
+    del block
+    assert sampler.end(window) >= 32 * 1024 * 1024
+
+    fake_parser()
+    before = metrics.REQUEST_PEAK_MEMORY.count(endpoint="/parse")
+    client.post("/parse", params={"local_only": True}, files={"file": ("cv.docx", docx_bytes("Spooled Candidate"), "application/octet-stream")})
+    assert metrics.REQUEST_PEAK_MEMORY.count(endpoint="/parse") == before + 1
+    assert "cv_request_peak_memory_bytes_bucket" in metrics.registry.render()